@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -133,3 +134,42 @@ UPLOAD_PASSWORD_HASH = 'pbkdf2_sha256$1000000$nCaBc6mlTtFmFGpyrPTYLe$Q6mr1SOrx6m
 # Prefix URLs only when running on the UAA server
 USE_PREFIX = not DEBUG
 URL_PREFIX = "course_trends" if USE_PREFIX else ""
+
+# Forecast artifact written by main/arima.py and read by the views
+FORECAST_DATA_PATH = BASE_DIR / "main" / "forecast_data.json"
+
+# Per-course, per-model rolling-origin backtest metrics written by main/backtest.py
+BACKTEST_DATA_PATH = BASE_DIR / "main" / "backtest_data.json"
+
+# Model orders: "fixed" uses (1,1,1)(1,1,1,m) for every course, "auto" searches each
+# course's orders once (by "aic" or "holdout" error on the last terms) and remembers them in ORDER_CACHE_PATH
+FORECAST_ORDER_MODE = "fixed"
+FORECAST_ORDER_CRITERION = "aic"
+ORDER_CACHE_PATH = BASE_DIR / "main" / "order_cache.json"
+
+# Number of worker processes arima.py uses to fit courses in parallel (1 = serial)
+FORECAST_WORKERS = int(os.environ.get("FORECAST_WORKERS", os.cpu_count() or 1))
+
+# Limits that keep a forecast refresh to a predictable time: optimizer iterations
+# (None = statsmodels' default) and seconds per model fit, and a deadline in seconds
+# for the whole run (None = no deadline). Courses that run out of time fall back to
+# their last cached fit or the baseline forecasts.
+FORECAST_FIT_MAXITER = None
+FORECAST_FIT_SECONDS = float(os.environ.get("FORECAST_FIT_SECONDS", 60))
+FORECAST_RUN_SECONDS = float(os.environ["FORECAST_RUN_SECONDS"]) if os.environ.get("FORECAST_RUN_SECONDS") else None
+
+# Stage timings and memory from the synthetic benchmark (manage.py benchmark_forecasts)
+BENCHMARK_DATA_PATH = BASE_DIR / "main" / "benchmark_data.json"
+
+# Stage and per-course/model timings of the last full forecast run (main/profiling.py;
+# --course runs write forecast_profile.partial.json next to it);
+# SHOW_RUN_PROFILE adds its summary to the model_info page
+FORECAST_PROFILE_PATH = BASE_DIR / "main" / "forecast_profile.json"
+SHOW_RUN_PROFILE = False
+
+# Subjects scraped and forecast; FORECAST_SUBJECTS="CSCE,MATH,..." overrides the list
+FORECAST_SUBJECTS = [s.strip().upper() for s in os.environ.get("FORECAST_SUBJECTS", "CSCE").split(",") if s.strip()]
+
+# Sharded runs (manage.py run_forecasts --shard I --shards N) write one file per shard
+# here, on a filesystem every worker shares, and --merge-shards N combines them
+FORECAST_SHARD_DIR = BASE_DIR / "main" / "shards"
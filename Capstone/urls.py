@@ -33,7 +33,13 @@ if prefix == "":
         path('data/', views.data, name='data'),
         path('model_info/', views.model_info, name='model_info'),
         path('download/', views.download_data, name='download_data'),
+        path('forecast_data.json', views.forecast_data, name='forecast_data'),
+        path('api/courses/', views.api_courses, name='api_courses'),
+        path('api/courses/<str:code>/forecast', views.api_course_forecast, name='api_course_forecast'),
         path('rescrape/', views.rescrape_data, name='rescrape_data'),
+        path('jobs/status/', views.job_status, name='job_status'),
+        path('scenarios/', views.scenarios, name='scenarios'),
+        path('scenarios/forecast/', views.scenario_forecast, name='scenario_forecast'),
     ]
 
 # If prefix exists (server), wrap ALL URLs inside it
@@ -44,5 +50,11 @@ else:
         path(f"{prefix}/data/", views.data, name='data'),
         path(f"{prefix}/model_info/", views.model_info, name='model_info'),
         path(f"{prefix}/download/", views.download_data, name='download_data'),
+        path(f"{prefix}/forecast_data.json", views.forecast_data, name='forecast_data'),
+        path(f"{prefix}/api/courses/", views.api_courses, name='api_courses'),
+        path(f"{prefix}/api/courses/<str:code>/forecast", views.api_course_forecast, name='api_course_forecast'),
         path(f"{prefix}/rescrape/", views.rescrape_data, name='rescrape_data'),
+        path(f"{prefix}/jobs/status/", views.job_status, name='job_status'),
+        path(f"{prefix}/scenarios/", views.scenarios, name='scenarios'),
+        path(f"{prefix}/scenarios/forecast/", views.scenario_forecast, name='scenario_forecast'),
     ]
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Course, Prerequisite,GraduationData
+from .models import Course, Prerequisite,GraduationData, BackgroundJob, ForecastResult
 
 # Register your models here.
 
@@ -10,6 +10,19 @@ class CourseAdmin(admin.ModelAdmin):
     list_filter = ('term',)
     search_fields = ('code', 'title')
     ordering = ('code',)
+
+    # Course writes don't send signals for the derived caches, so admin edits report themselves
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        Course.data_changed()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        Course.data_changed()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        Course.data_changed()
     
 
 @admin.register(Prerequisite)
@@ -20,4 +33,16 @@ class PrerequisiteAdmin(admin.ModelAdmin):
 @admin.register(GraduationData)
 class GraduateAdmin(admin.ModelAdmin):
     list_display = ("year", "graduates")
-    search_fields = ("year", "graduates")
\ No newline at end of file
+    search_fields = ("year", "graduates")
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ("kind", "status", "triggers", "progress", "total", "created_at", "finished_at")
+    list_filter = ("kind", "status")
+
+
+@admin.register(ForecastResult)
+class ForecastResultAdmin(admin.ModelAdmin):
+    list_display = ("run_id", "course", "model", "term_name", "forecast", "mae")
+    list_filter = ("run_id", "model")
+    search_fields = ("course",)
@@ -1,27 +1,43 @@
 import os
 import sys
+import argparse
+import hashlib
+import json
+import re
+import time
 import django
 import pandas as pd
 import warnings
 import numpy as np
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
 from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from sklearn.metrics import mean_absolute_error
 from sklearn.metrics import root_mean_squared_error
-from csce_scraper import build_term_codes_past_years
+from django.conf import settings
 warnings.filterwarnings("ignore")
 
-#django setup
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.append(BASE_DIR)
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Capstone.settings')
-django.setup()
+#make the project importable when running as a script
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
 
-from main.models import Course, Prerequisite
-from main.models import GraduationData
+from main.artifacts import json_safe
+from main.terms import SUMMER, label as term_label, labels as term_labels, lag, next_terms, to_ordinals
 
-hs_qs = GraduationData.objects.all().values('year', 'graduates')
-hs_map = {row['year']: row['graduates'] for row in hs_qs}
+hs_map = {}
+
+#fitted results are cached per course and reused while the course's inputs are unchanged
+FIT_CACHE_PATH = os.path.join(BASE_DIR, "main", "fit_cache.json")
+
+#any edit to this file or the term calendar invalidates the fit cache
+_code_digest = hashlib.sha256()
+for _source in (os.path.abspath(__file__), os.path.join(BASE_DIR, "main", "terms.py")):
+    with open(_source, "rb") as source_file:
+        _code_digest.update(source_file.read())
+CODE_VERSION = _code_digest.hexdigest()[:16]
 
 def hs_value_for_term(term):
     term = int(term)
@@ -35,432 +51,810 @@ def hs_value_for_term(term):
 
     return hs_map.get(hs_year, np.nan)
 
-#converts numeric term to non-numeric term (e.g. 202503 ---> Fall 2025)
-def term_name_from_code(term):
-    term = int(term)
-    year, sem = divmod(term, 100)
-    names = {1: "Spring", 2: "Summer", 3: "Fall"}
-    return f"{names.get(sem, 'Unknown')} {year}"
-
-#builds next term based on current term 
-def next_term_code(course_num, spring_count, summer_count, fall_count, yearly_course):
-    last_term = int(group['term'].max())
-    year, sem = divmod(last_term, 100)
-    
-    if yearly_course:
-        if spring_count > 0 and summer_count == 0 and fall_count == 0: 
-            return (year + 1) * 100 + 1 if sem == 1 else year * 100 + 1
-        if spring_count == 0 and summer_count > 0 and fall_count == 0: 
-            return (year + 1) * 100 + 2 if sem == 2 else year * 100 + 2
-        if spring_count == 0 and summer_count == 0 and fall_count > 0: 
-            return (year + 1) * 100 + 3 if sem == 3 else year * 100 + 3
-
-    if course_num > 201:
-        if sem == 1:      #Spring → Fall
-            return year * 100 + 3
-        elif sem == 2:    #Summer → Fall
-            return year * 100 + 3
-        else:
-            return (year + 1) * 100 + 1
-    else:
-        if sem == 1:      #Spring → Summer
-            return year * 100 + 2
-        elif sem == 2:    #Summer → Fall
-            return year * 100 + 3
-        else:
-            return (year + 1) * 100 + 1
-
-#calculates previous term code        
-def previous_term_code(term_code):
-    term_code = int(term_code)
-    year, sem = divmod(term_code, 100)
-    if sem == 1:   #Spring → previous Fall
-        return (year - 1) * 100 + 3
-    elif sem == 2: #Summer → previous Spring
-        return year * 100 + 1
-    elif sem == 3: #Fall → same year Summer
-        return year * 100 + 2
-
-#get previous term code with option to skip summers for upper-level courses
-def get_previous_term(term, steps_back, upper_level=False):
-    lag_term = term
-    for _ in range(steps_back):
-        lag_term = previous_term_code(lag_term)
-
-        #For upper-level courses (200+), skip *only* summers if they're not in the dataset
-        if upper_level and (lag_term % 100 == 2):
-            #Only skip summer if previous Fall or Spring exists
-            lag_term = previous_term_code(lag_term)
-    return lag_term
-
-#load data from the Course model
-qs = Course.objects.all().values('code', 'term', 'enrolled', 'title')
-df = pd.DataFrame(qs)
-
-#load prerequisite data into a DataFrame
-prereq_qs = Prerequisite.objects.all().values('course_code', 'prereq_1', 'prereq_2')
-prereq_df = pd.DataFrame(prereq_qs)
-
-#clean + sort chronologically
-df['term'] = df['term'].astype(int)
-df['term_name'] = df['term'].apply(term_name_from_code)
-#Add numeric course number column
-df['course_num'] = df['code'].str.extract(r'A(\d+)').astype(int)
-
-#Remove Summer terms for upper-level courses (A211+)
-df = df[~(
-    (df['course_num'] > 201) &
-    (df['term_name'].str.contains("Summer", case=False, na=False))
-)]
-
-df = df.sort_values(['code', 'term'])
-
-all_MAES = {"arima": [], "sarima": [], "arimax": [], "sarimax": []}
-prereq_map = prereq_df.set_index('course_code')[['prereq_1', 'prereq_2']].to_dict('index')
-results = []
-
-for code, group in df.groupby('code'):
-    course_num = int(code.split('A')[-1])
-
-    prereqs = prereq_map.get(code, {})
-    pr1, pr2 = prereqs.get('prereq_1'), prereqs.get('prereq_2')
-    m = 3 if course_num <= 201 else 2
-    y = group['enrolled'].astype(float).values
-    terms = group['term'].astype(int).values
-
-    if len(y) < 4:
-        results.append({
-            "code": code,
-            "title": group['title'].iloc[0],
-            "term": None,
-            "term_name": "Insufficient data",
-            "arima_forecast": None,
-            "sarima_forecast": None,
-            "arimax_forecast": None,
-            "sarimax_forecast": None,
-            "arima_mae": None,
-            "sarima_mae": None,
-            "arimax_mae": None,
-            "sarimax_mae": None,
-            "best_accuracy": None
-        })
-        continue
-
+#result row for courses without enough history to fit the models
+def insufficient_result(code, title):
+    return {
+        "code": code,
+        "title": title,
+        "term": None,
+        "term_name": "Insufficient data",
+        "arima_forecast": None,
+        "sarima_forecast": None,
+        "arimax_forecast": None,
+        "sarimax_forecast": None,
+        "arima_mae": None,
+        "sarima_mae": None,
+        "arimax_mae": None,
+        "sarimax_mae": None,
+        "best_accuracy": None
+    }
+
+#model orders per family; the seasonal period m follows the course level
+#course number of a code like "CSCE A101" or "MATH A151": the digits after the subject
+#and campus letter, so subjects that contain an "A" parse correctly too
+COURSE_NUM_PATTERN = r'^\S+\s+[A-Za-z]*(\d+)'
+COURSE_NUM_RE = re.compile(COURSE_NUM_PATTERN)
+
+def course_number(code):
+    return int(COURSE_NUM_RE.match(code).group(1))
+
+#subject of a course code ("CSCE A101" -> "CSCE")
+def subject_of(code):
+    return code.split()[0]
+
+#seasonal period: Spring/Summer/Fall for A201 and below, Spring/Fall above (summers are dropped)
+def seasonal_period(course_num):
+    return 3 if course_num <= 201 else 2
+
+def model_orders(code, course_num):
+    m = seasonal_period(course_num)
+    orders = {
+        "arima": {"order": (1, 1, 1)},
+        "sarima": {"order": (1, 1, 1), "seasonal_order": (1, 1, 1, m)},
+        "arimax": {"order": (1, 1, 1)},
+        "sarimax": {"order": (1, 1, 1), "seasonal_order": (1, 1, 1, m)},
+    }
+    #Special case for A201: SARIMAX without seasonal differencing
+    if code == "CSCE A201":
+        orders["sarimax"] = {"order": (1, 1, 1), "seasonal_order": (1, 0, 1, 2)}
+    return orders
+
+#course x term enrollment matrix built once, with a code -> row index
+def build_enrollment_matrix(df):
+    #keep the first row for duplicated (code, term) pairs, like the old lookup did
+    df = df.drop_duplicates(['code', 'term'], keep='first')
+    codes = df['code'].unique()
+    code_index = {code: row for row, code in enumerate(codes)}
+    ordinals = to_ordinals(df['term'].values)
+    first_ordinal = int(ordinals.min()) if len(ordinals) else 0
+    n_terms = int(ordinals.max()) - first_ordinal + 1 if len(ordinals) else 0
+
+    matrix = np.full((len(codes), n_terms), np.nan)
+    rows = df['code'].map(code_index).values
+    matrix[rows, ordinals - first_ordinal] = df['enrolled'].astype(float).values
+    return matrix, code_index, first_ordinal
+
+#gathers a prerequisite's enrollment at the given term ordinals (NaN when missing)
+def gather_enrollment(enrollment, prereq_code, ordinals):
+    matrix, code_index, first_ordinal = enrollment
+    values = np.full(len(ordinals), np.nan)
+    row = code_index.get(prereq_code)
+    if row is None:
+        return values
+    cols = np.asarray(ordinals) - first_ordinal
+    in_range = (cols >= 0) & (cols < matrix.shape[1])
+    values[in_range] = matrix[row, cols[in_range]]
+    return values
+
+#builds the exogenous matrix (HS grads + lagged prerequisite enrollment) for one course
+def build_exog(enrollment, code, group, course_num, pr1, pr2):
     exog_values = []
+    terms = group['term'].values
     #Add HS grads as exog ONLY for A101
     if code == "CSCE A101":
-        hs_vals = []
-        for term in group['term']:
-            hs_raw = hs_value_for_term(term)
-
-            if not np.isnan(hs_raw):
-                hs_vals.append(hs_raw / 50)
-            else:
-                hs_vals.append(0)
-
-        exog_values.append(hs_vals)
+        hs_raw = np.array([hs_value_for_term(term) for term in terms], dtype=float)
+        exog_values.append(np.where(np.isnan(hs_raw), 0, hs_raw / 50))
 
     #Prereq_1/2 → lag 1/2 (two-term back)
     for i, prereq_code in enumerate([pr1, pr2]):
         if prereq_code:
-            lagged_values = []
-            for term in group['term']:
-                lag_term = get_previous_term(term, i + 1, course_num > 201)
-                enroll_row = df[(df['code'] == prereq_code) & (df['term'] == lag_term)]
-
-                #Get the enrollment value or set 0 if missing
-                if not enroll_row.empty:
-                    value = float(enroll_row['enrolled'].values[0])
-                else:
-                    value = np.nan  
-
-                lagged_values.append(value)
-
-                #Print for verification
-                print(
-                    f"{code} term {term} → lag {i+1} ({prereq_code}) term {lag_term}: "
-                    f"{value if value != 0 else 'MISSING (set 0)'}"
-                )
-
-            exog_values.append(lagged_values)
+            #upper-level courses (A211+) skip summers when stepping back
+            lag_ords = to_ordinals(lag(terms, i + 1, summers=course_num <= 201))
+            exog_values.append(gather_enrollment(enrollment, prereq_code, lag_ords))
         else:
             exog_values.append(np.zeros(len(group)))
 
-    exog = np.column_stack(exog_values) if exog_values else np.zeros((len(group), 1))
-    if course_num <= 201:
+    return np.column_stack(exog_values) if exog_values else np.zeros((len(group), 1))
+
+#builds one self-contained work unit per course so fitting can run in any process
+#codes limits which courses get a task; lags still read from the whole df
+def build_tasks(df, prereq_map, codes=None, rolling_folds=0):
+    enrollment = build_enrollment_matrix(df)
+    if codes is not None:
+        df = df[df['code'].isin(list(codes))]
+    tasks = []
+    for code, group in df.groupby('code'):
+        start = time.perf_counter()
+        course_num = course_number(code)
+
+        prereqs = prereq_map.get(code, {})
+        pr1, pr2 = prereqs.get('prereq_1'), prereqs.get('prereq_2')
+        task = {
+            "code": code,
+            "title": group['title'].iloc[0],
+            "course_num": course_num,
+            "orders": model_orders(code, course_num),
+            "rolling_folds": rolling_folds,
+            "history": group[['term', 'enrolled']].reset_index(drop=True),
+            "exog": None,
+        }
+        if len(group) >= 4:
+            task["exog"] = build_exog(enrollment, code, group, course_num, pr1, pr2)
+        task["feature_seconds"] = round(time.perf_counter() - start, 6)
+        tasks.append(task)
+    return tasks
+
+MODEL_FAMILIES = ["arima", "sarima", "arimax", "sarimax"]
+EXOG_FAMILIES = ("arimax", "sarimax")
+
+#builds the statsmodels model for one family
+def make_model(family, y, exog, spec):
+    if family not in EXOG_FAMILIES:
+        exog = None
+    if family in ("arima", "arimax"):
+        return ARIMA(y, exog=exog, order=spec["order"])
+    return SARIMAX(y, exog=exog, **spec)
+
+#raised from inside the optimizer when a fit runs past its time budget
+class FitTimeout(Exception):
+    pass
+
+#per-fit limits of a course: optimizer iterations and seconds per fit, plus the run deadline
+#(a time.time() timestamp, so it means the same thing in every worker process)
+def task_budget(maxiter=None, fit_seconds=None, deadline=None):
+    return {"maxiter": maxiter, "fit_seconds": fit_seconds, "deadline": deadline}
+
+#time.time() by which a fit started now has to finish (None = no limit)
+def fit_deadline(budget):
+    if not budget:
+        return None
+    limits = [budget["deadline"]]
+    if budget["fit_seconds"]:
+        limits.append(time.time() + budget["fit_seconds"])
+    limits = [limit for limit in limits if limit is not None]
+    return min(limits) if limits else None
+
+#whether the run deadline of a budget has passed
+def past_deadline(budget):
+    return bool(budget) and budget["deadline"] is not None and time.time() > budget["deadline"]
+
+#fits a model, optionally warm-started from another fit's parameters
+#maxiter caps the optimizer iterations (statsmodels' default when None)
+#deadline stops the optimizer with FitTimeout once time.time() passes it
+def fit_model(model, start_params=None, maxiter=None, deadline=None):
+    fit_kwargs = {}
+    if maxiter:
+        fit_kwargs["maxiter"] = maxiter
+    if deadline is not None:
+        def check_deadline(*args):
+            if time.time() > deadline:
+                raise FitTimeout("fit ran past its time budget")
+        fit_kwargs["callback"] = check_deadline
+    if isinstance(model, ARIMA):
+        return model.fit(start_params=start_params, method_kwargs=fit_kwargs or None)
+    return model.fit(start_params=start_params, disp=False, **fit_kwargs)
+
+#fit_model under a course's budget
+def fit_within_budget(model, budget, start_params=None):
+    budget = budget or {}
+    return fit_model(model, start_params, budget.get("maxiter"), fit_deadline(budget))
+
+#collects the warnings raised inside the block (silenced globally above) as
+#"Category: message" strings so they can be reported in the run profile
+@contextmanager
+def recorded_warnings():
+    messages = []
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        try:
+            yield messages
+        finally:
+            messages.extend(sorted({f"{w.category.__name__}: {w.message}" for w in caught}))
+
+#optimizer iterations and convergence flag of a fit
+def fit_diagnostics(fit):
+    retvals = getattr(fit, "mle_retvals", None) or {}
+    return retvals.get("iterations"), retvals.get("converged")
+
+#warm-start parameters for a fit on n_obs points, or None when too few points remain
+#after differencing to identify the model (the likelihood is then too flat for the
+#optimizer to move off the starting parameters)
+#only the rolling-origin folds are chained this way, each from the origin before it; the
+#published full fit is always cold, since a warm start there can stop at a worse optimum
+def warm_start_params(spec, n_obs, params):
+    d = spec["order"][1]
+    seasonal = spec.get("seasonal_order", (0, 0, 0, 0))
+    effective_obs = n_obs - d - seasonal[1] * seasonal[3]
+    return params if effective_obs > len(params) else None
+
+def forecast_next(family, fit, steps, exog):
+    if family in EXOG_FAMILIES:
+        return np.ravel(fit.forecast(steps=steps, exog=exog))
+    return np.ravel(fit.forecast(steps=steps))
+
+#one-step-ahead forecasts from the last `folds` origins; the first origin is fit cold
+#and each later one is warm-started from the origin before it
+def rolling_validation(family, y, exog, terms, spec, folds, budget=None):
+    preds, actual, fold_terms = [], [], []
+    params = None
+    for origin in range(max(len(y) - folds, 3), len(y)):
+        start_params = warm_start_params(spec, origin, params) if params is not None else None
+        fit = fit_within_budget(make_model(family, y[:origin], exog[:origin], spec), budget, start_params)
+        params = fit.params
+        preds.append(forecast_next(family, fit, 1, exog[origin:origin + 1])[0])
+        actual.append(y[origin])
+        fold_terms.append(int(terms[origin]))
+    mae = mean_absolute_error(actual, preds) if preds else None
+    return mae, fold_terms, [max(round(p, 0), 0) for p in preds]
+
+#fits one model family on the full series (cold) and forecasts the next term
+def fit_full(family, y, exog, spec, budget=None):
+    start = time.perf_counter()
+    with recorded_warnings() as fit_warnings:
+        fit = fit_within_budget(make_model(family, y, exog, spec), budget)
+        forecast = forecast_next(family, fit, 1, exog[-1].reshape(1, -1))[0]
+    iterations, converged = fit_diagnostics(fit)
+    return fit, {
+        "forecast": max(round(forecast, 0), 0),
+        "iterations": iterations,
+        "converged": converged,
+        "seconds": round(time.perf_counter() - start, 4),
+        "warnings": fit_warnings,
+        "params": fit.params.tolist(),
+    }
+
+#fits without the last two terms and scores the forecast of those terms
+def validate_family(family, code, y, exog, terms, spec, budget=None):
+    out = {
+        "mae": None,
+        "val_terms": None,
+        "val_preds": None,
+        "accuracy": None,
+        "val_iterations": None,
+        "val_converged": None,
+        "val_seconds": None,
+        "val_warnings": [],
+    }
+    start = time.perf_counter()
+    try:
+        train, test = y[:-2], y[-2:]
+        train_exog, test_exog = exog[:-2], exog[-2:]
+        test_terms = terms[-2:]
+        with recorded_warnings() as out["val_warnings"]:
+            model_eval = fit_within_budget(make_model(family, train, train_exog, spec), budget)
+            preds = forecast_next(family, model_eval, len(test), test_exog)
+        test = np.ravel(test)
+
+        mae = mean_absolute_error(test, preds)
+
+        out["mae"] = round(mae, 2)
+        out["val_terms"] = test_terms.tolist()
+        out["val_preds"] = [max(round(p, 0), 0) for p in preds]
+        out["accuracy"] = 100 - (mae / y[-2:].mean() * 100)
+        out["val_iterations"], out["val_converged"] = fit_diagnostics(model_eval)
+        print(f"{code}: {family.upper()} MAE={mae:.1f}")
+    except FitTimeout:
+        raise
+    except Exception as inner_e:
+        print(f"Metrics didn't calculate for {code} ({family.upper()}): {inner_e}")
+    out["val_seconds"] = round(time.perf_counter() - start, 4)
+    return out
+
+#validation + full fit (+ rolling-origin validation when enabled) for one model family
+def fit_family(family, code, y, exog, terms, spec, rolling_folds=0, budget=None):
+    validation = validate_family(family, code, y, exog, terms, spec, budget)
+    fit, out = fit_full(family, y, exog, spec, budget)
+    out.update(validation)
+
+    if rolling_folds:
+        try:
+            rolling_mae, rolling_terms, rolling_preds = rolling_validation(
+                family, y, exog, terms, spec, rolling_folds, budget
+            )
+            out["rolling_mae"] = round(rolling_mae, 2) if rolling_mae is not None else None
+            out["rolling_terms"] = rolling_terms
+            out["rolling_preds"] = rolling_preds
+        except FitTimeout:
+            raise
+        except Exception as inner_e:
+            print(f"Rolling validation failed for {code} ({family.upper()}): {inner_e}")
+
+    return out
+
+#enrollment series, exog matrix and terms a course's models are fit on (None if too short)
+def prepare_series(task):
+    group = task["history"]
+    y = group['enrolled'].astype(float).values
+    terms = group['term'].values
+
+    if len(y) < 4:
+        return None
+
+    exog = task["exog"]
+    if task["course_num"] <= 201:
         valid_idx = ~np.isnan(exog).any(axis=1)
         y = y[valid_idx]
         exog = exog[valid_idx]
     else:
         #For upper-level courses like A470, fill missing prereq enrollments with 0
         exog = np.nan_to_num(exog, nan=0.0)
-    
+
     #Skip exogenous variables for courses with no prerequisites (except A101)
 
-    arima_mae = None
-    sarima_mae = None
-    arimax_mae = None
-    sarimax_mae = None
+    if len(y) < 4:
+        return None
+    return y, exog, terms
+
+#term a course is forecast for, and whether it is only offered once a year
+def target_term(code, course_num, terms):
+    spring_count = 0
+    summer_count = 0
+    fall_count = 0
+    yearly_course = False
+    for term in terms:
+        temp = divmod(term, 100)
+        temp = temp[1]
+        if temp == 1:
+            spring_count += 1
+        elif temp == 2:
+            summer_count += 1
+        elif temp == 3: fall_count += 1
+    if spring_count > 0 and summer_count == 0 and fall_count == 0:
+        yearly_course = True
+    elif spring_count == 0 and summer_count > 0 and fall_count == 0:
+        yearly_course = True
+    elif spring_count == 0 and summer_count == 0 and fall_count > 0:
+        yearly_course = True
+    else:
+        yearly_course = False
+    #upper-level courses (A211+) aren't offered in summer
+    next_term = int(next_terms(max(terms), summers=course_num <= 201, yearly=yearly_course))
+
+    if code == "CSCE A115" and (next_term % 100) == 2:
+        year = next_term // 100
+        next_term = year * 100 + 3
+    return next_term, yearly_course
+
+#builds a course's result record from its per-family fits
+def course_result(task, fits):
+    code = task["code"]
+    course_num = task["course_num"]
+    group = task["history"].copy()
+    next_term, yearly_course = target_term(code, course_num, group['term'])
+
+    models_accuracy = [f["accuracy"] for f in fits.values() if f["accuracy"] is not None]
+    best_accuracy = max(models_accuracy) if models_accuracy else None
+
+    group['year'] = group['term'] // 100
+    year_counts = group['year'].value_counts()
+
+    valid_years = []
+    for year, count in year_counts.items():
+        if count >= 2:
+            valid_years.append(year)
+
+    yearly_totals = (
+        group[group['year'].isin(valid_years)]
+        .groupby('year')['enrolled']
+        .sum()
+        .to_dict()
+    )
+    #json data storage
+    result = {
+        "code": code,
+        "title": task["title"],
+        "term": next_term,
+        "term_name": term_label(next_term),
+    }
+    for family in MODEL_FAMILIES:
+        result[f"{family}_forecast"] = fits[family]["forecast"]
+    for family in MODEL_FAMILIES:
+        result[f"{family}_mae"] = fits[family]["mae"]
+    for family in MODEL_FAMILIES:
+        result[f"{family}_val_terms"] = fits[family]["val_terms"]
+        result[f"{family}_val_preds"] = fits[family]["val_preds"]
+    result["yearly_course"] = yearly_course
+    result["best_accuracy"] = best_accuracy
+    result["yearly_totals"] = yearly_totals
+
+    #fitted parameters of the exog models, so main/scenarios.py can reuse them without refitting
+    for family in EXOG_FAMILIES:
+        if "params" in fits[family]:
+            result[f"{family}_params"] = {"spec": task["orders"][family], "params": fits[family]["params"]}
+
+    #optimizer diagnostics, timings and warnings (and rolling-origin validation when enabled)
+    for family in MODEL_FAMILIES:
+        for key in ("iterations", "converged", "val_iterations", "val_converged",
+                    "seconds", "val_seconds", "warnings", "val_warnings",
+                    "rolling_mae", "rolling_terms", "rolling_preds"):
+            if key in fits[family]:
+                result[f"{family}_{key}"] = fits[family][key]
+    return result
+
+#picks the model the chart highlights and best_accuracy reports: the lowest backtest MAE
+#over all folds when a backtest scored the course on more terms than the two-term holdout
+#(backtest_scores of main/backtest.py), else the lowest holdout MAE; seasonal models are
+#left out for yearly courses
+def select_best_model(result, backtest=None):
+    if result.get("term") is None:
+        return result
+    #results can come back from the fit cache already selected, so the holdout accuracy is kept aside
+    holdout_accuracy = result.setdefault("holdout_accuracy", result.get("best_accuracy"))
+    families = ["arima", "arimax"] if result.get("yearly_course") else MODEL_FAMILIES
+    scores = (backtest or {}).get(result["code"], {})
+    scored = [family for family in families if family in scores and scores[family]["points"] > 2]
+    if scored:
+        best = min(scored, key=lambda family: scores[family]["mae"])
+        result["best_model"] = best
+        result["best_model_source"] = f"backtest ({scores[best]['folds']} folds)"
+        result["best_accuracy"] = scores[best]["accuracy"]
+        return result
+    maes = [family for family in families if result.get(f"{family}_mae") is not None]
+    best = min(maes, key=lambda family: result[f"{family}_mae"]) if maes else None
+    result["best_model"] = best
+    result["best_model_source"] = "holdout" if best else None
+    result["best_accuracy"] = holdout_accuracy
+    return result
+
+#fits every model family for one course; pure function of its task so it can run in a worker process
+#a course that runs out of time comes back as {"code", "over_budget": reason} (see fallback_result)
+def forecast_course(task):
+    code = task["code"]
+    start = time.perf_counter()
+    budget = task.get("budget")
+
+    series = prepare_series(task)
+    if series is None:
+        return insufficient_result(code, task["title"])
+    y, exog, terms = series
+
+    if past_deadline(budget):
+        return {"code": code, "over_budget": "run deadline passed before the course was fitted"}
 
     try:
-        if len(y) < 4:
-            results.append({
-                "code": code,
-                "title": group['title'].iloc[0],
-                "term": None,
-                "term_name": "Insufficient data",
-                "arima_forecast": None,
-                "sarima_forecast": None,
-                "arimax_forecast": None,
-                "sarimax_forecast": None,
-                "arima_mae": None,
-                "sarima_mae": None,
-                "arimax_mae": None,
-                "sarimax_mae": None,
-                "best_accuracy": None
-            })
-            continue
-        
-        spring_count = 0 
-        summer_count = 0 
-        fall_count = 0 
-        yearly_course = False
-        for term in group['term']: 
-            temp = divmod(term, 100) 
-            temp = temp[1] 
-            if temp == 1: 
-                spring_count += 1 
-            elif temp == 2: 
-                summer_count += 1 
-            elif temp == 3: fall_count += 1 
-        if spring_count > 0 and summer_count == 0 and fall_count == 0: 
-            yearly_course = True
-        elif spring_count == 0 and summer_count > 0 and fall_count == 0: 
-            yearly_course = True
-        elif spring_count == 0 and summer_count == 0 and fall_count > 0: 
-            yearly_course = True
-        else:
-            yearly_course = False
-        next_term = next_term_code(course_num, spring_count, summer_count, fall_count, yearly_course)
-
-        if code == "CSCE A115" and (next_term % 100) == 2:
-            year = next_term // 100
-            next_term = year * 100 + 3
-
-        models_accuracy = []
-
-        #ARIMA forecast
-        model = ARIMA(y, order=(1, 1, 1))
-        fit = model.fit()
-        arima_forecast = fit.forecast(steps=1)[0]
-        arima_forecast = max(round(arima_forecast, 0), 0)
-        arima_val_terms, arima_val_preds = None, None  #store testing info
-
-        if len(y) >= 4:
-            try:
-                train, test = y[:-2], y[-2:]
-                train_terms, test_terms = terms[:-2], terms[-2:]
-                model_eval = ARIMA(train, order=(1, 1, 1)).fit()
-                preds = model_eval.forecast(steps=len(test))
-                test = np.ravel(test)
-                preds = np.ravel(preds)
-
-                arima_mae = mean_absolute_error(test, preds)
-
-                all_MAES["arima"].append(arima_mae)
-                preds = [max(round(p, 0), 0) for p in preds]
-                arima_val_terms = test_terms.tolist()
-                arima_val_preds = preds
-
-                arima_accuracy = 100 - (arima_mae / y[-2:].mean() * 100)
-                models_accuracy.append(arima_accuracy)
-                print(f"{code}: ARIMA MAE={arima_mae:.1f}")
-            except Exception as inner_e:
-                print(f"Metrics didn't calculate for {code}: {inner_e}")
-
-        #SARIMA forecast
-        model = SARIMAX(y, order=(1, 1, 1), seasonal_order=(1, 1, 1, m))
-        fit = model.fit(disp=False)
-        sarima_forecast = fit.forecast(steps=1)[0]
-        sarima_forecast = max(round(sarima_forecast, 0), 0)
-        sarima_val_terms, sarima_val_preds = None, None
-
-        if len(y) >= 4:
-            try:
-                train, test = y[:-2], y[-2:]
-                train_terms, test_terms = terms[:-2], terms[-2:]
-                model_eval = SARIMAX(train, order=(1, 1, 1), seasonal_order=(1, 1, 1, m)).fit()
-                preds = model_eval.forecast(steps=len(test))
-                test = np.ravel(test)
-                preds = np.ravel(preds)
-
-                sarima_mae = mean_absolute_error(test, preds)
-
-                all_MAES["sarima"].append(sarima_mae)
-                preds = [max(round(p, 0), 0) for p in preds]
-                sarima_val_terms = test_terms.tolist()
-                sarima_val_preds = preds
-                sarima_accuracy = 100 - (sarima_mae / y[-2:].mean() * 100)
-                models_accuracy.append(sarima_accuracy)
-                print(f"{code}: SARIMA MAE={sarima_mae:.1f}")
-            except Exception as inner_e:
-                print(f"Metrics didn't calculate for {code}: {inner_e}")
-
-        #ARIMAX forecast (uses prerequisite enrollment as exogenous variable)
-        model = ARIMA(y, exog=exog, order=(1, 1, 1))
-        fit = model.fit()
-        next_exog = exog[-1].reshape(1, -1)
-        arimax_forecast = fit.forecast(steps=1, exog=next_exog)[0]
-        arimax_forecast = max(round(arimax_forecast, 0), 0)
-        arimax_val_terms, arimax_val_preds = None, None
-
-        if len(y) >= 4:
-            try:
-                train, test = y[:-2], y[-2:]
-                train_exog, test_exog = exog[:-2], exog[-2:]
-                train_terms, test_terms = terms[:-2], terms[-2:]
-                model_eval = ARIMA(train, exog=train_exog, order=(1, 1, 1)).fit()
-                preds = model_eval.forecast(steps=len(test), exog=test_exog)
-                test = np.ravel(test)
-                preds = np.ravel(preds)
-
-                arimax_mae = mean_absolute_error(test, preds)
-
-                all_MAES.setdefault("arimax", []).append(arimax_mae)
-                preds = [max(round(p, 0), 0) for p in preds]
-                arimax_val_terms = test_terms.tolist()
-                arimax_val_preds = preds
-                arimax_accuracy = 100 - (arimax_mae / y[-2:].mean() * 100)
-                models_accuracy.append(arimax_accuracy)
-                print(f"{code}: ARIMAX MAE={arimax_mae:.1f}")
-            except Exception as inner_e:
-                print(f"Metrics didn't calculate for {code} (ARIMAX): {inner_e}")
-
-        #SARIMAX forecast
-        if code == "CSCE A201":
-            model = SARIMAX(y, exog=exog,
-                            order=(1, 1, 1),
-                            seasonal_order=(1, 0, 1, 2))
-        else:
-            model = SARIMAX(y, exog=exog,
-                            order=(1, 1, 1),
-                            seasonal_order=(1, 1, 1, m))
-
-        fit = model.fit(disp=False)
-        next_exog = exog[-1].reshape(1, -1)
-        sarimax_forecast = fit.forecast(steps=1, exog=next_exog)[0]
-        sarimax_forecast = max(round(sarimax_forecast, 0), 0)
-        sarimax_val_terms, sarimax_val_preds = None, None
-
-        #SARIMAX validation
-        if len(y) >= 4:
-            try:
-                train, test = y[:-2], y[-2:]
-                train_exog, test_exog = exog[:-2], exog[-2:]
-                train_terms, test_terms = terms[:-2], terms[-2:]
-
-                #Special case for A201 again in validation
-                if code == "CSCE A201":
-                    model_eval = SARIMAX(train, exog=train_exog,
-                                        order=(1, 1, 1),
-                                        seasonal_order=(1, 0, 1, 2)).fit()
-                else:
-                    model_eval = SARIMAX(train, exog=train_exog,
-                                        order=(1, 1, 1),
-                                        seasonal_order=(1, 1, 1, m)).fit()
-
-                preds = model_eval.forecast(steps=len(test), exog=test_exog)
-                test = np.ravel(test)
-                preds = np.ravel(preds)
-
-                sarimax_mae = mean_absolute_error(test, preds)
-
-                all_MAES["sarimax"].append(sarimax_mae)
-                preds = [max(round(p, 0), 0) for p in preds]
-                sarimax_val_terms = test_terms.tolist()
-                sarimax_val_preds = preds
-                sarimax_accuracy = 100 - (sarimax_mae / y[-2:].mean() * 100)
-                models_accuracy.append(sarimax_accuracy)
-
-                print(f"{code}: SARIMAX MAE={sarimax_mae:.1f}")
-
-            except Exception as inner_e:
-                print(f"Metrics didn't calculate for {code}: {inner_e}")
-
-
-        if arima_mae is not None:
-            arima_mae = round(arima_mae, 2)
-        if sarima_mae is not None:
-            sarima_mae = round(sarima_mae, 2)
-        if arimax_mae is not None: 
-            arimax_mae = round(arimax_mae, 2)
-        if sarimax_mae is not None:
-            sarimax_mae = round(sarimax_mae, 2)
-
-        best_accuracy = max(models_accuracy) if models_accuracy else None
-
-        group['year'] = group['term'] // 100
-        year_counts = group['year'].value_counts()
-
-        valid_years = []
-        for year, count in year_counts.items():
-            if count >= 2:
-                valid_years.append(year)
-                
-        yearly_totals = (
-            group[group['year'].isin(valid_years)]
-            .groupby('year')['enrolled']
-            .sum()
-            .to_dict()
-        )      
-        #json data storage
-        results.append({
-            "code": code,
-            "title": group['title'].iloc[0],
-            "term": next_term,
-            "term_name": term_name_from_code(next_term),
-            "arima_forecast": arima_forecast,
-            "sarima_forecast": sarima_forecast,
-            "arimax_forecast": arimax_forecast,
-            "sarimax_forecast": sarimax_forecast,
-            "arima_mae": arima_mae,
-            "sarima_mae": sarima_mae,
-            "arimax_mae": arimax_mae,
-            "sarimax_mae": sarimax_mae,
-            "arima_val_terms": arima_val_terms,
-            "arima_val_preds": arima_val_preds,
-            "sarima_val_terms": sarima_val_terms,
-            "sarima_val_preds": sarima_val_preds,
-            "arimax_val_terms": arimax_val_terms,
-            "arimax_val_preds": arimax_val_preds,
-            "sarimax_val_terms": sarimax_val_terms,
-            "sarimax_val_preds": sarimax_val_preds,
-            "yearly_course": yearly_course,
-            "best_accuracy": best_accuracy,
-            "yearly_totals": yearly_totals
-        })
+        fits = {}
+        for family in MODEL_FAMILIES:
+            fits[family] = fit_family(family, code, y, exog, terms, task["orders"][family],
+                                      task.get("rolling_folds", 0), budget)
+        result = course_result(task, fits)
+        result["fit_seconds"] = round(time.perf_counter() - start, 4)
+        return result
+
+    except FitTimeout:
+        print(f"{code} ran out of time after {time.perf_counter() - start:.1f}s, falling back.")
+        return {"code": code, "over_budget": "a model fit ran past its time limit or the run deadline"}
 
     except Exception as e:
         print(f"Error with {code}: {e}")
-
-forecast_df = pd.DataFrame(results)
-combined_df = pd.concat([df[['code', 'term', 'term_name', 'enrolled', 'title']], forecast_df])
-
-output_path = os.path.join("main", "forecast_data.json")
-combined_df.to_json(output_path, orient="records", indent=4)
-
-'''
-print(f"Saved combined data to {output_path}")
-print(f"Generated forecasts for {len(results)} courses.")
-
-#average model performance
-print("\n===== Average Model Performance =====")
-for model_name in ["arima", "sarima", "arimax", "sarimax"]:
-    mae_list = all_MAES.get(model_name, [])
-    if mae_list:
-        avg_mae = np.mean(mae_list)
-        print(f"{model_name.upper():6} → MAE={avg_mae:.1f}")
+        return None
+
+#yields forecast_course results serially or from a process pool as they finish
+#results come back in task (course) order either way, so the output is deterministic
+def iter_tasks(tasks, workers=1):
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield forecast_course(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(forecast_course, tasks)
+
+#runs forecast_course over every task
+#progress, if given, is called with the number of finished tasks
+def run_tasks(tasks, workers=1, progress=None):
+    outputs = []
+    for result in iter_tasks(tasks, workers):
+        outputs.append(result)
+        if progress:
+            progress(len(outputs))
+    return outputs
+
+#hash of everything a course's fit depends on: series, exog, orders and code version
+def task_cache_key(task):
+    digest = hashlib.sha256()
+    digest.update(CODE_VERSION.encode())
+    digest.update(json.dumps([
+        task["code"], task["title"], task["course_num"], task["orders"], task["rolling_folds"],
+        (task.get("budget") or {}).get("maxiter"),
+    ]).encode())
+    digest.update(np.ascontiguousarray(task["history"]['term'], dtype=np.int64).tobytes())
+    digest.update(np.ascontiguousarray(task["history"]['enrolled'], dtype=np.float64).tobytes())
+    if task["exog"] is not None:
+        digest.update(str(task["exog"].shape).encode())
+        digest.update(np.ascontiguousarray(task["exog"], dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+def load_fit_cache(path=FIT_CACHE_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable fit cache {path}: {e}")
+        return {}
+
+def save_fit_cache(cache, path=FIT_CACHE_PATH):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+#recent enrollment of a course (mean of its last three terms); under a run deadline
+#the biggest courses are fitted first
+def enrollment_priority(task):
+    return float(task["history"]['enrolled'].tail(3).mean())
+
+#stand-in result for a course that ran out of time: its last cached fit (even one for
+#older inputs) or, without one, a record with no model forecasts for the baselines to fill in
+def fallback_result(task, entry, reason):
+    if entry:
+        result = dict(entry["result"])
+        result["fallback"] = "cached"
+    else:
+        next_term, yearly_course = target_term(task["code"], task["course_num"], task["history"]['term'].tolist())
+        result = insufficient_result(task["code"], task["title"])
+        result.update(term=next_term, term_name=term_label(next_term), yearly_course=yearly_course)
+        result["fallback"] = "baseline"
+    result["fallback_reason"] = reason
+    return result
+
+#reuses cached results for unchanged courses and only fits the ones whose inputs changed
+#progress, if given, is called with (finished courses, total courses)
+#profile, if given, is told which courses were reused from the cache
+#on_result, if given, is called with each course's result in course order as soon as it is ready
+#prioritize fits the highest-enrollment courses first (for runs with a deadline)
+def run_tasks_cached(tasks, workers=1, use_cache=True, progress=None, profile=None, cache_path=FIT_CACHE_PATH,
+                     on_result=None, prioritize=False):
+    #the cache is read even when it isn't reused, as the fallback for courses that run out of time
+    cache = load_fit_cache(cache_path)
+    keys = [task_cache_key(task) for task in tasks]
+
+    results = [None] * len(tasks)
+    pending = []
+    for i, (task, key) in enumerate(zip(tasks, keys)):
+        entry = cache.get(task["code"])
+        if use_cache and entry and entry.get("key") == key:
+            results[i] = entry["result"]
+            if profile:
+                profile.cached.add(task["code"])
+        else:
+            pending.append(i)
+
+    print(f"Reusing {len(tasks) - len(pending)} cached course fits, fitting {len(pending)} courses.")
+    hits = len(tasks) - len(pending)
+    if progress:
+        progress(hits, len(tasks))
+    order = sorted(pending, key=lambda i: -enrollment_priority(tasks[i])) if prioritize else pending
+    fitted = iter_tasks([tasks[i] for i in order], workers)
+
+    #results are handed to on_result in course order, holding back any that finish early
+    pending_set = set(pending)
+    ready = [i not in pending_set for i in range(len(tasks))]
+    emitted = 0
+    for done, (i, result) in enumerate(zip(order, fitted), start=hits + 1):
+        if result is not None and "over_budget" in result:
+            result = fallback_result(tasks[i], cache.get(tasks[i]["code"]), result["over_budget"])
+        elif result is not None:
+            cache[tasks[i]["code"]] = {"key": keys[i], "result": json_safe(result)}
+        results[i] = result
+        ready[i] = True
+        if progress:
+            progress(done, len(tasks))
+        while emitted < len(tasks) and ready[emitted]:
+            if on_result and results[emitted] is not None:
+                on_result(results[emitted])
+            emitted += 1
+    while emitted < len(tasks):
+        if on_result and results[emitted] is not None:
+            on_result(results[emitted])
+        emitted += 1
+
+    fallbacks = [result["code"] for result in results if result and result.get("fallback")]
+    if fallbacks:
+        print(f"{len(fallbacks)} courses ran out of time and fell back to a cached or baseline forecast.")
+
+    if pending:
+        save_fit_cache(cache, cache_path)
+    return [result for result in results if result is not None]
+
+
+#loads courses, prerequisites and HS graduates from the database into DataFrames
+#subjects limits the courses to those subjects plus their prerequisites from any subject,
+#so a shard only holds its own part of the catalog in memory
+def load_frames(subjects=None):
+    from django.db.models import Q
+    from main.models import Course, Prerequisite, GraduationData
+
+    courses = Course.objects.all()
+    prereqs = Prerequisite.objects.all()
+    if subjects is not None:
+        course_in_subjects = Q(pk__in=[])
+        prereq_in_subjects = Q(pk__in=[])
+        for subject in subjects:
+            course_in_subjects |= Q(code__startswith=f"{subject} ")
+            prereq_in_subjects |= Q(course_code__startswith=f"{subject} ")
+        prereqs = prereqs.filter(prereq_in_subjects)
+        prereq_codes = {code for row in prereqs.values_list('prereq_1', 'prereq_2') for code in row if code}
+        courses = courses.filter(course_in_subjects | Q(code__in=prereq_codes))
+
+    return frames_from_rows(
+        courses.values('code', 'term', 'enrolled', 'title'),
+        prereqs.values('course_code', 'prereq_1', 'prereq_2'),
+        GraduationData.objects.all().values('year', 'graduates'),
+    )
+
+#cleans raw Course / Prerequisite / GraduationData rows (dicts) into the frames the models use
+def frames_from_rows(course_rows, prereq_rows, graduation_rows):
+    hs_map.clear()
+    hs_map.update({row['year']: row['graduates'] for row in graduation_rows})
+
+    #load data from the Course model
+    df = pd.DataFrame(list(course_rows), columns=['code', 'term', 'enrolled', 'title'])
+
+    #load prerequisite data into a DataFrame
+    prereq_df = pd.DataFrame(list(prereq_rows), columns=['course_code', 'prereq_1', 'prereq_2'])
+
+    #clean + sort chronologically (terms come in as ints; astype keeps the dtype for an empty frame)
+    df['term'] = df['term'].astype(int)
+    df['term_name'] = term_labels(df['term'].values)
+    #Add numeric course number column
+    df['course_num'] = df['code'].str.extract(COURSE_NUM_PATTERN)[0].astype(int)
+
+    #Remove Summer terms for upper-level courses (A211+)
+    df = df[~(
+        (df['course_num'] > 201) &
+        (df['term'] % 100 == SUMMER)
+    )]
+
+    df = df.sort_values(['code', 'term'])
+
+    prereq_map = prereq_df.set_index('course_code')[['prereq_1', 'prereq_2']].to_dict('index')
+    return df, prereq_map
+
+#identifies a forecast run; sorts chronologically
+def new_run_id():
+    return datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S%f")
+
+#writes the history rows followed by one forecast row per course (see main/artifacts.py)
+def write_artifact(df, results, output_path, run_id=None):
+    from main.artifacts import ArtifactWriter
+
+    with ArtifactWriter(output_path, run_id or new_run_id()) as writer:
+        writer.write_history(df)
+        for result in results:
+            writer.write(result)
+
+
+def run_forecasts(courses=None, workers=None, use_cache=True, output_path=None, progress=None,
+                  rolling_folds=0, order_mode=None, research_orders=False,
+                  maxiter=None, fit_seconds=None, run_seconds=None):
+    """
+    Fit every model family for each course and return the per-course results.
+
+    courses limits the run to those course codes. The forecast artifact is
+    written for full-catalog runs, or to output_path when one is given.
+    progress is called with (finished courses, total courses) as fits complete.
+    rolling_folds > 0 adds a warm-started rolling-origin validation per model.
+    order_mode "auto" uses searched per-course orders instead of the fixed ones
+    (settings.FORECAST_ORDER_MODE by default); research_orders redoes the search.
+    maxiter and fit_seconds limit each model fit and run_seconds the whole run
+    (settings.FORECAST_FIT_MAXITER, FORECAST_FIT_SECONDS and FORECAST_RUN_SECONDS
+    by default). Under a run deadline the highest-enrollment courses are fitted
+    first; courses that run out of time get their last cached fit or the
+    baseline forecasts instead, flagged with "fallback".
+    """
+    if workers is None:
+        workers = settings.FORECAST_WORKERS
+    if order_mode is None:
+        order_mode = settings.FORECAST_ORDER_MODE
+    if maxiter is None:
+        maxiter = settings.FORECAST_FIT_MAXITER
+    if fit_seconds is None:
+        fit_seconds = settings.FORECAST_FIT_SECONDS
+    if run_seconds is None:
+        run_seconds = settings.FORECAST_RUN_SECONDS
+    #the deadline covers the whole run: loading counts towards it, and the order search
+    #and the model fits stop starting new fits once it has passed
+    deadline = time.time() + run_seconds if run_seconds else None
+    budget = task_budget(maxiter, fit_seconds, deadline)
+
+    from main.profiling import RunProfile, partial_profile_path, summary_table
+    run_id = new_run_id()
+    profile = RunProfile(run_id if courses is None else None, workers)
+    profile.budget = {"maxiter": maxiter, "fit_seconds": fit_seconds, "run_seconds": run_seconds}
+
+    with profile.stage("load"):
+        df, prereq_map = load_frames()
+    if courses is not None:
+        df_run = df[df['code'].isin(list(courses))]
     else:
-        print(f"{model_name.upper():6} → No valid results")
-print("======================================\n")
-'''
+        df_run = df
+
+    with profile.stage("features"):
+        tasks = build_tasks(df, prereq_map, codes=courses, rolling_folds=rolling_folds)
+    if order_mode == "auto":
+        from main.order_search import choose_orders
+        with profile.stage("orders"):
+            choose_orders(tasks, settings.FORECAST_ORDER_CRITERION, workers, research=research_orders,
+                          budget=budget)
+    for task in tasks:
+        task["budget"] = budget
+
+    #baselines take milliseconds, so they are ready before fitting and go out with each course's result
+    from main.baselines import baseline_forecasts, merge_baselines
+    with profile.stage("baselines"):
+        baselines = baseline_forecasts(df_run)
+    #the best model is picked by the backtest when there is one (manage.py backtest_forecasts)
+    from main.backtest import backtest_scores, load_backtest
+    backtest = backtest_scores(load_backtest())
+
+    if output_path is None and courses is None:
+        output_path = str(settings.FORECAST_DATA_PATH)
+
+    #the artifact is streamed as courses finish and only replaces the old one once the run succeeds
+    with ExitStack() as stack:
+        writer = None
+        if output_path is not None:
+            from main.artifacts import ArtifactWriter
+            writer = stack.enter_context(ArtifactWriter(output_path, run_id))
+            with profile.stage("serialization"):
+                writer.write_history(df_run)
+
+        def on_result(result):
+            merge_baselines(result, baselines)
+            select_best_model(result, backtest)
+            if writer is not None:
+                with profile.stage("serialization"):
+                    writer.write(result)
+
+        with profile.stage("fitting"):
+            results = run_tasks_cached(tasks, workers, use_cache, progress, profile, on_result=on_result,
+                                       prioritize=deadline is not None)
+
+    #full-catalog runs become the run the webapp reads
+    if courses is None:
+        from main.models import ForecastResult
+        with profile.stage("database"):
+            ForecastResult.save_run(run_id, json_safe(results))
+
+    #a partial run's profile doesn't replace the one of the last full run
+    profile.add_courses(tasks, results)
+    print(summary_table(profile.save(None if courses is None else partial_profile_path())))
+
+    return results
+
+
+if __name__ == "__main__":
+    #running as a script: set up Django first
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Capstone.settings')
+    django.setup()
+
+    parser = argparse.ArgumentParser(description="Fit enrollment forecasts for every course.")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="number of worker processes used to fit courses (1 = run serially)"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="refit every course instead of reusing cached fits for unchanged courses"
+    )
+    parser.add_argument(
+        "--rolling-folds", type=int, default=0,
+        help="number of one-step rolling-origin validation folds per model (0 = off)"
+    )
+    parser.add_argument(
+        "--orders", choices=["fixed", "auto"], default=None,
+        help="fixed (1,1,1)(1,1,1,m) orders or searched per-course orders"
+    )
+    parser.add_argument(
+        "--research-orders", action="store_true",
+        help="search orders again instead of reusing the remembered ones (with --orders auto)"
+    )
+    parser.add_argument(
+        "--maxiter", type=int, default=None,
+        help="optimizer iteration limit per model fit"
+    )
+    parser.add_argument(
+        "--fit-seconds", type=float, default=None,
+        help="time limit per model fit, in seconds"
+    )
+    parser.add_argument(
+        "--run-seconds", type=float, default=None,
+        help="deadline for the whole run, in seconds; courses not fitted in time fall back"
+    )
+    args = parser.parse_args()
+    run_forecasts(
+        workers=args.workers, use_cache=not args.no_cache, rolling_folds=args.rolling_folds,
+        order_mode=args.orders, research_orders=args.research_orders,
+        maxiter=args.maxiter, fit_seconds=args.fit_seconds, run_seconds=args.run_seconds,
+    )
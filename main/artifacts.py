@@ -0,0 +1,96 @@
+"""
+Reading and writing the forecast artifact (forecast_data.json).
+
+The artifact is a single JSON object, {"run_id": ..., "format": 2, "records": [...]},
+holding the enrollment history rows followed by one forecast record per course.
+ArtifactWriter streams the records into a temporary file next to the artifact
+as they are produced, one compact record per line. When the run finishes it
+publishes the file with an atomic rename, so readers see either the previous
+run or the new one and never a partly written file. A run that fails leaves
+the previous artifact in place.
+"""
+import json
+import math
+import os
+import tempfile
+
+import numpy as np
+
+ARTIFACT_FORMAT = 2
+HISTORY_COLUMNS = ['code', 'term', 'term_name', 'enrolled', 'title']
+
+
+def json_safe(value):
+    """
+    Plain-Python copy of a record: numpy values unwrapped, NaN/inf as null.
+    """
+    if isinstance(value, dict):
+        return {str(k): json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [json_safe(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class ArtifactWriter:
+    """
+    Context manager that streams records into the artifact for one run.
+
+        with ArtifactWriter(path, run_id) as writer:
+            writer.write_history(df)
+            for result in results:
+                writer.write(result)
+    """
+
+    def __init__(self, path, run_id):
+        self.path = str(path)
+        self.run_id = run_id
+        self.count = 0
+        self._file = None
+        self._tmp_path = None
+
+    def __enter__(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, self._tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=os.path.basename(self.path) + ".", suffix=".tmp"
+        )
+        self._file = os.fdopen(fd, "w")
+        self._file.write(f'{{"run_id":{json.dumps(self.run_id)},"format":{ARTIFACT_FORMAT},"records":[')
+        return self
+
+    def write(self, record):
+        self._file.write("\n" if self.count == 0 else ",\n")
+        json.dump(json_safe(record), self._file, separators=(",", ":"), allow_nan=False)
+        self.count += 1
+
+    def write_history(self, df):
+        for row in df[HISTORY_COLUMNS].itertuples(index=False):
+            self.write(dict(zip(HISTORY_COLUMNS, row)))
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._file.close()
+            os.remove(self._tmp_path)
+            return False
+        self._file.write("\n]}\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.chmod(self._tmp_path, 0o644)
+        os.replace(self._tmp_path, self.path)
+        return False
+
+
+def read_artifact(path):
+    """
+    (run_id, records) of an artifact. Artifacts from before run ids were a bare
+    list of records; their run_id is None.
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return None, data
+    return data.get("run_id"), data["records"]
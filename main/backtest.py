@@ -0,0 +1,242 @@
+"""
+Rolling-origin backtesting for the ARIMA-family models.
+
+Every (course, model, fold) fit is an independent work unit, so folds run in
+parallel on a process pool. Errors for all courses are then scored at once
+from padded course x point matrices and written to BACKTEST_DATA_PATH.
+
+When that file exists, forecast runs pick each course's best model (and its
+best_accuracy) from the backtest MAE over all folds instead of the single
+two-term holdout; see backtest_scores() and arima.select_best_model().
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from sklearn.metrics import root_mean_squared_error
+
+from .arima import (
+    MODEL_FAMILIES, build_tasks, fit_within_budget, forecast_next, load_frames,
+    make_model, past_deadline, prepare_series, task_budget,
+)
+from .artifacts import json_safe
+
+WINDOWS = ("expanding", "rolling")
+
+
+def backtest_origins(n_obs, horizon=1, folds=4, min_train=4):
+    """
+    Forecast origins for the last `folds` folds: each fold trains on the terms
+    before its origin and forecasts the next `horizon` terms.
+    """
+    last_origin = n_obs - horizon
+    first_origin = max(last_origin - folds + 1, min_train)
+    return list(range(first_origin, last_origin + 1))
+
+
+def train_slice(origin, window="expanding", window_size=None):
+    if window == "rolling" and window_size:
+        return slice(max(origin - window_size, 0), origin)
+    return slice(0, origin)
+
+
+def build_units(tasks, horizon=1, folds=4, window="expanding", window_size=None, min_train=4, budget=None):
+    """
+    One work unit per (course, model, fold), each carrying just its own slices
+    and the fit budget (arima.task_budget).
+    """
+    units = []
+    for task in tasks:
+        series = prepare_series(task)
+        if series is None:
+            continue
+        y, exog, terms = series
+        for origin in backtest_origins(len(y), horizon, folds, min_train):
+            train = train_slice(origin, window, window_size)
+            test = slice(origin, origin + horizon)
+            for family in MODEL_FAMILIES:
+                units.append({
+                    "code": task["code"],
+                    "family": family,
+                    "origin": origin,
+                    "spec": task["orders"][family],
+                    "train_y": y[train],
+                    "train_exog": exog[train],
+                    "test_y": y[test],
+                    "test_exog": exog[test],
+                    "test_terms": terms[test].tolist(),
+                    "budget": budget,
+                })
+    return units
+
+
+def run_unit(unit):
+    """
+    Fit one fold and forecast its horizon; NaN predictions if the fit fails, runs
+    past its time limit, or the run deadline passed before it started.
+    """
+    budget = unit["budget"]
+    if past_deadline(budget):
+        return np.full(len(unit["test_y"]), np.nan)
+    try:
+        model = make_model(unit["family"], unit["train_y"], unit["train_exog"], unit["spec"])
+        fit = fit_within_budget(model, budget)
+        preds = forecast_next(unit["family"], fit, len(unit["test_y"]), unit["test_exog"])
+    except Exception as e:
+        print(f"Backtest fold failed for {unit['code']} ({unit['family'].upper()}) at {unit['origin']}: {e}")
+        preds = np.full(len(unit["test_y"]), np.nan)
+    return np.asarray(preds, dtype=float)
+
+
+def score(actual, preds):
+    """
+    MAE, RMSE and MAPE for every row of padded (series x point) matrices.
+
+    Rows without missing points are scored together by root_mean_squared_error;
+    rows with gaps (shorter histories, failed folds) use the NaN-aware formula.
+    """
+    errors = preds - actual
+    valid = ~np.isnan(errors)
+    counts = valid.sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mae = np.nanmean(np.abs(errors), axis=1)
+        rmse = np.sqrt(np.nanmean(errors ** 2, axis=1))
+        pct = np.where(actual != 0, np.abs(errors) / np.abs(actual), np.nan)
+        mape = np.nanmean(pct, axis=1) * 100
+
+    complete = counts == actual.shape[1]
+    if complete.any():
+        rmse[complete] = root_mean_squared_error(
+            actual[complete].T, preds[complete].T, multioutput="raw_values"
+        )
+    return mae, rmse, mape, counts
+
+
+def run_backtest(courses=None, horizon=1, folds=4, window="expanding", window_size=None,
+                 workers=None, output_path=None, maxiter=None, fit_seconds=None, run_seconds=None):
+    """
+    Backtest every model for each course and write per-course, per-model metrics.
+
+    maxiter and fit_seconds limit each fold's fit and run_seconds the whole
+    backtest, as in arima.run_forecasts() (settings by default); folds not fitted
+    in time are left unscored.
+    """
+    if window not in WINDOWS:
+        raise ValueError(f"window must be one of {WINDOWS}")
+    if workers is None:
+        workers = settings.FORECAST_WORKERS
+    if output_path is None:
+        output_path = str(settings.BACKTEST_DATA_PATH)
+    if maxiter is None:
+        maxiter = settings.FORECAST_FIT_MAXITER
+    if fit_seconds is None:
+        fit_seconds = settings.FORECAST_FIT_SECONDS
+    if run_seconds is None:
+        run_seconds = settings.FORECAST_RUN_SECONDS
+    budget = task_budget(maxiter, fit_seconds, time.time() + run_seconds if run_seconds else None)
+
+    df, prereq_map = load_frames()
+    tasks = build_tasks(df, prereq_map, codes=courses)
+    units = build_units(tasks, horizon, folds, window, window_size, budget=budget)
+
+    if workers <= 1 or len(units) <= 1:
+        outputs = [run_unit(unit) for unit in units]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outputs = list(executor.map(run_unit, units, chunksize=8))
+
+    #group fold results into one padded row per (course, model)
+    rows = {}
+    for unit, preds in zip(units, outputs):
+        row = rows.setdefault((unit["code"], unit["family"]), {"terms": [], "actual": [], "preds": []})
+        row["terms"].extend(unit["test_terms"])
+        row["actual"].extend(unit["test_y"].tolist())
+        row["preds"].extend(preds.tolist())
+
+    keys = list(rows)
+    width = max((len(rows[k]["actual"]) for k in keys), default=0)
+    actual = np.full((len(keys), width), np.nan)
+    preds = np.full((len(keys), width), np.nan)
+    for i, key in enumerate(keys):
+        n = len(rows[key]["actual"])
+        actual[i, :n] = rows[key]["actual"]
+        preds[i, :n] = rows[key]["preds"]
+
+    mae, rmse, mape, counts = score(actual, preds)
+
+    records = []
+    for i, (code, family) in enumerate(keys):
+        records.append({
+            "code": code,
+            "model": family,
+            "window": window,
+            "horizon": horizon,
+            "folds": len(rows[(code, family)]["terms"]) // horizon,
+            "points": int(counts[i]),
+            "mae": round(float(mae[i]), 2) if counts[i] else None,
+            "rmse": round(float(rmse[i]), 2) if counts[i] else None,
+            "mape": round(float(mape[i]), 2) if counts[i] and not np.isnan(mape[i]) else None,
+            "terms": rows[(code, family)]["terms"],
+            "actual": rows[(code, family)]["actual"],
+            "preds": [None if np.isnan(p) else max(round(p, 0), 0) for p in rows[(code, family)]["preds"]],
+        })
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(json_safe(records), f)
+    os.replace(tmp_path, output_path)
+    return records
+
+
+def load_backtest(path=None):
+    """
+    The records of the last backtest, or None if there isn't a readable one.
+    """
+    path = path or str(settings.BACKTEST_DATA_PATH)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable backtest {path}: {e}")
+        return None
+
+
+def backtest_scores(records):
+    """
+    {code: {model: {"mae", "accuracy", "folds", "points"}}} of backtest records, with
+    accuracy defined as for the holdout (100 minus MAE as a percentage of the
+    mean actual enrollment).
+    """
+    scores = {}
+    for record in records or []:
+        if record["mae"] is None:
+            continue
+        actual = [value for value in record["actual"] if value is not None]
+        mean_actual = float(np.mean(actual)) if actual else 0.0
+        scores.setdefault(record["code"], {})[record["model"]] = {
+            "mae": record["mae"],
+            "accuracy": 100 - (record["mae"] / mean_actual * 100) if mean_actual else None,
+            "folds": record["folds"],
+            "points": record["points"],
+        }
+    return scores
+
+
+def best_models(records):
+    """
+    Lowest backtest MAE model per course.
+    """
+    best = {}
+    for record in records:
+        if record["mae"] is None:
+            continue
+        current = best.get(record["code"])
+        if current is None or record["mae"] < current["mae"]:
+            best[record["code"]] = record
+    return {code: record["model"] for code, record in best.items()}
@@ -0,0 +1,222 @@
+"""
+Fast baseline forecasts for every course at once.
+
+Each course's enrollment series is laid out as one row of a course x term
+matrix (left-aligned, NaN past the end of the row) and the baselines run as
+NumPy operations over all rows together: seasonal naive, moving average over
+one season, simple exponential smoothing and additive Holt-Winters. The
+seasonal period follows the SARIMA models (seasonal_period). Smoothing
+parameters are picked per course from a small grid by in-sample one-step
+error, evaluated for the whole grid at once.
+
+Like the ARIMA-family models, each baseline is validated by forecasting the
+last two terms from the rest of the series.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .arima import COURSE_NUM_PATTERN, seasonal_period, target_term
+from .terms import label as term_label
+
+BASELINE_FAMILIES = ["seasonal_naive", "moving_average", "ses", "holt_winters"]
+#terms held out to validate each baseline, same as the ARIMA-family models
+HOLDOUT = 2
+SES_ALPHAS = np.linspace(0.1, 0.9, 9)
+HW_GRID = list(itertools.product((0.2, 0.5, 0.8), (0.05, 0.2), (0.1, 0.3)))
+
+
+def series_matrix(df):
+    """
+    Course x position matrices of enrollment and term codes from a (code, term,
+    enrolled) frame, plus each course's code, series length and seasonal period.
+    """
+    df = df.sort_values(['code', 'term'])
+    codes, rows = np.unique(df['code'].to_numpy(), return_inverse=True)
+    cols = df.groupby('code').cumcount().to_numpy()
+    lengths = np.bincount(rows, minlength=len(codes))
+
+    values = np.full((len(codes), lengths.max() if len(codes) else 0), np.nan)
+    terms = np.zeros(values.shape, dtype=np.int64)
+    values[rows, cols] = df['enrolled'].to_numpy(dtype=float)
+    terms[rows, cols] = df['term'].to_numpy(dtype=np.int64)
+
+    course_nums = pd.Series(codes).str.extract(COURSE_NUM_PATTERN)[0].astype(int).to_numpy()
+    periods = np.array([seasonal_period(num) for num in course_nums], dtype=np.int64)
+    return values, terms, codes, lengths, periods, course_nums
+
+
+def _at(values, idx):
+    """
+    values[i, idx[i, h]] for every row i and step h.
+    """
+    return np.take_along_axis(values, np.clip(idx, 0, values.shape[1] - 1), axis=1)
+
+
+def seasonal_naive(values, lengths, periods, steps):
+    """
+    Repeats the last observed season; the last value when there is less than one season.
+    """
+    h = np.arange(steps)[None, :]
+    n, m = lengths[:, None], periods[:, None]
+    idx = np.where(n >= m, n - m + h % m, n - 1)
+    return np.where(n >= 1, _at(values, idx), np.nan)
+
+
+def moving_average(values, lengths, periods, steps):
+    """
+    Mean of the last season's worth of terms, flat over the horizon.
+    """
+    cumulative = np.concatenate([np.zeros((len(values), 1)), np.nancumsum(values, axis=1)], axis=1)
+    window = np.minimum(periods, lengths)
+    rows = np.arange(len(values))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (cumulative[rows, lengths] - cumulative[rows, lengths - window]) / window
+    return np.repeat(mean[:, None], steps, axis=1)
+
+
+def ses(values, lengths, steps, alphas=SES_ALPHAS):
+    """
+    Simple exponential smoothing with alpha chosen per course from `alphas`.
+    """
+    alphas = np.asarray(alphas)[:, None]
+    level = np.broadcast_to(values[:, 0], (len(alphas), len(values))).copy()
+    sse = np.zeros_like(level)
+    for t in range(1, values.shape[1]):
+        active = t < lengths
+        error = values[:, t] - level
+        sse += np.where(active, error ** 2, 0)
+        level = np.where(active, level + alphas * error, level)
+
+    best = np.argmin(sse, axis=0)
+    forecast = level[best, np.arange(len(values))]
+    forecast = np.where(lengths >= 1, forecast, np.nan)
+    return np.repeat(forecast[:, None], steps, axis=1)
+
+
+def _holt_winters_period(values, lengths, m, steps, grid):
+    """
+    Additive Holt-Winters for rows sharing seasonal period m, over a (alpha, beta, gamma) grid.
+    """
+    n_rows = len(values)
+    alpha, beta, gamma = (np.array(p)[:, None] for p in zip(*grid))
+    forecasts = np.full((n_rows, steps), np.nan)
+    usable = lengths >= 2 * m
+    if not usable.any():
+        return forecasts
+
+    first = values[:, :m].mean(axis=1)
+    second = values[:, m:2 * m].mean(axis=1)
+    level = np.broadcast_to(first, (len(grid), n_rows)).copy()
+    trend = np.broadcast_to((second - first) / m, (len(grid), n_rows)).copy()
+    season = np.broadcast_to(values[:, :m] - first[:, None], (len(grid), n_rows, m)).copy()
+    sse = np.zeros((len(grid), n_rows))
+
+    for t in range(m, values.shape[1]):
+        active = t < lengths
+        y = values[:, t]
+        s = season[:, :, t % m]
+        error = y - (level + trend + s)
+        sse += np.where(active, error ** 2, 0)
+        new_level = alpha * (y - s) + (1 - alpha) * (level + trend)
+        new_trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, :, t % m] = np.where(active, gamma * (y - new_level) + (1 - gamma) * s, s)
+        level = np.where(active, new_level, level)
+        trend = np.where(active, new_trend, trend)
+
+    best = np.argmin(np.where(np.isnan(sse), np.inf, sse), axis=0)
+    rows = np.arange(n_rows)
+    h = np.arange(1, steps + 1)[None, :]
+    positions = (lengths[:, None] + h - 1) % m
+    forecasts = (level[best, rows][:, None] + h * trend[best, rows][:, None]
+                 + season[best, rows][rows[:, None], positions])
+    forecasts[~usable] = np.nan
+    return forecasts
+
+
+def holt_winters(values, lengths, periods, steps, grid=HW_GRID):
+    """
+    Additive Holt-Winters; NaN for courses with fewer than two seasons of history.
+    """
+    forecasts = np.full((len(values), steps), np.nan)
+    for m in np.unique(periods):
+        rows = periods == m
+        forecasts[rows] = _holt_winters_period(values[rows], lengths[rows], int(m), steps, grid)
+    return forecasts
+
+
+def forecast_all(values, lengths, periods, steps):
+    """
+    {family: (courses x steps) forecasts} for every baseline.
+    """
+    return {
+        "seasonal_naive": seasonal_naive(values, lengths, periods, steps),
+        "moving_average": moving_average(values, lengths, periods, steps),
+        "ses": ses(values, lengths, steps),
+        "holt_winters": holt_winters(values, lengths, periods, steps),
+    }
+
+
+def _rounded(value):
+    return None if np.isnan(value) else max(round(float(value), 0), 0)
+
+
+def baseline_forecasts(df):
+    """
+    {code: {<family>_forecast, <family>_mae, <family>_val_terms, <family>_val_preds, ...}}
+    for every course in a (code, term, enrolled) frame, plus the target term.
+    """
+    values, terms, codes, lengths, periods, course_nums = series_matrix(df)
+    if not len(codes):
+        return {}
+
+    nexts = forecast_all(values, lengths, periods, 1)
+    train_lengths = np.maximum(lengths - HOLDOUT, 0)
+    holdout = forecast_all(values, train_lengths, periods, HOLDOUT)
+    test_idx = train_lengths[:, None] + np.arange(HOLDOUT)[None, :]
+    actual = _at(values, test_idx)
+    test_terms = _at(terms, test_idx)
+    has_holdout = train_lengths >= 2
+
+    results = {}
+    for i, code in enumerate(codes):
+        next_term, yearly_course = target_term(code, int(course_nums[i]), terms[i, :lengths[i]].tolist())
+        record = {
+            "code": code,
+            "term": next_term,
+            "term_name": term_label(next_term),
+            "yearly_course": yearly_course,
+        }
+        for family in BASELINE_FAMILIES:
+            preds = holdout[family][i]
+            validated = has_holdout[i] and not np.isnan(preds).any()
+            record[f"{family}_forecast"] = _rounded(nexts[family][i, 0])
+            record[f"{family}_mae"] = round(float(np.abs(preds - actual[i]).mean()), 2) if validated else None
+            record[f"{family}_val_terms"] = test_terms[i].tolist() if validated else None
+            record[f"{family}_val_preds"] = [_rounded(p) for p in preds] if validated else None
+        results[code] = record
+    return results
+
+
+def merge_baselines(result, baselines):
+    """
+    Add a course's baseline forecasts and errors (from baseline_forecasts) to its
+    ARIMA-family result.
+    """
+    if result.get("term") is None or result["code"] not in baselines:
+        return result
+    for key, value in baselines[result["code"]].items():
+        if key.startswith(tuple(BASELINE_FAMILIES)):
+            result[key] = value
+    return result
+
+
+def attach_baselines(results, df):
+    """
+    Add each course's baseline forecasts and errors to its ARIMA-family result.
+    """
+    baselines = baseline_forecasts(df)
+    for result in results:
+        merge_baselines(result, baselines)
+    return results
@@ -0,0 +1,217 @@
+"""
+Benchmark of the forecasting pipeline on synthetic catalogs.
+
+Each case generates Course / Prerequisite / GraduationData rows for a given
+number of courses, terms and prerequisite density, then times the pipeline
+stage by stage (load, features, validation, fitting, serialization) and
+records wall time, peak traced memory and fit throughput. Results are written
+to BENCHMARK_DATA_PATH so runs can be compared across code changes.
+"""
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+from django.conf import settings
+
+from .arima import (
+    CODE_VERSION, MODEL_FAMILIES, build_tasks, course_result, fit_full, frames_from_rows,
+    prepare_series, validate_family, write_artifact,
+)
+from .artifacts import json_safe
+from .terms import shift, term_range
+
+STAGES = ("load", "features", "validation", "fitting", "serialization")
+DEFAULT_COURSES = (10, 100, 1000, 5000)
+DEFAULT_TERMS = (15,)
+DEFAULT_DENSITIES = (0.5,)
+#last synthetic term; histories run backwards from here
+LAST_TERM = 202503
+#course numbers per synthetic subject before moving on to the next one
+COURSES_PER_SUBJECT = 400
+
+
+def synthetic_terms(n_terms, last_term=LAST_TERM):
+    """
+    The n_terms consecutive Spring/Summer/Fall term codes ending at last_term.
+    """
+    return term_range(shift(last_term, 1 - n_terms), last_term).tolist()
+
+
+def synthetic_rows(n_courses, n_terms=15, prereq_density=0.5, seed=0):
+    """
+    Course, Prerequisite and GraduationData rows for a synthetic catalog.
+
+    Enrollment is a seasonal level with a small trend and noise; each course has a
+    prerequisite (a lower-numbered course in its subject) with probability
+    prereq_density, and a second one with the same probability again.
+    """
+    rng = np.random.default_rng(seed)
+    terms = synthetic_terms(n_terms)
+    term_arr = np.array(terms)
+    season = np.array([1.0, 0.4, 1.1])[term_arr % 100 - 1]
+    step = np.arange(n_terms)
+
+    codes = [f"SYN{i // COURSES_PER_SUBJECT} A{101 + i % COURSES_PER_SUBJECT}" for i in range(n_courses)]
+    level = rng.uniform(10, 200, n_courses)
+    trend = rng.normal(0, 0.02, n_courses)
+    noise = rng.normal(0, 0.1, (n_courses, n_terms))
+    enrolled = np.maximum(
+        np.rint(level[:, None] * season[None, :] * (1 + trend[:, None] * step[None, :] + noise)), 0
+    ).astype(int)
+
+    course_rows = []
+    for i, code in enumerate(codes):
+        title = f"Synthetic Course {i}"
+        for j, term in enumerate(terms):
+            course_rows.append({'code': code, 'term': int(term), 'enrolled': int(enrolled[i, j]), 'title': title})
+
+    prereq_rows = []
+    for i, code in enumerate(codes):
+        first = i - i % COURSES_PER_SUBJECT
+        if i == first or rng.random() >= prereq_density:
+            continue
+        prereq_1 = codes[rng.integers(first, i)]
+        prereq_2 = codes[rng.integers(first, i)] if rng.random() < prereq_density else None
+        prereq_rows.append({'course_code': code, 'prereq_1': prereq_1, 'prereq_2': prereq_2})
+
+    years = range(terms[0] // 100 - 1, terms[-1] // 100 + 1)
+    graduation_rows = [{'year': year, 'graduates': int(rng.integers(7000, 9000))} for year in years]
+    return course_rows, prereq_rows, graduation_rows
+
+
+def _measure(stats, stage, track_memory, func, *args):
+    if track_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if track_memory else None
+        if track_memory:
+            tracemalloc.stop()
+        stats[stage] = {
+            "seconds": round(seconds, 4),
+            "peak_mb": round(peak / 2 ** 20, 2) if peak is not None else None,
+        }
+
+
+def _validate_all(series):
+    validations = {}
+    for code, (task, (y, exog, terms)) in series.items():
+        validations[code] = {
+            family: validate_family(family, code, y, exog, terms, task["orders"][family])
+            for family in MODEL_FAMILIES
+        }
+    return validations
+
+
+def _fit_all(series, validations):
+    fits = {}
+    for code, (task, (y, exog, terms)) in series.items():
+        fits[code] = {}
+        for family, validation in validations[code].items():
+            try:
+                _, full = fit_full(family, y, exog, task["orders"][family])
+                fits[code][family] = {**full, **validation}
+            except Exception as e:
+                print(f"Benchmark fit failed for {code} ({family.upper()}): {e}")
+    return fits
+
+
+def _serialize(df, series, validated):
+    results = [
+        course_result(task, validated[code])
+        for code, (task, _) in series.items()
+        if len(validated[code]) == len(MODEL_FAMILIES)
+    ]
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        write_artifact(df, json_safe(results), path)
+        return os.path.getsize(path)
+    finally:
+        os.remove(path)
+
+
+def run_case(n_courses, n_terms=15, prereq_density=0.5, fit_sample=None, seed=0, track_memory=True):
+    """
+    Benchmark one synthetic catalog. fit_sample caps how many courses are fitted
+    and validated, so large catalogs still time load and features in full.
+    """
+    rows = synthetic_rows(n_courses, n_terms, prereq_density, seed)
+    stages = {}
+
+    df, prereq_map = _measure(stages, "load", track_memory, frames_from_rows, *rows)
+
+    def features():
+        tasks = build_tasks(df, prereq_map)
+        return {task["code"]: (task, prepare_series(task)) for task in tasks}
+    prepared = _measure(stages, "features", track_memory, features)
+
+    codes = [code for code, (_, s) in prepared.items() if s is not None]
+    if fit_sample is not None:
+        codes = codes[:fit_sample]
+    series = {code: prepared[code] for code in codes}
+
+    validations = _measure(stages, "validation", track_memory, _validate_all, series)
+    fits = _measure(stages, "fitting", track_memory, _fit_all, series, validations)
+    artifact_bytes = _measure(stages, "serialization", track_memory, _serialize,
+                              df[df['code'].isin(codes)], series, fits)
+
+    n_fits = sum(len(f) for f in fits.values())
+    #validation fits are counted on their own: a family whose holdout fit failed still gets a full fit
+    n_val_fits = sum(v["mae"] is not None for families in validations.values() for v in families.values())
+    fit_seconds = stages["fitting"]["seconds"]
+    val_seconds = stages["validation"]["seconds"]
+    return {
+        "courses": n_courses,
+        "terms": n_terms,
+        "prereq_density": prereq_density,
+        "rows": len(rows[0]),
+        "fitted_courses": len(codes),
+        "fits": n_fits,
+        "fits_per_sec": round(n_fits / fit_seconds, 2) if fit_seconds else None,
+        "validation_fits": n_val_fits,
+        "validation_fits_per_sec": round(n_val_fits / val_seconds, 2) if val_seconds else None,
+        "artifact_bytes": artifact_bytes,
+        "stages": stages,
+    }
+
+
+def run_benchmark(courses=DEFAULT_COURSES, terms=DEFAULT_TERMS, densities=DEFAULT_DENSITIES,
+                  fit_sample=50, seed=0, track_memory=True, output_path=None, progress=None):
+    """
+    Run every (courses, terms, density) case and write the results as JSON.
+
+    progress, if given, is called with each finished case.
+    """
+    if output_path is None:
+        output_path = str(settings.BENCHMARK_DATA_PATH)
+
+    cases = []
+    for n_courses in courses:
+        for n_terms in terms:
+            for density in densities:
+                case = run_case(n_courses, n_terms, density, fit_sample, seed, track_memory)
+                cases.append(case)
+                if progress:
+                    progress(case)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "code_version": CODE_VERSION,
+        "fit_sample": fit_sample,
+        "seed": seed,
+        "track_memory": track_memory,
+        "cases": cases,
+    }
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, output_path)
+    return report
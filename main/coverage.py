@@ -0,0 +1,60 @@
+"""
+Index of which terms each subject has in the Course table.
+
+home() needs to know whether any of the last five years of terms still have
+to be scraped. Instead of scanning the Course table on every request, the
+{subject: terms} index is built with one aggregate query and kept in Django's
+cache. Every write path clears it once per batch of rows, through
+Course.data_changed() (per-row signals would turn a catalog-wide delete into
+one query per row). The cache entry also expires after COVERAGE_SECONDS, so
+writes made by another process show up here too.
+"""
+from django.core.cache import cache
+from django.db.models import Value
+from django.db.models.functions import StrIndex, Substr
+
+from .models import Course
+from .terms import recent_terms
+
+CACHE_KEY = "main:term_coverage"
+COVERAGE_SECONDS = 300
+
+
+def term_coverage():
+    """
+    {subject: set of term codes with at least one course}, from the cache when it's there.
+    """
+    coverage = cache.get(CACHE_KEY)
+    if coverage is None:
+        coverage = {}
+        rows = (Course.objects
+                .annotate(subject=Substr('code', 1, StrIndex('code', Value(' ')) - 1))
+                .values_list('subject', 'term')
+                .distinct())
+        for subject, term in rows:
+            coverage.setdefault(subject, set()).add(term)
+        cache.set(CACHE_KEY, coverage, COVERAGE_SECONDS)
+    return coverage
+
+
+def missing_terms(subjects=None, years=5):
+    """
+    {subject: [term codes not scraped yet]} over the last `years` years, for the
+    given subjects (settings.FORECAST_SUBJECTS by default); subjects with every
+    term are left out.
+    """
+    if subjects is None:
+        from django.conf import settings
+        subjects = settings.FORECAST_SUBJECTS
+    expected = recent_terms(years=years).tolist()
+    coverage = term_coverage()
+    missing = {}
+    for subject in subjects:
+        terms = [term for term in expected if term not in coverage.get(subject, set())]
+        if terms:
+            missing[subject] = terms
+    return missing
+
+
+def invalidate():
+    cache.delete(CACHE_KEY)
@@ -1,41 +1,9 @@
-import requests
-from bs4 import BeautifulSoup
 from collections import defaultdict
 import re
-from datetime import datetime
 
 
-def build_term_codes_past_years(years=5, include_current=True):
-    now = datetime.now()    #get the current semester
-    y_now = now.year
-    m = now.month #determine whether its spring/summer/fall
-    
-    # Determine current semester codes
-    if m <= 4:
-        sem_now = "01" 
-    elif m <= 8:
-        sem_now = "02"
-    else:
-        sem_now = "03"
-    cutoff = int(str(y_now) + sem_now)  #e.g., 202503
-
-    semester_map = {"01": "Spring", "02": "Summer", "03": "Fall"}   #setup term labels
-    terms = []
-    start_year = y_now - (years - 1)    #e.g. if years = 5 and it's 2025 then start_year = 2021
-
-    #Build all terms for the last n years
-    for year in range(start_year, y_now + 1):
-        for sem in ("01", "02", "03"):
-            code = str(year) + sem
-            code_int = int(code)
-            #excludes future zero enrolled terms
-            if code_int > cutoff: 
-                continue
-            label = semester_map[sem] + " " + str(year)
-            terms.append((code, label))  #oldest -> newest
-    return terms
-
 def schedule_scraper(term="202503", subj="CSCE"):
+    import requests   #imported here so loading the app doesn't pull in the HTTP stack
     url = "https://curric.uaa.alaska.edu/ajax/ajaxScheduleSearch.php"   #API url might change in the near future a point of failure
     params = {"term": term, "subj": subj}
     
@@ -49,7 +17,7 @@ def schedule_scraper(term="202503", subj="CSCE"):
     rows = response.json()  #convert json array of objects to python list of dictionaries
     totals = defaultdict(int)   #totals keep track of total students per course, each new key value is set to 0
     for row in rows:    #iterates through the dictonaries to extract subject, course, title, and enrollment number
-        if row.get("subj").upper() == "CSCE":   #only for CSCE
+        if (row.get("subj") or "").upper() == subj.upper():   #only for the requested subject
             crs = row["crs"].upper()
             if not crs.endswith("L"):   #if it is a lab it skips (since the same students in the lab class are in the normal class)
                 num = int(re.search(r'\d+', crs).group())  #regular expression that finds the string of numbers, and converts to integers
@@ -0,0 +1,157 @@
+"""
+Bulk CSV ingestion for the data page upload.
+
+The upload has the layout download_data() exports: Code, Title, then one
+column per term code with that term's enrollment ("-" or blank for none).
+The file is read line by line and handled CHUNK_ROWS rows at a time. Each
+chunk is validated as a batch, compared against the rows already stored for
+its courses with one query, and only the new or changed cells are upserted
+with a single bulk_create(update_conflicts=True) inside one transaction, so
+a failure partway through never leaves half a chunk written.
+
+Like every Course write path, ingest_csv() then calls Course.data_changed()
+once to clear the term coverage index and bump the payload caches. It reports which courses changed so the
+caller can queue the forecast recompute (the fit cache then refits only the
+courses whose data changed).
+"""
+import codecs
+import csv
+import re
+from itertools import islice
+
+from django.db import DatabaseError, transaction
+
+from .models import Course
+from .terms import is_term
+
+#CSV rows per chunk (each row holds one course's cells for every term column)
+CHUNK_ROWS = 500
+TERM_RE = re.compile(r'\d{6}')
+
+
+class IngestError(Exception):
+    """
+    The file can't be ingested (bad header or encoding, or a chunk failed to
+    save). result holds the chunks already committed before the problem.
+    """
+    def __init__(self, message, result):
+        super().__init__(message)
+        self.result = result
+
+
+class IngestResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.changed_courses = set()
+
+    @property
+    def changed(self):
+        return self.created + self.updated
+
+    def summary(self):
+        return (f"{self.created} added, {self.updated} updated, {self.unchanged} unchanged, "
+                f"{self.skipped} skipped")
+
+
+def sanitize_csv_value(value):
+    if value and value[0] in ('=', '+', '-', '@'):
+        value = "'" + value
+    return value.strip()
+
+
+def parse_chunk(rows, term_columns, result):
+    """
+    {(code, term): (title, enrolled)} for the cells of a chunk of CSV rows
+    (dicts keyed by the header). Rows without a code or title and cells that
+    aren't whole numbers are counted as skipped; a cell repeated later in the
+    chunk wins, as it would when saved one at a time.
+    """
+    cells = {}
+    for row in rows:
+        code = sanitize_csv_value(row.get('Code') or '')
+        title = sanitize_csv_value(row.get('Title') or '')
+        if not code or not title:
+            result.skipped += 1
+            continue
+
+        for column, term in term_columns:
+            enrolled = (row.get(column) or '').strip()
+            if enrolled in ('', '-'):
+                continue
+            try:
+                cells[(code, term)] = (title, int(enrolled))
+            except ValueError:
+                result.skipped += 1
+    return cells
+
+
+def save_chunk(cells, result):
+    """
+    Upsert the cells that differ from what's stored, in one transaction. The
+    counts go into result only once the transaction has committed.
+    """
+    if not cells:
+        return
+    created = updated = unchanged = 0
+    changed_courses = set()
+    with transaction.atomic():
+        stored = {
+            (code, term): (title, enrolled)
+            for code, term, title, enrolled in Course.objects
+            .filter(code__in={code for code, _ in cells})
+            .values_list('code', 'term', 'title', 'enrolled')
+        }
+        rows = []
+        for (code, term), (title, enrolled) in cells.items():
+            current = stored.get((code, term))
+            if current == (title, enrolled):
+                unchanged += 1
+                continue
+            if current is None:
+                created += 1
+            else:
+                updated += 1
+            changed_courses.add(code)
+            rows.append(Course(code=code, term=term, title=title, enrolled=enrolled))
+
+        Course.objects.bulk_create(rows, batch_size=CHUNK_ROWS, update_conflicts=True,
+                                   unique_fields=['code', 'term'], update_fields=['title', 'enrolled'])
+    result.created += created
+    result.updated += updated
+    result.unchanged += unchanged
+    result.changed_courses |= changed_courses
+
+
+def ingest_csv(file, chunk_rows=CHUNK_ROWS):
+    """
+    Ingest an uploaded CSV file (any iterable of UTF-8 encoded lines) and
+    return an IngestResult. Raises IngestError for a file it can't read or save.
+    """
+    result = IngestResult()
+    reader = csv.DictReader(codecs.iterdecode(file, 'utf-8'))
+    try:
+        if not reader.fieldnames or len(reader.fieldnames) < 3:
+            raise IngestError("CSV must have at least Code, Title, and one Term column.", result)
+        bad_terms = [column for column in reader.fieldnames[2:]
+                     if not TERM_RE.fullmatch(column.strip()) or not is_term(int(column))]
+        if bad_terms:
+            raise IngestError(f"Term columns must be term codes like 202503, not: {', '.join(bad_terms)}",
+                              result)
+        term_columns = [(column, int(column)) for column in reader.fieldnames[2:]]
+
+        while True:
+            chunk = list(islice(reader, chunk_rows))
+            if not chunk:
+                break
+            save_chunk(parse_chunk(chunk, term_columns, result), result)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise IngestError(f"Error reading CSV: {e}", result) from e
+    except DatabaseError as e:
+        raise IngestError(f"Error saving CSV: {e}", result) from e
+    finally:
+        if result.changed:
+            Course.data_changed()
+    return result
@@ -0,0 +1,325 @@
+"""
+Local background job runner backed by the BackgroundJob table.
+
+Views call enqueue() and return right away. Requests that arrive while a job of
+the same kind is still pending are merged into that job, and only one job runs
+at a time across every process sharing the database.
+
+Startup work is a job too: the one-time "bootstrap" job scrapes the
+prerequisite catalog. It is queued by ensure_bootstrapped() or run by
+manage.py bootstrap, never as a side effect of loading Django.
+
+Page views that notice missing data (terms not scraped yet, no saved forecast
+run) use enqueue_once(), which queues nothing while a job of that kind is
+pending or running (single flight) or finished recently, so the network is
+never hit from the request itself.
+"""
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Exists, F
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+#how often the runner re-checks for work while another process holds the lock
+POLL_SECONDS = 2
+#a running job whose owner can't be checked from here (another host) is treated as crashed
+#once its heartbeat is this old; jobs of this host are failed only when their process is gone
+STALE_AFTER = timedelta(minutes=30)
+#how often a running job's heartbeat is refreshed, whatever the handler is doing
+HEARTBEAT_SECONDS = 60
+#how long after a missing-terms scrape before page views may queue another one
+#(terms the schedule API has no data for yet would otherwise be retried on every visit)
+SCRAPE_MISSING_COOLDOWN = timedelta(hours=1)
+#same for the first forecast run of a database that has course data but no saved run,
+#so a run that keeps failing isn't retried on every visit
+FIRST_RUN_COOLDOWN = timedelta(hours=1)
+#and for the bootstrap scrape while the prerequisite table is still empty (offline, or a
+#catalog that keeps failing to parse, would otherwise rescrape everything on every visit)
+BOOTSTRAP_COOLDOWN = timedelta(hours=1)
+
+#recorded on the jobs this process claims
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+_runner_lock = threading.Lock()
+_claim_lock = threading.Lock()
+_runner_thread = None
+#pk of the job this process is running, if any
+_current_job = None
+#set once this process has seen the bootstrap done, so later checks skip the database
+_bootstrapped = False
+
+
+def _run_forecast_job(job, progress):
+    from .arima import run_forecasts
+    run_forecasts(progress=progress)
+
+
+def _run_rescrape_job(job, progress):
+    from .models import Course
+    Course.objects.all().delete()
+    Course.data_changed()
+    Course.save_courses(progress=progress)
+    enqueue("forecast", reason="rescrape finished")
+
+
+def _run_scrape_missing_job(job, progress):
+    from .models import Course
+    if Course.save_courses(progress=progress):
+        enqueue("forecast", reason="missing terms scraped")
+
+
+def _run_bootstrap_job(job, progress):
+    from .models import Prerequisite
+    from .prereq_scraper import build_subject_prereq_maps
+    Prerequisite.scrape_if_empty(lambda: build_subject_prereq_maps(progress=progress))
+
+
+JOB_HANDLERS = {
+    "forecast": _run_forecast_job,
+    "rescrape": _run_rescrape_job,
+    "bootstrap": _run_bootstrap_job,
+    "scrape_missing": _run_scrape_missing_job,
+}
+
+
+def enqueue(kind, reason="", start=True):
+    """
+    Queue a job of the given kind, merging it into an already pending one.
+    start=False leaves running it to the caller (e.g. run_pending_jobs()).
+    """
+    with transaction.atomic():
+        job = BackgroundJob.objects.filter(kind=kind, status=BackgroundJob.PENDING).order_by('pk').first()
+        if job:
+            BackgroundJob.objects.filter(pk=job.pk).update(
+                triggers=F('triggers') + 1,
+                reason=(job.reason + "; " + reason) if job.reason and reason else (job.reason or reason),
+            )
+            job.refresh_from_db()
+        else:
+            job = BackgroundJob.objects.create(kind=kind, reason=reason)
+    if start:
+        start_runner()
+    return job
+
+
+def enqueue_once(kind, reason="", cooldown=None):
+    """
+    Queue a job of the given kind unless one is already pending or running, or
+    (with a cooldown) one finished less than `cooldown` ago. Returns the new job,
+    or None if nothing was queued.
+    """
+    with transaction.atomic():
+        same_kind = BackgroundJob.objects.filter(kind=kind)
+        if same_kind.filter(status__in=[BackgroundJob.PENDING, BackgroundJob.RUNNING]).exists():
+            return None
+        if cooldown is not None and same_kind.filter(finished_at__gte=timezone.now() - cooldown).exists():
+            return None
+        job = BackgroundJob.objects.create(kind=kind, reason=reason)
+    start_runner()
+    return job
+
+
+def ensure_bootstrapped():
+    """
+    Queue the bootstrap job if the prerequisite table is still empty and no
+    bootstrap is queued, running or finished within BOOTSTRAP_COOLDOWN. Only reads the database; the scrape itself
+    happens in the job runner.
+    """
+    global _bootstrapped
+    if _bootstrapped:
+        return None
+    from .models import Prerequisite
+    if Prerequisite.objects.exists():
+        _bootstrapped = True
+        return None
+    return enqueue_once("bootstrap", reason="prerequisite table is empty", cooldown=BOOTSTRAP_COOLDOWN)
+
+
+def ensure_forecast_run():
+    """
+    Queue a forecast job if there is course data but no forecast run saved yet
+    (e.g. right after migrate). Until it finishes the pages show the forecasts
+    of the artifact on disk, or the baseline forecasts.
+    """
+    from .models import Course, ForecastResult
+    if ForecastResult.latest_run_id() is not None or not Course.objects.exists():
+        return None
+    return enqueue_once("forecast", reason="no forecast run saved yet", cooldown=FIRST_RUN_COOLDOWN)
+
+
+def latest_status(kind):
+    """
+    Most recent job of a kind as a dict, or None if it never ran.
+    """
+    job = BackgroundJob.objects.filter(kind=kind).order_by('-pk').first()
+    return job.as_dict() if job else None
+
+
+def _process_alive(pid):
+    if os.name == "nt":
+        return True  #os.kill(pid, 0) would terminate the process on Windows; rely on heartbeats there
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _owner_alive(owner):
+    """
+    Whether the process that claimed a job is still running it: True or False
+    for processes on this host, None when that can't be checked (another host,
+    or Windows).
+    """
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit() or os.name == "nt":
+        return None
+    if int(pid) == os.getpid():
+        return False  #this process isn't running it (see _current_job), so the thread that was is gone
+    return _process_alive(int(pid))
+
+
+def _fail_stale_jobs():
+    """
+    Fail running jobs whose process is gone, and jobs of processes that can't be
+    checked once their heartbeat is older than STALE_AFTER.
+    """
+    cutoff = timezone.now() - STALE_AFTER
+    running = BackgroundJob.objects.filter(status=BackgroundJob.RUNNING).exclude(pk=_current_job)
+    for pk, owner, heartbeat_at in running.values_list('pk', 'owner', 'heartbeat_at'):
+        alive = _owner_alive(owner) if owner else None
+        if alive is False:
+            error = f"Process {owner} running the job is gone."
+        elif alive is None and heartbeat_at is not None and heartbeat_at < cutoff:
+            error = "Job stopped reporting progress."
+        else:
+            continue
+        BackgroundJob.objects.filter(pk=pk, status=BackgroundJob.RUNNING, owner=owner).update(
+            status=BackgroundJob.FAILED, error=error, finished_at=timezone.now(),
+        )
+
+
+def claim_next():
+    """
+    Atomically move the oldest pending job to running.
+
+    The claim is a single UPDATE that only succeeds while no other job is
+    running, which makes it the single-writer lock. The claiming process is
+    recorded as the job's owner, so a job left running by a process that died
+    is failed (and the lock released) on the next claim.
+    """
+    global _current_job
+    #held until the claimed job is recorded as this process's, so another thread
+    #here never takes it for an orphan in between
+    with _claim_lock:
+        _fail_stale_jobs()
+        job = BackgroundJob.objects.filter(status=BackgroundJob.PENDING).order_by('pk').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        running = BackgroundJob.objects.filter(status=BackgroundJob.RUNNING)
+        claimed = (BackgroundJob.objects
+                   .filter(pk=job.pk, status=BackgroundJob.PENDING)
+                   .exclude(Exists(running))
+                   .update(status=BackgroundJob.RUNNING, started_at=now, heartbeat_at=now, owner=OWNER))
+        if not claimed:
+            return None
+        _current_job = job.pk
+    job.refresh_from_db()
+    return job
+
+
+def run_job(job):
+    """
+    Run a job claimed by claim_next() and record how it ended.
+
+    The outcome is only recorded while the job is still this process's running
+    job, so a job another process has failed in the meantime stays failed.
+    """
+    global _current_job
+    mine = BackgroundJob.objects.filter(pk=job.pk, status=BackgroundJob.RUNNING, owner=OWNER)
+
+    def progress(done, total):
+        mine.update(progress=done, total=total, heartbeat_at=timezone.now())
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(job.pk, stop), name=f"job-{job.pk}-heartbeat",
+                                 daemon=True)
+    heartbeat.start()
+    try:
+        JOB_HANDLERS[job.kind](job, progress)
+    except Exception as e:
+        print(f"Background job {job} failed: {e}")
+        finished = mine.update(status=BackgroundJob.FAILED, error=str(e), finished_at=timezone.now())
+    else:
+        finished = mine.update(status=BackgroundJob.DONE, finished_at=timezone.now())
+    finally:
+        stop.set()
+        heartbeat.join()
+        _current_job = None
+    if not finished:
+        print(f"Background job {job} was no longer running here; its outcome wasn't recorded.")
+
+
+def _heartbeat(pk, stop):
+    #keeps a job's heartbeat fresh through stages that report no progress (loading, order search)
+    try:
+        while not stop.wait(HEARTBEAT_SECONDS):
+            try:
+                BackgroundJob.objects.filter(pk=pk, status=BackgroundJob.RUNNING, owner=OWNER).update(
+                    heartbeat_at=timezone.now()
+                )
+            except DatabaseError as e:
+                print(f"Heartbeat of background job #{pk} failed: {e}")
+    finally:
+        connection.close()
+
+
+def run_pending_jobs():
+    """
+    Run jobs until none are pending. Waits while another process holds the lock.
+    """
+    while BackgroundJob.objects.filter(status=BackgroundJob.PENDING).exists():
+        job = claim_next()
+        if job is None:
+            time.sleep(POLL_SECONDS)
+            continue
+        run_job(job)
+
+
+def _runner():
+    global _runner_thread
+    try:
+        while True:
+            run_pending_jobs()
+            #decide to exit under the lock so a job queued meanwhile starts a new runner
+            with _runner_lock:
+                if not BackgroundJob.objects.filter(status=BackgroundJob.PENDING).exists():
+                    _runner_thread = None
+                    return
+    finally:
+        with _runner_lock:
+            #only reached with the thread still registered if a job loop crashed
+            if _runner_thread is threading.current_thread():
+                _runner_thread = None
+        connection.close()
+
+
+def start_runner():
+    """
+    Start the background runner thread for this process if it isn't running.
+    """
+    global _runner_thread
+    with _runner_lock:
+        if _runner_thread is not None:
+            return
+        _runner_thread = threading.Thread(target=_runner, name="background-jobs", daemon=True)
+        _runner_thread.start()
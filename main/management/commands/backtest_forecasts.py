@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from main.backtest import WINDOWS, best_models, run_backtest
+
+
+class Command(BaseCommand):
+    help = "Rolling-origin backtest of every forecasting model, per course."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--horizon", type=int, default=1, help="Terms forecast from each origin.")
+        parser.add_argument("--folds", type=int, default=4, help="Number of forecast origins per course.")
+        parser.add_argument("--window", choices=WINDOWS, default="expanding", help="Training window type.")
+        parser.add_argument(
+            "--window-size", type=int, default=None,
+            help="Training terms per fold for the rolling window.",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help="Number of worker processes used to run folds (1 = run serially).",
+        )
+        parser.add_argument(
+            "--course", action="append", dest="courses",
+            help="Only backtest this course code (can be repeated).",
+        )
+        parser.add_argument("--maxiter", type=int, default=None, help="Optimizer iteration limit per fold fit.")
+        parser.add_argument("--fit-seconds", type=float, default=None, help="Time limit per fold fit, in seconds.")
+        parser.add_argument(
+            "--run-seconds", type=float, default=None,
+            help="Deadline for the whole backtest, in seconds; folds not fitted in time are left unscored.",
+        )
+
+    def handle(self, *args, **options):
+        records = run_backtest(
+            courses=options["courses"],
+            horizon=options["horizon"],
+            folds=options["folds"],
+            window=options["window"],
+            window_size=options["window_size"],
+            workers=options["workers"],
+            maxiter=options["maxiter"],
+            fit_seconds=options["fit_seconds"],
+            run_seconds=options["run_seconds"],
+        )
+        for code, model in sorted(best_models(records).items()):
+            self.stdout.write(f"{code}: {model.upper()}")
+        self.stdout.write(self.style.SUCCESS(f"Backtested {len(records)} course/model pairs."))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from main.benchmark import (
+    DEFAULT_COURSES, DEFAULT_DENSITIES, DEFAULT_TERMS, STAGES, run_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = "Time each forecasting stage on synthetic catalogs of increasing size."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--courses", type=int, nargs="+", default=list(DEFAULT_COURSES),
+            help="Catalog sizes (number of courses) to benchmark.",
+        )
+        parser.add_argument(
+            "--terms", type=int, nargs="+", default=list(DEFAULT_TERMS),
+            help="Terms of history per course.",
+        )
+        parser.add_argument(
+            "--density", type=float, nargs="+", default=list(DEFAULT_DENSITIES), dest="densities",
+            help="Probability that a course has a prerequisite.",
+        )
+        parser.add_argument(
+            "--fit-sample", type=int, default=50,
+            help="Courses fitted and validated per case (0 = all).",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic data.")
+        parser.add_argument(
+            "--no-memory", action="store_true",
+            help="Skip peak memory tracing, which slows the fitting stages down.",
+        )
+        parser.add_argument("--output", default=None, help="Where to write the JSON results.")
+
+    def handle(self, *args, **options):
+        def progress(case):
+            self.stdout.write(
+                f"{case['courses']} courses x {case['terms']} terms (density {case['prereq_density']}): "
+                + ", ".join(f"{stage} {case['stages'][stage]['seconds']:.2f}s" for stage in STAGES)
+                + f", {case['fits_per_sec']} fits/s"
+            )
+
+        run_benchmark(
+            courses=options["courses"],
+            terms=options["terms"],
+            densities=options["densities"],
+            fit_sample=options["fit_sample"] or None,
+            seed=options["seed"],
+            track_memory=not options["no_memory"],
+            output_path=options["output"],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
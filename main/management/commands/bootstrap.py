@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main import jobs
+from main.models import Prerequisite
+
+
+class Command(BaseCommand):
+    help = "Scrape the prerequisite catalog into an empty database (runs once; later runs do nothing)."
+
+    def handle(self, *args, **options):
+        if Prerequisite.objects.exists():
+            self.stdout.write(self.style.SUCCESS("Already bootstrapped."))
+            return
+        # Queued and run through the job runner, so it never overlaps another job
+        jobs.enqueue("bootstrap", reason="manage.py bootstrap", start=False)
+        jobs.run_pending_jobs()
+        status = jobs.latest_status("bootstrap")
+        if status and status["status"] == "failed":
+            raise CommandError(f"Bootstrap failed: {status['error']}")
+        if status and status["status"] == "running":
+            self.stdout.write("Bootstrap is running in another process.")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Bootstrapped with {Prerequisite.objects.count()} prerequisites."))
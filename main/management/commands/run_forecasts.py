@@ -0,0 +1,96 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.arima import run_forecasts
+from main.sharding import ShardError, merge_shards, run_shard
+
+
+class Command(BaseCommand):
+    help = "Fit enrollment forecasts and write the forecast artifact."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help="Number of worker processes used to fit courses (1 = run serially).",
+        )
+        parser.add_argument(
+            "--no-cache", action="store_true",
+            help="Refit every course instead of reusing cached fits.",
+        )
+        parser.add_argument(
+            "--rolling-folds", type=int, default=0,
+            help="Number of one-step rolling-origin validation folds per model (0 = off).",
+        )
+        parser.add_argument(
+            "--orders", choices=["fixed", "auto"], default=None,
+            help="Fixed (1,1,1)(1,1,1,m) orders or searched per-course orders.",
+        )
+        parser.add_argument(
+            "--research-orders", action="store_true",
+            help="Search orders again instead of reusing the remembered ones.",
+        )
+        parser.add_argument(
+            "--maxiter", type=int, default=None,
+            help="Optimizer iteration limit per model fit.",
+        )
+        parser.add_argument(
+            "--fit-seconds", type=float, default=None,
+            help="Time limit per model fit, in seconds.",
+        )
+        parser.add_argument(
+            "--run-seconds", type=float, default=None,
+            help="Deadline for the whole run, in seconds; courses not fitted in time fall back.",
+        )
+        parser.add_argument(
+            "--course", action="append", dest="courses",
+            help="Only fit this course code (can be repeated).",
+        )
+        parser.add_argument(
+            "--shard", type=int, default=None,
+            help="Only fit the subjects of this shard (0-based, with --shards) and write a shard file.",
+        )
+        parser.add_argument("--shards", type=int, default=None, help="Total number of shards.")
+        parser.add_argument(
+            "--merge-shards", type=int, default=None, metavar="SHARDS",
+            help="Combine the files of a SHARDS-way sharded run into the forecast artifact.",
+        )
+
+    def handle(self, *args, **options):
+        if options["merge_shards"]:
+            try:
+                results = merge_shards(options["merge_shards"])
+            except ShardError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Merged forecasts for {len(results)} courses."))
+            return
+        if options["shard"] is not None:
+            if not options["shards"]:
+                raise CommandError("--shard needs --shards.")
+            if options["courses"]:
+                #a shard file covers whole subjects; merging one fitted for a few courses would drop the rest
+                raise CommandError("--course can't be combined with --shard.")
+            path = run_shard(
+                options["shard"], options["shards"],
+                workers=options["workers"],
+                use_cache=not options["no_cache"],
+                rolling_folds=options["rolling_folds"],
+                order_mode=options["orders"],
+                research_orders=options["research_orders"],
+                maxiter=options["maxiter"],
+                fit_seconds=options["fit_seconds"],
+                run_seconds=options["run_seconds"],
+            )
+            self.stdout.write(self.style.SUCCESS(f"Wrote {path}."))
+            return
+
+        results = run_forecasts(
+            courses=options["courses"],
+            workers=options["workers"],
+            use_cache=not options["no_cache"],
+            rolling_folds=options["rolling_folds"],
+            order_mode=options["orders"],
+            research_orders=options["research_orders"],
+            maxiter=options["maxiter"],
+            fit_seconds=options["fit_seconds"],
+            run_seconds=options["run_seconds"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Generated forecasts for {len(results)} courses."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from main.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (forecast recomputes, rescrapes) until the queue is empty."
+
+    def handle(self, *args, **options):
+        run_pending_jobs()
+        self.stdout.write(self.style.SUCCESS("No pending background jobs."))
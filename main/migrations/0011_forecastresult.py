@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.CharField(db_index=True, max_length=32)),
+                ('course', models.CharField(db_index=True, max_length=20)),
+                ('title', models.CharField(max_length=255)),
+                ('model', models.CharField(max_length=20)),
+                ('target_term', models.IntegerField(null=True)),
+                ('term_name', models.CharField(max_length=30)),
+                ('forecast', models.FloatField(null=True)),
+                ('mae', models.FloatField(null=True)),
+                ('val_terms', models.JSONField(null=True)),
+                ('val_preds', models.JSONField(null=True)),
+                ('yearly_course', models.BooleanField(default=False)),
+                ('best_accuracy', models.FloatField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run_id', 'course'], name='main_foreca_run_id_73842b_idx')],
+            },
+        ),
+    ]
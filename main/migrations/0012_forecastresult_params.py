@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_forecastresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forecastresult',
+            name='params',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_forecastresult_params'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forecastresult',
+            name='fallback',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:22
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def drop_duplicate_courses(apps, schema_editor):
+    """
+    Keep the first saved row of each (code, term) pair, the one the data page
+    and the CSV export already showed, and delete the rest.
+    """
+    Course = apps.get_model('main', 'Course')
+    duplicates = (Course.objects.values('code', 'term')
+                  .annotate(rows=Count('pk'), first=Min('pk'))
+                  .filter(rows__gt=1))
+    for group in duplicates:
+        (Course.objects.filter(code=group['code'], term=group['term'])
+         .exclude(pk=group['first']).delete())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_forecastresult_fallback'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_courses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='course',
+            constraint=models.UniqueConstraint(fields=('code', 'term'), name='unique_course_term'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:24
+
+import re
+
+from django.db import migrations, models
+
+TERM_RE = re.compile(r'\d{6}')
+
+
+def clean_course_terms(apps, schema_editor):
+    """
+    Make every stored term castable to an integer before the column changes
+    type: padded codes are trimmed (dropped if the trimmed code is already
+    there for that course) and anything that isn't a term code is deleted.
+    """
+    Course = apps.get_model('main', 'Course')
+    for course in Course.objects.order_by('pk'):
+        term = course.term.strip()
+        if term == course.term:
+            if not TERM_RE.fullmatch(term):
+                course.delete()
+        elif not TERM_RE.fullmatch(term) or Course.objects.filter(code=course.code, term=term).exists():
+            course.delete()
+        else:
+            course.term = term
+            course.save(update_fields=['term'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_course_unique_code_term'),
+    ]
+
+    operations = [
+        migrations.RunPython(clean_course_terms, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='course',
+            name='term',
+            field=models.IntegerField(db_index=True),
+        ),
+    ]
@@ -1,39 +1,90 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from datetime import datetime
 
 # Create your models here.
 # File: main/models.py
 class Course(models.Model):
-    term = models.CharField(max_length=10)
+    term = models.IntegerField(db_index=True)  #term code, e.g. 202503 (see main/terms.py)
     code = models.CharField(max_length=20)
     title = models.CharField(max_length=255)
     enrolled = models.IntegerField()
     #updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            #one enrollment figure per course and term; CSV uploads upsert on it (see main/ingest.py)
+            models.UniqueConstraint(fields=["code", "term"], name="unique_course_term"),
+        ]
+
     def __str__(self):
         return f"{self.code} - {self.title} ({self.enrolled})"
 
+    @staticmethod
+    def data_changed():
+        """
+        Clear what's derived from the Course table (the term coverage index) and
+        bump the course data version the page payloads are cached under. Writes
+        call this once per batch of rows rather than per row.
+        """
+        from . import coverage, payloads
+        coverage.invalidate()
+        payloads.course_data_changed()
+
     @classmethod
-    def save_courses(cls, subj="CSCE"):
-        from .csce_scraper import schedule_scraper, build_term_codes_past_years
+    def save_courses(cls, subj=None, progress=None):
+        """
+        Scrape the terms each subject is missing. subj is a subject code, a list
+        of them, or None for settings.FORECAST_SUBJECTS. progress, if given, is
+        called with (terms scraped, terms to scrape) after every term. Returns
+        the number of course rows saved.
+        """
+        from .coverage import missing_terms
 
-        # Get all terms for the past 5 years
-        all_terms = build_term_codes_past_years(years=5)
+        if subj is None:
+            from django.conf import settings
+            subj = settings.FORECAST_SUBJECTS
+        subjects = [subj] if isinstance(subj, str) else list(subj)
+        missing = missing_terms(subjects)
+        total = sum(len(terms) for terms in missing.values())
+        done = 0
 
-        # Determine which terms are already in the database
-        existing_terms = set(Course.objects.values_list('term', flat=True))
+        def term_done():
+            nonlocal done
+            done += 1
+            if progress:
+                progress(done, total)
 
-        # Filter only missing terms
-        missing_terms = [term for term, label in all_terms if term not in existing_terms]
+        saved = 0
+        for subject in subjects:
+            saved += cls.save_subject_courses(subject, missing.get(subject, []), term_done)
+        return saved
+
+    @classmethod
+    def save_subject_courses(cls, subj, missing_terms=None, on_term=None):
+        """
+        Scrape the given terms of one subject (by default the terms of the past
+        5 years it doesn't have yet). on_term, if given, is called after each term.
+        """
+        from .csce_scraper import schedule_scraper
+        from .coverage import missing_terms as find_missing_terms
+
+        if missing_terms is None:
+            missing_terms = find_missing_terms([subj]).get(subj, [])
 
         if not missing_terms:
-            print("All semesters are already in there. No scraping needed.")
-            return
+            print(f"All {subj} semesters are already in there. No scraping needed.")
+            return 0
 
+        saved = 0
         for term_code in missing_terms:
-            print(f"Scraping missing term: {term_code}")
+            print(f"Scraping missing {subj} term: {term_code}")
             results = schedule_scraper(term=term_code, subj=subj)
+            if isinstance(results, dict):
+                print(f"Skipping {subj} {term_code}: {results['error']}")
+                if on_term:
+                    on_term()
+                continue
             print(f"Found {len(results)} courses for {term_code}")
 
             for code, title, enrolled in results:
@@ -44,6 +95,12 @@ class Course(models.Model):
                     term=term_code,
                     defaults={'title': title, 'enrolled': enrolled}
                 )
+                saved += 1
+            if results:
+                cls.data_changed()
+            if on_term:
+                on_term()
+        return saved
 
 
 ############################################################################################
@@ -91,6 +148,24 @@ class Prerequisite(models.Model):
         print(f"Scraper saved {count} records at {datetime.now()}")
         return count
 
+#Version counters shared by every process, bumped on each write to a table (see main/payloads.py)
+class DataVersion(models.Model):
+    name = models.CharField(max_length=30, unique=True)
+    version = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+    @classmethod
+    def bump(cls, name):
+        if not cls.objects.filter(name=name).update(version=models.F("version") + 1):
+            cls.objects.get_or_create(name=name)
+            cls.objects.filter(name=name).update(version=models.F("version") + 1)
+
+    @classmethod
+    def current(cls, name):
+        return cls.objects.filter(name=name).values_list("version", flat=True).first() or 0
+
 #Highschool Graduation Model
 class GraduationData(models.Model):
     year = models.IntegerField(unique=True)
@@ -100,3 +175,160 @@ class GraduationData(models.Model):
         return f"{self.year} - {self.graduates}"
     
     
+
+############################################################################################
+############################################################################################
+#Background jobs (forecast recomputes, rescrapes) queued in the database
+class BackgroundJob(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=30, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    reason = models.TextField(blank=True)
+    triggers = models.IntegerField(default=1)  #how many requests were merged into this job
+    progress = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    #"host:pid" of the process running the job, so jobs of a process that died can be failed
+    owner = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    def as_dict(self):
+        return {
+            "id": self.pk,
+            "kind": self.kind,
+            "status": self.status,
+            "reason": self.reason,
+            "triggers": self.triggers,
+            "progress": self.progress,
+            "total": self.total,
+            "error": self.error,
+            "owner": self.owner,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+############################################################################################
+############################################################################################
+#Forecast results, one row per course and model for each forecast run
+class ForecastResult(models.Model):
+    MODELS = ["arima", "sarima", "arimax", "sarimax"]
+    #fast NumPy baselines from main/baselines.py, stored alongside for comparison
+    BASELINES = ["seasonal_naive", "moving_average", "ses", "holt_winters"]
+    #how many recent runs to keep around
+    KEEP_RUNS = 3
+
+    run_id = models.CharField(max_length=32, db_index=True)
+    course = models.CharField(max_length=20, db_index=True)
+    title = models.CharField(max_length=255)
+    model = models.CharField(max_length=20)
+    target_term = models.IntegerField(null=True)
+    term_name = models.CharField(max_length=30)
+    forecast = models.FloatField(null=True)
+    mae = models.FloatField(null=True)
+    val_terms = models.JSONField(null=True)
+    val_preds = models.JSONField(null=True)
+    #{"spec": orders, "params": fitted parameters} for the exog models (see main/scenarios.py)
+    params = models.JSONField(null=True, blank=True)
+    yearly_course = models.BooleanField(default=False)
+    best_accuracy = models.FloatField(null=True)
+    #model the chart highlights and how it was picked ("backtest (4 folds)" or "holdout"), see arima.select_best_model
+    best_model = models.CharField(max_length=20, blank=True, default="")
+    best_model_source = models.CharField(max_length=30, blank=True, default="")
+    #"cached" or "baseline" when the course ran out of time and its forecast is a stand-in
+    fallback = models.CharField(max_length=20, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["run_id", "course"]),
+        ]
+
+    def __str__(self):
+        return f"{self.course} {self.model} → {self.forecast} ({self.term_name})"
+
+    @classmethod
+    def save_run(cls, run_id, results):
+        """
+        Bulk insert one run's results in a single transaction and drop older runs.
+        """
+        rows = []
+        for result in results:
+            if result.get("term") is None:
+                continue  #insufficient data, nothing was forecast
+            for model in cls.MODELS + cls.BASELINES:
+                rows.append(cls(
+                    run_id=run_id,
+                    course=result["code"],
+                    title=result["title"],
+                    model=model,
+                    target_term=result["term"],
+                    term_name=result["term_name"],
+                    forecast=result.get(f"{model}_forecast"),
+                    mae=result.get(f"{model}_mae"),
+                    val_terms=result.get(f"{model}_val_terms"),
+                    val_preds=result.get(f"{model}_val_preds"),
+                    params=result.get(f"{model}_params"),
+                    yearly_course=bool(result.get("yearly_course")),
+                    best_accuracy=result.get("best_accuracy"),
+                    best_model=result.get("best_model") or "",
+                    best_model_source=result.get("best_model_source") or "",
+                    fallback=result.get("fallback") or "",
+                ))
+
+        with transaction.atomic():
+            cls.objects.bulk_create(rows, batch_size=500)
+            old_runs = (cls.objects.values_list("run_id", flat=True)
+                        .distinct().order_by("-run_id")[cls.KEEP_RUNS:])
+            cls.objects.filter(run_id__in=list(old_runs)).delete()
+        return len(rows)
+
+    @classmethod
+    def latest_run_id(cls):
+        return cls.objects.order_by("-run_id").values_list("run_id", flat=True).first()
+
+    @classmethod
+    def course_records(cls, run_id, courses=None):
+        """
+        One record per course in the shape the home chart reads
+        (code, term, term_name, <model>_forecast, <model>_mae, ...).
+        """
+        qs = cls.objects.filter(run_id=run_id)
+        if courses is not None:
+            qs = qs.filter(course__in=list(courses))
+
+        records = {}
+        for row in qs.order_by("course").values():
+            record = records.setdefault(row["course"], {
+                "code": row["course"],
+                "title": row["title"],
+                "term": row["target_term"],
+                "term_name": row["term_name"],
+                "enrolled": None,
+                "yearly_course": row["yearly_course"],
+                "best_accuracy": row["best_accuracy"],
+                "best_model": row["best_model"] or None,
+                "best_model_source": row["best_model_source"] or None,
+                "fallback": row["fallback"] or None,
+            })
+            record[f"{row['model']}_forecast"] = row["forecast"]
+            record[f"{row['model']}_mae"] = row["mae"]
+            record[f"{row['model']}_val_terms"] = row["val_terms"]
+            record[f"{row['model']}_val_preds"] = row["val_preds"]
+        return list(records.values())
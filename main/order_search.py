@@ -0,0 +1,245 @@
+"""
+Automatic (p,d,q)(P,D,Q,m) order selection per course and model family.
+
+Candidates are scored by AIC or by the error on a single holdout of the last
+HOLDOUT_TERMS terms (not the rolling-origin folds of backtest.py) in two
+passes: a cheap pass with a small iteration cap drops failed, non-converged and
+clearly dominated candidates, and only the survivors are refit in full. The chosen orders are remembered in
+ORDER_CACHE_PATH so later runs reuse them instead of searching again.
+
+Candidate fits run under the forecast run's budget (arima.task_budget): each
+fit is limited like any other, and once the run deadline has passed the
+remaining candidates are skipped. A course whose search was cut short uses the
+orders found so far for this run, but isn't remembered, so it is searched again.
+"""
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from sklearn.metrics import mean_absolute_error
+
+from .arima import (
+    EXOG_FAMILIES, MODEL_FAMILIES, fit_within_budget, forecast_next, make_model, past_deadline, prepare_series,
+    task_budget,
+)
+
+CRITERIA = ("aic", "holdout")
+#optimizer iterations allowed in the screening pass
+SCREEN_MAXITER = 15
+#screening scores further than this behind the course's best are dropped
+AIC_PRUNE_MARGIN = 10.0
+HOLDOUT_PRUNE_RATIO = 2.0
+#terms held out when scoring by holdout error
+HOLDOUT_TERMS = 2
+
+
+def candidate_specs(default_spec, criterion="aic"):
+    """
+    Grid of orders around a family's default spec.
+
+    AIC is only comparable between models with the same differencing, so the
+    AIC search keeps d and D fixed; the holdout search also varies them.
+    """
+    d_default = default_spec["order"][1]
+    d_values = [d_default] if criterion == "aic" else [0, 1]
+    specs = []
+    for p, d, q in itertools.product(range(3), d_values, range(3)):
+        if "seasonal_order" not in default_spec:
+            specs.append({"order": (p, d, q)})
+            continue
+        D_default, m = default_spec["seasonal_order"][1], default_spec["seasonal_order"][3]
+        D_values = [D_default] if criterion == "aic" else [0, 1]
+        for P, D, Q in itertools.product(range(2), D_values, range(2)):
+            specs.append({"order": (p, d, q), "seasonal_order": (P, D, Q, m)})
+    return specs
+
+
+def identifiable(spec, n_obs, k_exog):
+    """
+    True if enough observations remain after differencing to estimate the spec.
+    """
+    p, d, q = spec["order"]
+    P, D, Q, m = spec.get("seasonal_order", (0, 0, 0, 0))
+    k_params = p + q + P + Q + k_exog + 1
+    return n_obs - d - D * m > k_params
+
+
+def score_candidate(unit):
+    """
+    Fit one candidate and return (score, converged, timed_out); the score (lower
+    is better) is None if the fit failed or the run deadline passed first.
+    """
+    family, spec, y, exog, budget = unit["family"], unit["spec"], unit["y"], unit["exog"], unit["budget"]
+    if past_deadline(budget):
+        return None, False, True
+    try:
+        if unit["criterion"] == "aic":
+            fit = fit_within_budget(make_model(family, y, exog, spec), budget)
+            score = fit.aic
+        else:
+            h = HOLDOUT_TERMS
+            fit = fit_within_budget(make_model(family, y[:-h], exog[:-h], spec), budget)
+            score = mean_absolute_error(y[-h:], forecast_next(family, fit, h, exog[-h:]))
+    except Exception:
+        return None, False, past_deadline(budget)
+    if score is None or not np.isfinite(score):
+        return None, False, False
+    converged = bool((getattr(fit, "mle_retvals", None) or {}).get("converged", True))
+    return float(score), converged, False
+
+
+def _map(func, units, workers):
+    if workers <= 1 or len(units) <= 1:
+        return [func(unit) for unit in units]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, units, chunksize=8))
+
+
+def _prune(units, scores, criterion):
+    """
+    Keep candidates that fit, converged and are not clearly dominated within their
+    (course, family); a non-converged fit's score is not comparable, so it neither
+    survives nor sets the best score the others are measured against.
+    """
+    fitted = [(unit, score) for unit, (score, converged, _) in zip(units, scores) if score is not None and converged]
+    best = {}
+    for unit, score in fitted:
+        key = (unit["code"], unit["family"])
+        best[key] = min(best.get(key, score), score)
+
+    survivors = []
+    for unit, score in fitted:
+        floor = best[(unit["code"], unit["family"])]
+        if criterion == "aic" and score > floor + AIC_PRUNE_MARGIN:
+            continue
+        if criterion == "holdout" and score > max(floor * HOLDOUT_PRUNE_RATIO, floor + 1):
+            continue
+        survivors.append(unit)
+    return survivors
+
+
+def search_orders(tasks, criterion="aic", workers=1, budget=None):
+    """
+    Search orders for every task; returns {code: {"orders": ..., "scores": ...}}.
+
+    budget (arima.task_budget) limits every candidate fit, the screening pass
+    to at most SCREEN_MAXITER iterations. Courses with candidates skipped or cut
+    off by the run deadline get "complete": False.
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"criterion must be one of {CRITERIA}")
+    budget = budget or task_budget()
+    screen_maxiter = min(SCREEN_MAXITER, budget["maxiter"] or SCREEN_MAXITER)
+
+    units = []
+    for task in tasks:
+        series = prepare_series(task)
+        if series is None:
+            continue
+        y, exog, _ = series
+        for family in MODEL_FAMILIES:
+            k_exog = exog.shape[1] if family in EXOG_FAMILIES else 0
+            n_obs = len(y) - (HOLDOUT_TERMS if criterion == "holdout" else 0)
+            for spec in candidate_specs(task["orders"][family], criterion):
+                if not identifiable(spec, n_obs, k_exog):
+                    continue
+                units.append({
+                    "code": task["code"], "family": family, "spec": spec, "y": y, "exog": exog,
+                    "criterion": criterion, "budget": {**budget, "maxiter": screen_maxiter},
+                })
+
+    #screening pass with a small iteration cap, then full fits of the survivors
+    screen_scores = _map(score_candidate, units, workers)
+    survivors = _prune(units, screen_scores, criterion)
+    for unit in survivors:
+        unit["budget"] = budget
+    final_scores = _map(score_candidate, survivors, workers)
+    cut_short = {unit["code"] for unit, (_, _, timed_out) in zip(units + survivors, screen_scores + final_scores)
+                 if timed_out}
+
+    chosen = {}
+    for unit, (score, converged, _) in zip(survivors, final_scores):
+        if score is None:
+            continue
+        key = (unit["code"], unit["family"])
+        current = chosen.get(key)
+        #a converged candidate always beats a non-converged one
+        rank = (not converged, score)
+        if current is None or rank < current["rank"]:
+            chosen[key] = {"rank": rank, "spec": unit["spec"], "score": score}
+
+    results = {}
+    for (code, family), choice in chosen.items():
+        entry = results.setdefault(code, {"criterion": criterion, "orders": {}, "scores": {}})
+        entry["orders"][family] = choice["spec"]
+        entry["scores"][family] = round(choice["score"], 3)
+    for code in cut_short:
+        results.setdefault(code, {"criterion": criterion, "orders": {}, "scores": {}})["complete"] = False
+    return results
+
+
+def _spec_from_json(spec):
+    return {key: tuple(value) for key, value in spec.items()}
+
+
+def load_orders(path=None):
+    path = path or str(settings.ORDER_CACHE_PATH)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            stored = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable order cache {path}: {e}")
+        return {}
+    for entry in stored.values():
+        entry["orders"] = {family: _spec_from_json(spec) for family, spec in entry["orders"].items()}
+    return stored
+
+
+def save_orders(stored, path=None):
+    path = path or str(settings.ORDER_CACHE_PATH)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(stored, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def choose_orders(tasks, criterion="aic", workers=1, research=False, path=None, budget=None):
+    """
+    Set each task's orders from the remembered choice, searching courses that have none
+    (under budget, see search_orders()).
+
+    Families the search could not fit keep their default orders.
+    """
+    stored = load_orders(path)
+    to_search, partial = [], set()
+    for task in tasks:
+        entry = stored.get(task["code"], {})
+        #search again when the course gained terms since its orders were chosen
+        if research or entry.get("criterion") != criterion or entry.get("n_obs") != len(task["history"]):
+            to_search.append(task)
+
+    if to_search:
+        print(f"Searching model orders for {len(to_search)} courses ({criterion}).")
+        found = search_orders(to_search, criterion, workers, budget)
+        for task in to_search:
+            entry = found.get(task["code"], {"criterion": criterion, "orders": {}, "scores": {}})
+            #a search cut short by the deadline only applies to this run
+            if not entry.pop("complete", True):
+                task["orders"] = {**task["orders"], **entry["orders"]}
+                partial.add(task["code"])
+                continue
+            #remember courses too short to search as well, so they aren't retried every run
+            stored[task["code"]] = entry
+            stored[task["code"]]["n_obs"] = len(task["history"])
+        save_orders(stored, path)
+
+    for task in tasks:
+        entry = stored.get(task["code"])
+        if entry and entry.get("criterion") == criterion and task["code"] not in partial:
+            task["orders"] = {**task["orders"], **entry["orders"]}
+    return stored
@@ -0,0 +1,94 @@
+"""
+Per-process cache of the JSON payloads the pages embed or serve.
+
+The course API responses behind the home chart and model_info()'s accuracy
+list are read from the latest forecast run and serialized again on every
+request, and the raw artifact is read from disk. They only change when a new
+run is saved, the course data changes or the artifact is rewritten, so each
+payload is cached here under a version (run id, course data version, artifact
+mtime, ...), together with a gzipped copy. The views derive ETags from the
+same versions and use them (and Last-Modified where there is a timestamp) for
+conditional GETs through django.views.decorators.http.condition, so a repeat
+visit costs a few small queries and often just a 304. Responses vary on
+Accept-Encoding, and a gzipped body gets its own ETag (a "-gzip" suffix).
+"""
+import gzip
+import hashlib
+import threading
+
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .models import DataVersion
+
+_lock = threading.Lock()
+_payloads = {}
+
+
+class Payload:
+    def __init__(self, version, text):
+        self.version = version
+        self.text = text
+        self.body = text.encode("utf-8")
+        self.gzipped = gzip.compress(self.body, compresslevel=6)
+
+
+def accepts_gzip(request):
+    return "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+
+
+def etag_for(request, version):
+    """
+    ETag of a payload version, specific to the encoding the request gets it in.
+    """
+    etag = hashlib.sha256(repr(version).encode("utf-8")).hexdigest()[:24]
+    return etag + "-gzip" if accepts_gzip(request) else etag
+
+
+def get_payload(name, version, build):
+    """
+    The cached payload `name` if it was built for `version`; otherwise build()
+    (which returns the JSON text) is called and its result cached.
+    """
+    with _lock:
+        payload = _payloads.get(name)
+    if payload is not None and payload.version == version:
+        return payload
+    payload = Payload(version, build())
+    with _lock:
+        _payloads[name] = payload
+    return payload
+
+
+def clear():
+    with _lock:
+        _payloads.clear()
+
+
+def course_stamp():
+    """
+    Version of the Course table: a counter in the database that every write
+    path bumps through Course.data_changed(), so writes from any process are
+    seen by every other one.
+    """
+    return DataVersion.current("course")
+
+
+def course_data_changed():
+    """
+    Bump the course data version (Course.data_changed() calls this once per batch of writes).
+    """
+    DataVersion.bump("course")
+
+
+def payload_response(request, payload, content_type="application/json"):
+    """
+    The payload's body, gzipped when the client accepts it.
+    """
+    if accepts_gzip(request):
+        response = HttpResponse(payload.gzipped, content_type=content_type)
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(payload.body, content_type=content_type)
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
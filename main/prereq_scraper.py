@@ -1,8 +1,6 @@
 # main/list_from_db.py
 import os, sys, re
 from pathlib import Path
-import requests
-from bs4 import BeautifulSoup
 
 #Django setup
 #ROOT = Path(__file__).resolve().parents[1]
@@ -12,13 +10,13 @@ import django
 #django.setup()
 
 from main.models import Course
-from main.csce_scraper import build_term_codes_past_years
+from main.terms import recent_terms
 
 #DB helper
 CSCE_RE = re.compile(r'^CSCE\s*A\d{3}[A-Z]?$')
 
 def get_csce_courses_past_5y():
-    terms = [t for t, _ in build_term_codes_past_years(years=5)]
+    terms = recent_terms(years=5).tolist()
     qs = (Course.objects
           .filter(term__in=terms)
           .values_list("code", flat=True)
@@ -27,11 +25,17 @@ def get_csce_courses_past_5y():
 
 #Prerequisite scraper
 #REGEX patterns
-SUBJECT_URL  = "https://catalog.uaa.alaska.edu/coursedescriptions/csce/"
-CSCE_CODE_RE = re.compile(r'\bCSCE\s*A\d{3}[A-Z]?\b', re.IGNORECASE)
+SUBJECT_URL  = "https://catalog.uaa.alaska.edu/coursedescriptions/{subject}/"
+CODE_PATTERN = r'\b(?:{subjects})\s*A\d{{3}}[A-Z]?\b'
 PREREQ_SENT  = re.compile(r'Prerequisite(?:s)?\s*:\s*(.+?)(?:\.\s|$)', re.IGNORECASE | re.DOTALL)
 DIGITS       = re.compile(r'\d{3}')
 
+#matches course codes of the given subjects (e.g. CSCE A101)
+def course_code_re(subjects):
+    return re.compile(CODE_PATTERN.format(subjects="|".join(re.escape(s) for s in subjects)), re.IGNORECASE)
+
+CSCE_CODE_RE = course_code_re(["CSCE"])
+
 #cleans the text
 def norm(s):
     return re.sub(r'\s+', ' ', (s or '').replace('\xa0', ' ')).strip()
@@ -65,15 +69,23 @@ def pick_two(course, direct):
                     return sorted(picked, key=num, reverse=True)
     return sorted(picked, key=num, reverse=True)
 
-def build_two_prereq_map():
-    html = requests.get(SUBJECT_URL, timeout=20).text
+#prereq_subjects: subjects whose courses count as prerequisites (default: just subj);
+#only subjects we have enrollment data for are useful as exogenous inputs
+def build_two_prereq_map(subj="CSCE", prereq_subjects=None):
+    #imported here so loading the app doesn't pull in the HTTP and HTML parsing stack
+    import requests
+    from bs4 import BeautifulSoup
+
+    html = requests.get(SUBJECT_URL.format(subject=subj.lower()), timeout=20).text
     soup = BeautifulSoup(html, "html.parser")
+    course_re = course_code_re([subj])
+    prereq_re = course_code_re(prereq_subjects or [subj])
 
     #course -> text (100–400 only)
     blocks = {}
     for blk in soup.select(".courseblock"):
         txt = norm(blk.get_text(" ", strip=True))
-        m = CSCE_CODE_RE.search(txt)
+        m = course_re.search(txt)
         if not m:
             continue
         code = norm(m.group(0))
@@ -87,7 +99,7 @@ def build_two_prereq_map():
     for code, text in blocks.items():
         prereq_text = " ".join(norm(m.group(1)) for m in PREREQ_SENT.finditer(text))
         tokens = []
-        for t in CSCE_CODE_RE.findall(prereq_text):
+        for t in prereq_re.findall(prereq_text):
             clean_t = norm(t)
             tokens.append(clean_t)
         seen, out = set(), []
@@ -109,6 +121,19 @@ def build_two_prereq_map():
 
     return final
 
+#prerequisite maps of every forecast subject, with prerequisites from any of them
+#progress, if given, is called with (subjects done, subjects) after each subject
+def build_subject_prereq_maps(subjects=None, progress=None):
+    if subjects is None:
+        from django.conf import settings
+        subjects = settings.FORECAST_SUBJECTS
+    final = {}
+    for n, subj in enumerate(subjects):
+        final.update(build_two_prereq_map(subj, prereq_subjects=subjects))
+        if progress:
+            progress(n + 1, len(subjects))
+    return final
+
 #main
 if __name__ == "__main__":
     data = build_two_prereq_map()
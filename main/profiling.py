@@ -0,0 +1,179 @@
+"""
+Run profile for forecast runs.
+
+run_forecasts times each stage of a run (load, features, orders, baselines,
+fitting, serialization, database; the artifact is streamed while fitting, so
+fitting includes serialization) and collects the per-course, per-model timings,
+optimizer iterations and fit warnings that forecast_course records, along
+with the run's time budget and the courses that fell back to a cached or
+baseline forecast because they ran out of time. The
+profile is written to FORECAST_PROFILE_PATH as JSON and summarized as a
+plain-text table, so it is easy to see which courses and models take the
+most time. Runs limited to some courses write theirs to partial_profile_path()
+instead, so the full run's profile stays in place.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+from .arima import MODEL_FAMILIES
+from .artifacts import json_safe
+
+
+class RunProfile:
+    def __init__(self, run_id=None, workers=None):
+        self.run_id = run_id
+        self.workers = workers
+        self.stages = {}
+        self.cached = set()
+        self.budget = None
+        self.courses = []
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(self.stages.get(name, 0) + time.perf_counter() - start, 4)
+
+    def add_courses(self, tasks, results):
+        """
+        One entry per task, with per-model details taken from its result.
+        """
+        by_code = {result["code"]: result for result in results}
+        for task in tasks:
+            result = by_code.get(task["code"], {})
+            models = {}
+            for family in MODEL_FAMILIES:
+                if f"{family}_seconds" not in result:
+                    continue
+                models[family] = {
+                    key: result.get(f"{family}_{key}")
+                    for key in ("seconds", "val_seconds", "iterations", "val_iterations",
+                                "converged", "val_converged", "warnings", "val_warnings")
+                }
+            if result.get("fallback"):
+                status = f"fallback ({result['fallback']})"
+            else:
+                status = "fitted" if models else ("insufficient" if result else "failed")
+            self.courses.append({
+                "code": task["code"],
+                "cached": task["code"] in self.cached,
+                "status": status,
+                "feature_seconds": task.get("feature_seconds"),
+                "seconds": result.get("fit_seconds"),
+                "models": models,
+            })
+
+    def family_totals(self):
+        totals = {}
+        for family in MODEL_FAMILIES:
+            entries = [course["models"][family] for course in self.courses
+                       if family in course["models"] and not course["cached"]
+                       and not course["status"].startswith("fallback")]
+            totals[family] = {
+                "fits": len(entries),
+                "seconds": round(sum(e["seconds"] or 0 for e in entries), 4),
+                "val_seconds": round(sum(e["val_seconds"] or 0 for e in entries), 4),
+                "iterations": sum(e["iterations"] or 0 for e in entries),
+                "not_converged": sum(1 for e in entries if e["converged"] is False),
+                "with_warnings": sum(1 for e in entries if e["warnings"] or e["val_warnings"]),
+            }
+        return totals
+
+    def slowest_fits(self, limit=10):
+        fits = []
+        for course in self.courses:
+            if course["cached"] or course["status"].startswith("fallback"):
+                continue
+            for family, entry in course["models"].items():
+                fits.append({
+                    "code": course["code"],
+                    "model": family,
+                    "seconds": round((entry["seconds"] or 0) + (entry["val_seconds"] or 0), 4),
+                    "iterations": entry["iterations"],
+                    "converged": entry["converged"],
+                    "warnings": len(entry["warnings"] or []) + len(entry["val_warnings"] or []),
+                })
+        fits.sort(key=lambda fit: fit["seconds"], reverse=True)
+        return fits[:limit]
+
+    def as_dict(self):
+        return json_safe({
+            "run_id": self.run_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "workers": self.workers,
+            "courses_total": len(self.courses),
+            "courses_cached": sum(1 for course in self.courses if course["cached"]),
+            "courses_fallback": sorted(course["code"] for course in self.courses
+                                       if course["status"].startswith("fallback")),
+            "budget": self.budget,
+            "stages": self.stages,
+            "families": self.family_totals(),
+            "slowest": self.slowest_fits(),
+            "courses": self.courses,
+        })
+
+    def save(self, path=None):
+        path = path or str(settings.FORECAST_PROFILE_PATH)
+        data = self.as_dict()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+        return data
+
+
+def partial_profile_path():
+    path = str(settings.FORECAST_PROFILE_PATH)
+    root, ext = os.path.splitext(path)
+    return f"{root}.partial{ext}"
+
+
+def load_profile(path=None):
+    """
+    The last saved run profile, or None if there isn't a readable one.
+    """
+    path = path or str(settings.FORECAST_PROFILE_PATH)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable run profile {path}: {e}")
+        return None
+
+
+def summary_table(profile):
+    """
+    Plain-text summary of a profile dict: stage times, per-model totals and the slowest fits.
+    """
+    lines = [f"Run {profile['run_id'] or '(partial)'}: {profile['courses_total']} courses, "
+             f"{profile['courses_cached']} reused from cache"]
+    if profile.get("courses_fallback"):
+        lines.append(f"{len(profile['courses_fallback'])} ran out of time and fell back: "
+                     + ", ".join(profile["courses_fallback"]))
+    lines.append("")
+    lines.append(f"{'Stage':<16}{'Seconds':>10}")
+    for stage, seconds in profile["stages"].items():
+        lines.append(f"{stage:<16}{seconds:>10.2f}")
+    lines.append("")
+    lines.append(f"{'Model':<10}{'Fits':>6}{'Fit s':>10}{'Val s':>10}{'Iters':>8}{'Not conv':>10}{'Warned':>8}")
+    for family, total in profile["families"].items():
+        lines.append(f"{family.upper():<10}{total['fits']:>6}{total['seconds']:>10.2f}"
+                     f"{total['val_seconds']:>10.2f}{total['iterations']:>8}"
+                     f"{total['not_converged']:>10}{total['with_warnings']:>8}")
+    if profile["slowest"]:
+        lines.append("")
+        lines.append(f"{'Slowest fits':<22}{'Model':<10}{'Seconds':>9}{'Iters':>7}{'Warned':>8}")
+        for fit in profile["slowest"]:
+            lines.append(f"{fit['code']:<22}{fit['model'].upper():<10}{fit['seconds']:>9.2f}"
+                         f"{fit['iterations'] if fit['iterations'] is not None else '-':>7}"
+                         f"{fit['warnings']:>8}")
+    return "\n".join(lines)
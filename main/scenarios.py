@@ -0,0 +1,159 @@
+"""
+What-if forecasts for the exogenous inputs of the ARIMAX/SARIMAX models.
+
+The models are rebuilt on the course's current series and filtered with the
+parameters stored by the last forecast run (ForecastResult.params), so nothing
+is refit. The exog inputs enter the next-term forecast linearly, so one
+forecast at the baseline inputs x0 and the exog coefficients beta give every
+scenario at once: forecast(X) = forecast(x0) + (X - x0) @ beta.
+"""
+import itertools
+
+import numpy as np
+
+from .arima import EXOG_FAMILIES, build_tasks, forecast_next, load_frames, make_model, prepare_series, subject_of
+from .models import ForecastResult
+
+#high school graduates enter the A101 models divided by this (see build_exog)
+HS_SCALE = 50
+MAX_SCENARIOS = 1000
+
+
+class ScenarioError(ValueError):
+    pass
+
+
+def exog_columns(code, prereqs):
+    """
+    (key, label, scale) for each exog column of a course, in build_exog's order.
+    """
+    columns = []
+    if code == "CSCE A101":
+        columns.append(("hs_graduates", "High school graduates", HS_SCALE))
+    for i, prereq in enumerate(prereqs):
+        columns.append((f"prereq_{i + 1}", f"{prereq} enrollment" if prereq else None, 1))
+    return columns
+
+
+def load_course(code, run_id=None):
+    """
+    A course's series, exog inputs and stored exog-model parameters from the latest run.
+    """
+    run_id = run_id or ForecastResult.latest_run_id()
+    stored = {
+        row.model: row for row in
+        ForecastResult.objects.filter(run_id=run_id, course=code, model__in=EXOG_FAMILIES)
+    }
+    if not any(row.params for row in stored.values()):
+        raise ScenarioError(f"No fitted ARIMAX/SARIMAX parameters for {code} in the latest forecast run.")
+
+    #only the course's subject (and prerequisites from other subjects) is needed for its inputs
+    df, prereq_map = load_frames(subjects=[subject_of(code)])
+    tasks = build_tasks(df, prereq_map, codes=[code])
+    series = prepare_series(tasks[0]) if tasks else None
+    if series is None:
+        raise ScenarioError(f"Not enough history for {code}.")
+
+    prereqs = prereq_map.get(code, {})
+    return {
+        "code": code,
+        "series": series,
+        "stored": stored,
+        "columns": exog_columns(code, [prereqs.get('prereq_1'), prereqs.get('prereq_2')]),
+    }
+
+
+def baseline_inputs(course):
+    """
+    The inputs the stored forecast used (the last term's exog row), in natural units.
+    """
+    _, exog, _ = course["series"]
+    return {key: float(value) * scale for (key, _, scale), value in zip(course["columns"], exog[-1])}
+
+
+def scenario_matrix(course, scenarios):
+    """
+    Scenario dicts ({column key: value}, missing keys keep the baseline) as a scaled exog matrix.
+    """
+    baseline = baseline_inputs(course)
+    unknown = {key for scenario in scenarios for key in scenario} - set(baseline)
+    if unknown:
+        raise ScenarioError(f"Unknown inputs for {course['code']}: {', '.join(sorted(unknown))}")
+    X = np.array([
+        [float(scenario.get(key, baseline[key])) / scale for key, _, scale in course["columns"]]
+        for scenario in scenarios
+    ]).reshape(len(scenarios), len(course["columns"]))
+    if not np.isfinite(X).all():
+        raise ScenarioError("Scenario inputs must be finite numbers.")
+    return X
+
+
+def family_forecasts(family, course, X):
+    """
+    Forecasts for every row of X from one exog model, with its base forecast and coefficients.
+    """
+    y, exog, _ = course["series"]
+    stored = course["stored"][family].params
+    spec = {key: tuple(value) for key, value in stored["spec"].items()}
+    model = make_model(family, y, exog, spec)
+    results = model.filter(np.asarray(stored["params"]))
+
+    x0 = exog[-1]
+    base = forecast_next(family, results, 1, x0.reshape(1, -1))[0]
+    beta = np.array([stored["params"][model.param_names.index(name)] for name in model.exog_names])
+    forecasts = base + (X - x0) @ beta
+    if not np.isfinite(forecasts).all():
+        raise ScenarioError("Scenario inputs are too large to forecast.")
+    return {
+        "base": round(float(base), 2),
+        "coefficients": {key: float(b) / scale for (key, _, scale), b in zip(course["columns"], beta)},
+        "forecasts": [max(round(float(f), 0), 0) for f in forecasts],
+    }
+
+
+def scenario_forecasts(code, scenarios, run_id=None):
+    """
+    Next-term ARIMAX/SARIMAX forecasts of a course for each scenario.
+    """
+    if len(scenarios) > MAX_SCENARIOS:
+        raise ScenarioError(f"At most {MAX_SCENARIOS} scenarios per request.")
+    course = load_course(code, run_id)
+    X = scenario_matrix(course, scenarios)
+
+    models = {}
+    for family, row in course["stored"].items():
+        if row.params:
+            models[family] = family_forecasts(family, course, X)
+
+    any_row = next(iter(course["stored"].values()))
+    return {
+        "code": code,
+        "term": any_row.target_term,
+        "term_name": any_row.term_name,
+        "inputs": [
+            {"key": key, "label": label, "baseline": baseline_inputs(course)[key]}
+            for key, label, _ in course["columns"] if label
+        ],
+        "scenarios": scenarios,
+        "models": models,
+    }
+
+
+def scenario_grid(values):
+    """
+    Every combination of {column key: [values]}, as scenario dicts.
+    """
+    keys = list(values)
+    if np.prod([len(values[key]) for key in keys]) > MAX_SCENARIOS:
+        raise ScenarioError(f"At most {MAX_SCENARIOS} scenarios per request.")
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(values[key] for key in keys))]
+
+
+def scenario_courses(run_id=None):
+    """
+    Courses with stored exog-model parameters in the latest run.
+    """
+    run_id = run_id or ForecastResult.latest_run_id()
+    return list(ForecastResult.objects
+                .filter(run_id=run_id, model__in=EXOG_FAMILIES, params__isnull=False)
+                .values_list('course', flat=True).distinct().order_by('course'))
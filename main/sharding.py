@@ -0,0 +1,186 @@
+"""
+Sharded forecast runs for catalogs with many subjects.
+
+Subjects are the unit of work: shard_subjects() splits them into balanced
+shards the same way on every worker, so independent processes (on one machine
+or several sharing the database and FORECAST_SHARD_DIR) can each run one shard
+with run_shard(). A shard fits one subject at a time, loading only that
+subject's courses and their prerequisites, so memory stays bounded by the
+largest subject rather than the catalog. merge_shards() combines the shard
+files into the forecast artifact and the ForecastResult run the webapp reads.
+
+Each shard file is stamped with the code version, the course data version and
+the shard count it was fitted with, and merge_shards() only merges shards whose
+stamps match the current ones, so files left over from an earlier run or from
+older data are never mixed into a new artifact.
+"""
+import json
+import os
+import time
+
+import pandas as pd
+from django.conf import settings
+
+from .arima import (
+    CODE_VERSION, build_tasks, load_frames, new_run_id, run_tasks_cached, select_best_model, subject_of, task_budget,
+    write_artifact,
+)
+from .artifacts import HISTORY_COLUMNS, json_safe
+
+
+class ShardError(Exception):
+    """
+    The shard files can't be merged (missing, or fitted for other code or data).
+    """
+
+
+def shard_stamp(count):
+    """
+    What a shard file has to have been fitted with to be merged now.
+    """
+    from .models import DataVersion
+
+    return {"code_version": CODE_VERSION, "data_version": DataVersion.current("course"), "shards": count}
+
+
+def catalog_subjects():
+    """
+    {subject: number of courses} for every subject in the Course table.
+    """
+    from .models import Course
+
+    counts = {}
+    for code in Course.objects.values_list('code', flat=True).distinct():
+        counts[subject_of(code)] = counts.get(subject_of(code), 0) + 1
+    return counts
+
+
+def shard_subjects(index, count, subject_counts=None):
+    """
+    Subjects of shard `index` out of `count`: biggest subjects first, each to the
+    currently smallest shard, so shards get similar numbers of courses.
+    """
+    if not 0 <= index < count:
+        raise ValueError(f"shard index must be between 0 and {count - 1}")
+    if subject_counts is None:
+        subject_counts = catalog_subjects()
+
+    loads = [0] * count
+    shards = [[] for _ in range(count)]
+    for subject, n in sorted(subject_counts.items(), key=lambda item: (-item[1], item[0])):
+        smallest = loads.index(min(loads))
+        shards[smallest].append(subject)
+        loads[smallest] += n
+    return sorted(shards[index])
+
+
+def shard_path(index, count):
+    return os.path.join(str(settings.FORECAST_SHARD_DIR), f"forecast_data.shard-{index}-of-{count}.json")
+
+
+def run_shard(index, count, workers=None, use_cache=True, rolling_folds=0, order_mode=None, progress=None,
+              research_orders=False, maxiter=None, fit_seconds=None, run_seconds=None):
+    """
+    Fit every course of one shard, one subject at a time, and write the shard file.
+
+    Each shard keeps its own fit and order caches next to its output, so shards
+    never write to the same cache file. maxiter, fit_seconds and run_seconds
+    work as in run_forecasts() (settings by default); the run deadline applies
+    to the shard as a whole.
+    """
+    from .backtest import backtest_scores, load_backtest
+    from .baselines import attach_baselines
+
+    if workers is None:
+        workers = settings.FORECAST_WORKERS
+    if order_mode is None:
+        order_mode = settings.FORECAST_ORDER_MODE
+    if maxiter is None:
+        maxiter = settings.FORECAST_FIT_MAXITER
+    if fit_seconds is None:
+        fit_seconds = settings.FORECAST_FIT_SECONDS
+    if run_seconds is None:
+        run_seconds = settings.FORECAST_RUN_SECONDS
+
+    #taken before loading, so data written while the shard runs makes it stale
+    stamp = shard_stamp(count)
+    subjects = shard_subjects(index, count)
+    path = shard_path(index, count)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fit_cache_path = path.replace(".json", ".fit_cache.json")
+    order_cache_path = path.replace(".json", ".order_cache.json")
+    budget = task_budget(maxiter, fit_seconds, time.time() + run_seconds if run_seconds else None)
+
+    backtest = backtest_scores(load_backtest())
+
+    history, results = [], []
+    for n, subject in enumerate(subjects):
+        df, prereq_map = load_frames(subjects=[subject])
+        #prerequisites from other subjects are loaded for the lags but not forecast here
+        df_subject = df[df['code'].map(subject_of) == subject]
+        tasks = build_tasks(df, prereq_map, codes=df_subject['code'].unique(), rolling_folds=rolling_folds)
+        if order_mode == "auto":
+            from .order_search import choose_orders
+            choose_orders(tasks, settings.FORECAST_ORDER_CRITERION, workers, research=research_orders,
+                          path=order_cache_path, budget=budget)
+        for task in tasks:
+            task["budget"] = budget
+        subject_results = run_tasks_cached(tasks, workers, use_cache, cache_path=fit_cache_path,
+                                           prioritize=budget["deadline"] is not None)
+        attach_baselines(subject_results, df_subject)
+        for result in subject_results:
+            select_best_model(result, backtest)
+
+        history.extend(df_subject[HISTORY_COLUMNS].to_dict('records'))
+        results.extend(subject_results)
+        print(f"Shard {index}/{count}: {subject} done ({len(tasks)} courses).")
+        if progress:
+            progress(n + 1, len(subjects))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(json_safe({
+            "shard": index,
+            "stamp": stamp,
+            "subjects": subjects,
+            "history": history,
+            "results": results,
+        }), f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def merge_shards(count, output_path=None):
+    """
+    Combine all `count` shard files into the forecast artifact and a new ForecastResult run.
+
+    Raises ShardError, writing nothing, if a shard is missing or its stamp
+    doesn't match shard_stamp() (other code, course data or shard count).
+    """
+    from .models import ForecastResult
+
+    if output_path is None:
+        output_path = str(settings.FORECAST_DATA_PATH)
+
+    missing = [i for i in range(count) if not os.path.exists(shard_path(i, count))]
+    if missing:
+        raise ShardError(f"Shards {missing} of {count} have not been written yet.")
+
+    stamp = shard_stamp(count)
+    shards = []
+    for i in range(count):
+        with open(shard_path(i, count), "r") as f:
+            shards.append(json.load(f))
+    stale = [i for i, shard in enumerate(shards) if shard.get("stamp") != stamp]
+    if stale:
+        raise ShardError(f"Shards {stale} of {count} were fitted for other code or course data; run them again.")
+
+    history, results = [], []
+    for shard in shards:
+        history.extend(shard["history"])
+        results.extend(shard["results"])
+
+    run_id = new_run_id()
+    write_artifact(pd.DataFrame(history, columns=HISTORY_COLUMNS), results, output_path, run_id)
+    ForecastResult.save_run(run_id, results)
+    return results
@@ -0,0 +1,137 @@
+"""
+Term calendar.
+
+Terms are YYYYSS codes: 202501 is Spring 2025, 202502 Summer 2025 and 202503
+Fall 2025. For arithmetic they are mapped to dense integer ordinals, so that
+consecutive terms are consecutive integers:
+
+- on the full calendar (summers=True) Spring, Summer and Fall follow each other;
+- on the no-summer calendar (summers=False), used for upper-level courses
+  whose summer terms are dropped, only Spring and Fall do. A Summer term
+  shares the ordinal of the Fall after it, so it steps back to the same
+  Spring as that Fall does.
+
+Every function takes an array of term codes (or a single code) and works on
+the whole array at once with NumPy. Labels ("Fall 2025") come from a lookup
+table built once at import.
+"""
+from datetime import date
+
+import numpy as np
+
+SEMESTER_NAMES = {1: "Spring", 2: "Summer", 3: "Fall"}
+SPRING, SUMMER, FALL = 1, 2, 3
+
+#years covered by the label lookup table; codes outside it are labelled one at a time
+FIRST_YEAR, LAST_YEAR = 1900, 2199
+LABELS = np.array([f"{SEMESTER_NAMES[sem]} {year}"
+                   for year in range(FIRST_YEAR, LAST_YEAR + 1) for sem in (SPRING, SUMMER, FALL)],
+                  dtype=object)
+
+
+def _split(terms):
+    return np.divmod(np.asarray(terms, dtype=np.int64), 100)
+
+
+def is_term(terms):
+    """
+    Whether each code names a Spring, Summer or Fall term (202509 doesn't).
+    """
+    return np.isin(np.asarray(terms, dtype=np.int64) % 100, (SPRING, SUMMER, FALL))
+
+
+def to_ordinals(terms, summers=True):
+    """
+    Dense ordinals of term codes.
+    """
+    year, sem = _split(terms)
+    if summers:
+        return year * 3 + (sem - 1)
+    return year * 2 + (sem != SPRING)
+
+
+def from_ordinals(ordinals, summers=True):
+    """
+    Term codes of ordinals (the inverse of to_ordinals).
+    """
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    if summers:
+        year, index = np.divmod(ordinals, 3)
+        return year * 100 + index + 1
+    year, is_fall = np.divmod(ordinals, 2)
+    return year * 100 + np.where(is_fall == 1, FALL, SPRING)
+
+
+def shift(terms, steps, summers=True):
+    """
+    The terms `steps` terms later (earlier for negative steps).
+    """
+    return from_ordinals(to_ordinals(terms, summers) + steps, summers)
+
+
+def lag(terms, steps_back, summers=True):
+    """
+    The terms `steps_back` terms earlier; without summers, Summer and Fall both lag to Spring first.
+    """
+    return shift(terms, -np.asarray(steps_back), summers)
+
+
+def next_terms(terms, summers=True, yearly=False):
+    """
+    The term each course is offered next after `terms`: the next term on the
+    calendar (skipping summers when summers=False), or the same semester next
+    year for courses only offered once a year (`yearly`, per course or for all).
+    """
+    following = shift(terms, 1)
+    if not summers:
+        following = np.where(following % 100 == SUMMER, shift(following, 1), following)
+    return np.where(yearly, shift(terms, 3), following)
+
+
+def term_range(first, last, summers=True):
+    """
+    Every term code from `first` through `last`, oldest first.
+    """
+    return from_ordinals(np.arange(to_ordinals(first, summers), to_ordinals(last, summers) + 1), summers)
+
+
+def current_term(today=None):
+    """
+    The term in session on `today`: Spring through April, Summer through August, then Fall.
+    """
+    today = today or date.today()
+    sem = SPRING if today.month <= 4 else SUMMER if today.month <= 8 else FALL
+    return today.year * 100 + sem
+
+
+def recent_terms(years=5, today=None):
+    """
+    Every term from Spring `years - 1` years ago through the current one, oldest
+    first (future terms have no enrollment yet).
+    """
+    last = current_term(today)
+    return term_range((last // 100 - (years - 1)) * 100 + SPRING, last)
+
+
+def label(term):
+    """
+    Name of a single term code (202503 -> "Fall 2025").
+    """
+    year, sem = divmod(int(term), 100)
+    return f"{SEMESTER_NAMES.get(sem, 'Unknown')} {year}"
+
+
+def labels(terms):
+    """
+    Names of an array of term codes, read from the lookup table.
+    """
+    terms = np.asarray(terms, dtype=np.int64)
+    year, sem = _split(terms)
+    index = (year - FIRST_YEAR) * 3 + (sem - 1)
+    known = (sem >= SPRING) & (sem <= FALL) & (index >= 0) & (index < len(LABELS))
+
+    names = np.empty(terms.shape, dtype=object)
+    names[known] = LABELS[index[known]]
+    for i in np.flatnonzero(~known.ravel()):
+        names.flat[i] = label(terms.flat[i])
+    return names
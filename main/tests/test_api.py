@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from main import payloads
+from main.models import Course, ForecastResult
+
+
+class CourseApiTests(TestCase):
+    TERMS = [202301, 202303, 202401, 202403, 202501, 202503]
+
+    def setUp(self):
+        payloads.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        #no artifact on disk, so courses without a saved run get baseline forecasts
+        settings = override_settings(FORECAST_DATA_PATH=os.path.join(directory.name, "forecast_data.json"))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        for code, title in (("MATH A200", "Calculus I"), ("CSCE A101", "Intro")):
+            Course.objects.bulk_create([Course(code=code, term=term, title=title, enrolled=100 + i)
+                                        for i, term in enumerate(self.TERMS)])
+        Course.data_changed()
+
+    def get_json(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_course_list(self):
+        self.assertEqual(self.get_json(reverse("api_courses")),
+                         [{"code": "CSCE A101", "title": "Intro"}, {"code": "MATH A200", "title": "Calculus I"}])
+
+    def test_course_forecast_of_the_saved_run(self):
+        ForecastResult.save_run("1", [{
+            "code": "CSCE A101", "title": "Intro", "term": 202601, "term_name": "Spring 2026",
+            "arima_forecast": 110.0, "arima_mae": 2.5, "best_model": "arima", "best_accuracy": 97.0,
+        }])
+        course = self.get_json(reverse("api_course_forecast", args=["CSCE A101"]))
+        self.assertEqual((course["code"], course["title"]), ("CSCE A101", "Intro"))
+        self.assertEqual(course["history"]["terms"], self.TERMS)
+        self.assertEqual(course["history"]["enrolled"], list(range(100, 106)))
+        self.assertEqual(len(course["history"]["term_names"]), len(self.TERMS))
+        forecast = course["forecast"]
+        self.assertEqual((forecast["term"], forecast["arima_forecast"], forecast["best_model"]),
+                         (202601, 110.0, "arima"))
+        self.assertFalse({"code", "title", "enrolled"} & set(forecast))
+
+    def test_course_without_a_run_gets_baselines(self):
+        forecast = self.get_json(reverse("api_course_forecast", args=["MATH A200"]))["forecast"]
+        self.assertIsNone(forecast.get("arima_forecast"))
+        self.assertIsNotNone(forecast["seasonal_naive_forecast"])
+
+    def test_unknown_course(self):
+        response = self.client.get(reverse("api_course_forecast", args=["CSCE A999"]))
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("CSCE A999", json.loads(response.content)["error"])
@@ -0,0 +1,72 @@
+import os
+import tempfile
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from main import backtest
+from main.arima import MODEL_FAMILIES, frames_from_rows, select_best_model
+from main.backtest import backtest_origins, backtest_scores, run_backtest, score, train_slice
+from main.benchmark import synthetic_rows
+
+
+class FoldTests(SimpleTestCase):
+    def test_origins(self):
+        self.assertEqual(backtest_origins(10, horizon=1, folds=4), [6, 7, 8, 9])
+        self.assertEqual(backtest_origins(10, horizon=2, folds=3), [6, 7, 8])
+        #never fewer than min_train terms to train on
+        self.assertEqual(backtest_origins(6, horizon=1, folds=4, min_train=4), [4, 5])
+        self.assertEqual(backtest_origins(4, horizon=1, folds=4, min_train=4), [])
+
+    def test_windows(self):
+        self.assertEqual(train_slice(8), slice(0, 8))
+        self.assertEqual(train_slice(8, "rolling", 5), slice(3, 8))
+        self.assertEqual(train_slice(3, "rolling", 5), slice(0, 3))
+
+    def test_score_with_gaps(self):
+        actual = np.array([[10.0, 20.0, 40.0], [10.0, 20.0, np.nan]])
+        preds = np.array([[12.0, 18.0, 43.0], [np.nan, 25.0, np.nan]])
+        mae, rmse, mape, counts = score(actual, preds)
+        np.testing.assert_allclose(mae, [7 / 3, 5])
+        np.testing.assert_allclose(rmse, [np.sqrt(17 / 3), 5])
+        np.testing.assert_allclose(mape, [(20 + 10 + 7.5) / 3, 25])
+        np.testing.assert_array_equal(counts, [3, 1])
+
+
+class BestModelTests(SimpleTestCase):
+    def record(self, model, mae, points=4):
+        return {"code": "CSCE A101", "model": model, "mae": mae, "folds": points, "points": points,
+                "actual": [100.0, None, 100.0]}
+
+    def test_backtest_decides_when_it_has_enough_points(self):
+        scores = backtest_scores([self.record("arima", 10.0), self.record("sarima", 5.0),
+                                  self.record("arimax", None)])
+        self.assertEqual(scores["CSCE A101"]["sarima"]["accuracy"], 95.0)
+        self.assertNotIn("arimax", scores["CSCE A101"])
+
+        result = {"code": "CSCE A101", "term": 202601, "arima_mae": 1.0, "sarima_mae": 9.0,
+                  "best_accuracy": 99.0}
+        select_best_model(result, scores)
+        self.assertEqual((result["best_model"], result["best_accuracy"]), ("sarima", 95.0))
+        self.assertEqual(result["best_model_source"], "backtest (4 folds)")
+
+        #too few backtest points: the holdout decides, with its own accuracy
+        select_best_model(result, backtest_scores([self.record("sarima", 5.0, points=2)]))
+        self.assertEqual((result["best_model"], result["best_model_source"], result["best_accuracy"]),
+                         ("arima", "holdout", 99.0))
+
+
+class RunBacktestTests(SimpleTestCase):
+    def test_writes_one_record_per_course_and_model(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        frames = frames_from_rows(*synthetic_rows(3, n_terms=12, prereq_density=1.0, seed=1))
+        with mock.patch.object(backtest, "load_frames", return_value=frames):
+            records = run_backtest(["SYN0 A103"], folds=2, workers=1,
+                                   output_path=os.path.join(directory.name, "backtest.json"))
+        self.assertEqual(sorted(record["model"] for record in records), sorted(MODEL_FAMILIES))
+        self.assertEqual(backtest.load_backtest(os.path.join(directory.name, "backtest.json")), records)
+        for record in records:
+            self.assertEqual((record["folds"], len(record["terms"]), len(record["preds"])), (2, 2, 2))
+            self.assertEqual(record["mae"] is None, record["points"] == 0)
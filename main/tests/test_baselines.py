@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from main.baselines import (
+    BASELINE_FAMILIES, baseline_forecasts, forecast_all, merge_baselines, moving_average, seasonal_naive, ses,
+)
+
+
+def frame(series):
+    return pd.DataFrame([{"code": code, "term": term, "enrolled": enrolled}
+                         for code, rows in series.items() for term, enrolled in rows])
+
+
+class BaselineTests(SimpleTestCase):
+    def setUp(self):
+        #ragged rows: a full series, a short one and a single term
+        self.values = np.array([[1, 2, 3, 4, 5, 6, 7], [10, 20, np.nan, np.nan, np.nan, np.nan, np.nan],
+                                [8, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan]])
+        self.lengths = np.array([7, 2, 1])
+        self.periods = np.array([3, 3, 2])
+
+    def test_seasonal_naive_and_moving_average(self):
+        np.testing.assert_array_equal(seasonal_naive(self.values, self.lengths, self.periods, 4),
+                                      [[5, 6, 7, 5], [20, 20, 20, 20], [8, 8, 8, 8]])
+        np.testing.assert_array_equal(moving_average(self.values, self.lengths, self.periods, 1),
+                                      [[6], [15], [8]])
+
+    def test_ses_matches_the_recursion(self):
+        level = self.values[0, 0]
+        for y in self.values[0, 1:]:
+            level += 0.5 * (y - level)
+        self.assertAlmostEqual(ses(self.values, self.lengths, 1, alphas=[0.5])[0, 0], level)
+
+    def test_rows_are_independent(self):
+        #each course's forecasts are the same fitted alone or in the batch
+        batch = forecast_all(self.values, self.lengths, self.periods, 2)
+        for i in range(len(self.values)):
+            alone = forecast_all(self.values[i:i + 1, :self.lengths[i]], self.lengths[i:i + 1],
+                                 self.periods[i:i + 1], 2)
+            for family in BASELINE_FAMILIES:
+                np.testing.assert_allclose(batch[family][i], alone[family][0], err_msg=family)
+        #Holt-Winters needs two full seasons
+        self.assertTrue(np.isnan(batch["holt_winters"][1:]).all())
+        self.assertFalse(np.isnan(batch["holt_winters"][0]).any())
+
+    def test_baseline_forecasts(self):
+        terms = [202301, 202303, 202401, 202403, 202501, 202503]
+        results = baseline_forecasts(frame({
+            "CSCE A101": list(zip(terms, [100, 80, 110, 90, 120, 100])),
+            "CSCE A102": [(202503, 40)],
+        }))
+        record = results["CSCE A101"]
+        self.assertEqual((record["term"], record["term_name"]), (202601, "Spring 2026"))
+        #lower-level courses repeat the value of three terms back
+        self.assertEqual(record["seasonal_naive_val_terms"], [202501, 202503])
+        self.assertEqual(record["seasonal_naive_forecast"], 90)
+        self.assertEqual(record["seasonal_naive_val_preds"], [80, 110])
+        self.assertEqual(record["seasonal_naive_mae"], 25.0)
+        short = results["CSCE A102"]
+        self.assertEqual(short["seasonal_naive_forecast"], 40)
+        self.assertIsNone(short["seasonal_naive_mae"])
+
+    def test_merge_skips_courses_without_a_forecast(self):
+        baselines = {"CSCE A101": {"code": "CSCE A101", "term": 202601, "ses_forecast": 50.0, "ses_mae": 1.0}}
+        merged = merge_baselines({"code": "CSCE A101", "term": 202601}, baselines)
+        self.assertEqual((merged["ses_forecast"], merged["ses_mae"]), (50.0, 1.0))
+        self.assertNotIn("ses_forecast", merge_baselines({"code": "CSCE A101", "term": None}, baselines))
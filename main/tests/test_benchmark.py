@@ -0,0 +1,21 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from main import benchmark
+from main.arima import MODEL_FAMILIES, validate_family
+
+
+class RunCaseTests(SimpleTestCase):
+    def test_validation_rate_counts_validation_fits(self):
+        #the ARIMA holdout fit fails, but every family still gets its full fit
+        def validate(family, *args, **kwargs):
+            out = validate_family(family, *args, **kwargs)
+            return {**out, "mae": None} if family == "arima" else out
+
+        with mock.patch.object(benchmark, "validate_family", validate):
+            case = benchmark.run_case(3, fit_sample=2, track_memory=False)
+        self.assertEqual(case["fits"], 2 * len(MODEL_FAMILIES))
+        self.assertEqual(case["validation_fits"], 2 * (len(MODEL_FAMILIES) - 1))
+        self.assertAlmostEqual(case["validation_fits_per_sec"],
+                               case["validation_fits"] / case["stages"]["validation"]["seconds"], places=1)
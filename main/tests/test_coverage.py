@@ -0,0 +1,31 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from main import coverage
+from main.models import Course
+from main.terms import recent_terms
+
+
+class CoverageTests(TestCase):
+    def setUp(self):
+        coverage.invalidate()
+        self.terms = recent_terms(years=1).tolist()
+
+    def test_missing_terms_follow_batched_writes(self):
+        self.assertEqual(coverage.missing_terms(["CSCE"], years=1), {"CSCE": self.terms})
+        Course.objects.create(code="CSCE A101", term=self.terms[0], title="Intro", enrolled=10)
+        #the index is cached until a write path reports its batch
+        self.assertEqual(coverage.missing_terms(["CSCE"], years=1), {"CSCE": self.terms})
+        Course.data_changed()
+        self.assertEqual(coverage.missing_terms(["CSCE"], years=1).get("CSCE", []), self.terms[1:])
+
+    def test_scrape_clears_the_index_once_per_term(self):
+        scraped = {term: [("CSCE A101", "Intro", 10), ("CSCE A201", "Programming", 20)] for term in self.terms}
+        with mock.patch("main.csce_scraper.schedule_scraper", lambda term, subj: scraped[term]), \
+                mock.patch.object(Course, "data_changed", wraps=Course.data_changed) as data_changed:
+            saved = Course.save_subject_courses("CSCE", self.terms)
+        self.assertEqual(saved, 2 * len(self.terms))
+        self.assertEqual(data_changed.call_count, len(self.terms))
+        self.assertEqual(coverage.missing_terms(["CSCE"], years=1), {})
+
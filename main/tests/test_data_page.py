@@ -0,0 +1,50 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from main.models import Course
+from main.views import course_pivot, sorted_courses
+
+
+class DataPageTests(TestCase):
+    def setUp(self):
+        Course.objects.bulk_create([
+            Course(code="CSCE A101", term=202501, title="Intro", enrolled=120),
+            Course(code="CSCE A101", term=202503, title="Intro", enrolled=90),
+            Course(code="CSCE A201", term=202503, title="Programming", enrolled=60),
+            Course(code="MATH A200", term=202501, title="Calculus I", enrolled=80),
+            #a course whose titles disagree shows its first-saved row's
+            Course(code="MATH A200", term=202503, title="Calculus", enrolled=1),
+        ])
+
+    def codes(self, sort):
+        return [row["code"] for row in sorted_courses(sort)]
+
+    def test_sorting(self):
+        self.assertEqual(self.codes("code"), ["CSCE A101", "CSCE A201", "MATH A200"])
+        self.assertEqual(self.codes("-code"), ["MATH A200", "CSCE A201", "CSCE A101"])
+        self.assertEqual(self.codes("-title"), ["CSCE A201", "CSCE A101", "MATH A200"])
+        #courses without the term go last either way
+        self.assertEqual(self.codes("202501"), ["MATH A200", "CSCE A101", "CSCE A201"])
+        self.assertEqual(self.codes("-202501"), ["CSCE A101", "MATH A200", "CSCE A201"])
+        self.assertEqual({row["code"]: row["course_title"] for row in sorted_courses("code")}["MATH A200"],
+                         "Calculus I")
+
+    def test_pivot(self):
+        self.assertEqual(course_pivot(["CSCE A201", "MATH A200"], [202503, 202501]),
+                         {"CSCE A201": [60, "-"], "MATH A200": [1, 80]})
+
+    def test_pages(self):
+        response = self.client.get(reverse("data"), {"sort": "-202503", "per_page": 2})
+        self.assertEqual(list(response.context["courses_dict"]), ["CSCE A101", "CSCE A201"])
+        self.assertEqual(response.context["courses_dict"]["CSCE A101"]["enrolled_list"], [90, 120])
+        self.assertIsNone(response.context["previous_url"])
+        self.assertIn("page=2", response.context["next_url"])
+
+        response = self.client.get(reverse("data"), {"sort": "-202503", "per_page": 2, "page": 2})
+        self.assertEqual(list(response.context["courses_dict"]), ["MATH A200"])
+        self.assertIsNone(response.context["next_url"])
+
+    def test_bad_parameters_fall_back(self):
+        response = self.client.get(reverse("data"), {"sort": "enrolled", "per_page": "all", "page": "x"})
+        self.assertEqual(list(response.context["courses_dict"]), ["CSCE A101", "CSCE A201", "MATH A200"])
+        self.assertEqual(response.context["page"].number, 1)
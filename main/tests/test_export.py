@@ -0,0 +1,57 @@
+import csv
+import gzip
+import io
+
+from django.test import TestCase
+from django.urls import reverse
+
+from main.models import Course
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        Course.objects.bulk_create([
+            Course(code="CSCE A101", term=202501, title="Intro", enrolled=120),
+            Course(code="CSCE A101", term=202503, title="Intro", enrolled=90),
+            Course(code="MATH A200", term=202401, title="Calculus I", enrolled=80),
+            Course(code="MATH A200", term=202503, title="Calculus I", enrolled=75),
+            #a subject that only shares the prefix
+            Course(code="CSCEX A100", term=202503, title="Other", enrolled=5),
+        ])
+
+    def export(self, **params):
+        response = self.client.get(reverse("download_data"), params)
+        self.assertEqual(response.status_code, 200)
+        content = b"".join(response.streaming_content)
+        if params.get("gzip"):
+            self.assertEqual(response["Content-Type"], "application/gzip")
+            self.assertIn("course_data.csv.gz", response["Content-Disposition"])
+            content = gzip.decompress(content)
+        return list(csv.reader(io.StringIO(content.decode("utf-8"))))
+
+    def test_full_export(self):
+        self.assertEqual(self.export(), [
+            ["Code", "Title", "202503", "202501", "202401"],
+            ["CSCE A101", "Intro", "90", "120", "-"],
+            ["CSCEX A100", "Other", "5", "-", "-"],
+            ["MATH A200", "Calculus I", "75", "-", "80"],
+        ])
+
+    def test_subject_and_term_filters(self):
+        self.assertEqual(self.export(subject="csce"), [
+            ["Code", "Title", "202503", "202501"],
+            ["CSCE A101", "Intro", "90", "120"],
+        ])
+        self.assertEqual(self.export(subject=["CSCE", "MATH"], term_from="202501", term_to="202503"), [
+            ["Code", "Title", "202503", "202501"],
+            ["CSCE A101", "Intro", "90", "120"],
+            ["MATH A200", "Calculus I", "75", "-"],
+        ])
+
+    def test_gzip(self):
+        self.assertEqual(self.export(gzip="1"), self.export())
+
+    def test_bad_term_is_rejected(self):
+        for value in ("2025", "spring", "202509"):
+            response = self.client.get(reverse("download_data"), {"term_from": value})
+            self.assertEqual(response.status_code, 400, value)
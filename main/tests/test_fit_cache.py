@@ -0,0 +1,61 @@
+import copy
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from main import arima
+from main.arima import run_tasks_cached, task_budget, task_cache_key
+from main.tests.test_arima import fixture_task
+
+
+class TaskCacheKeyTests(SimpleTestCase):
+    def setUp(self):
+        self.task = fixture_task()
+        self.key = task_cache_key(self.task)
+
+    def changed(self, change):
+        task = copy.deepcopy(self.task)
+        change(task)
+        return task_cache_key(task)
+
+    def test_key_is_stable_across_builds(self):
+        self.assertEqual(task_cache_key(fixture_task()), self.key)
+
+    def test_key_follows_the_fit_inputs(self):
+        def more_enrolled(task):
+            task["history"].loc[task["history"].index[-1], "enrolled"] += 1
+
+        def other_order(task):
+            task["orders"]["arima"] = {"order": (2, 1, 1)}
+
+        def other_exog(task):
+            task["exog"][-1, 0] += 1
+
+        for change in (more_enrolled, other_order, other_exog,
+                       lambda task: task.update(budget=task_budget(maxiter=10)),
+                       lambda task: task.update(rolling_folds=2)):
+            self.assertNotEqual(self.changed(change), self.key)
+
+    def test_time_limits_do_not_change_the_key(self):
+        self.assertEqual(self.changed(lambda task: task.update(budget=task_budget(fit_seconds=5, deadline=1e12))),
+                         self.key)
+
+
+class RunTasksCachedTests(SimpleTestCase):
+    def test_unchanged_course_is_reused(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "fit_cache.json")
+        first = run_tasks_cached([fixture_task()], cache_path=path)
+
+        with mock.patch.object(arima, "forecast_course", side_effect=AssertionError("refit")):
+            second = run_tasks_cached([fixture_task()], cache_path=path)
+        self.assertEqual(second[0]["arima_forecast"], first[0]["arima_forecast"])
+
+        task = fixture_task()
+        task["orders"]["arima"] = {"order": (0, 1, 1)}
+        with mock.patch.object(arima, "forecast_course", return_value={"code": task["code"]}) as refit:
+            run_tasks_cached([task], cache_path=path)
+        refit.assert_called_once()
@@ -0,0 +1,72 @@
+from io import BytesIO
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase
+from django.urls import reverse
+
+from main.ingest import IngestError, ingest_csv
+from main.models import Course
+
+
+def csv_file(text):
+    return BytesIO(text.encode("utf-8"))
+
+
+class IngestTests(TestCase):
+    UPLOAD = (
+        "Code,Title,202503,202501,202403\n"
+        "CSCE A101,Intro to Computer Science,120,95,-\n"
+        "CSCE A201,Computer Programming I,60,,55\n"
+        "MATH A200,Calculus I,80,75,70\n"
+    )
+
+    def stored(self):
+        return set(Course.objects.values_list("code", "title", "term", "enrolled"))
+
+    def test_upload_round_trip(self):
+        result = ingest_csv(csv_file(self.UPLOAD))
+        self.assertEqual((result.created, result.updated, result.skipped), (7, 0, 0))
+        self.assertEqual(result.changed_courses, {"CSCE A101", "CSCE A201", "MATH A200"})
+        stored = self.stored()
+
+        response = self.client.get(reverse("download_data"))
+        exported = b"".join(response.streaming_content).decode("utf-8")
+        #blank cells come back as "-"
+        self.assertEqual(exported.replace("\r\n", "\n"), self.UPLOAD.replace(",,", ",-,"))
+
+        Course.objects.all().delete()
+        ingest_csv(csv_file(exported))
+        self.assertEqual(self.stored(), stored)
+
+    def test_non_term_header_is_rejected(self):
+        for header in ("Fall 2025", "202509"):
+            with self.assertRaises(IngestError) as raised:
+                ingest_csv(csv_file(f"Code,Title,202503,{header}\nCSCE A101,Intro,120,95\n"))
+            self.assertIn(header, str(raised.exception))
+            self.assertEqual(raised.exception.result.changed, 0)
+            self.assertFalse(Course.objects.exists())
+
+    def test_one_changed_cell(self):
+        ingest_csv(csv_file(self.UPLOAD))
+        result = ingest_csv(csv_file(self.UPLOAD.replace("Calculus I,80,75,70", "Calculus I,80,76,70")))
+        self.assertEqual((result.created, result.updated, result.unchanged), (0, 1, 6))
+        self.assertEqual(result.changed_courses, {"MATH A200"})
+        self.assertEqual(Course.objects.get(code="MATH A200", term=202501).enrolled, 76)
+
+    def test_failed_chunk_is_not_counted(self):
+        upload = "Code,Title,202503\n" + "".join(f"CSCE A10{i},Course {i},{i + 10}\n" for i in range(4))
+        bulk_create = Course.objects.bulk_create
+
+        def fail_second_chunk(*args, **kwargs):
+            if Course.objects.exists():
+                raise DatabaseError("disk full")
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(Course.objects, "bulk_create", side_effect=fail_second_chunk):
+            with self.assertRaises(IngestError) as raised:
+                ingest_csv(csv_file(upload), chunk_rows=2)
+        result = raised.exception.result
+        self.assertEqual((result.created, result.updated), (2, 0))
+        self.assertEqual(result.changed_courses, {"CSCE A100", "CSCE A101"})
+        self.assertEqual(Course.objects.count(), 2)
@@ -0,0 +1,89 @@
+import os
+import socket
+import subprocess
+import sys
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from main import jobs
+from main.models import BackgroundJob
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", ""])
+    process.wait()
+    return process.pid
+
+
+@mock.patch.object(jobs, "start_runner", lambda: None)
+class JobQueueTests(TestCase):
+    def running_job(self, owner, heartbeat_age=timedelta(0)):
+        at = timezone.now() - heartbeat_age
+        return BackgroundJob.objects.create(kind="forecast", status=BackgroundJob.RUNNING, owner=owner,
+                                            started_at=at, heartbeat_at=at)
+
+    def test_enqueue_merges_into_pending_job(self):
+        first = jobs.enqueue("forecast", reason="upload", start=False)
+        second = jobs.enqueue("forecast", reason="rescrape", start=False)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual((second.triggers, second.reason), (2, "upload; rescrape"))
+
+    def test_enqueue_once_is_single_flight_with_cooldown(self):
+        job = jobs.enqueue_once("scrape_missing", cooldown=timedelta(hours=1))
+        self.assertIsNotNone(job)
+        self.assertIsNone(jobs.enqueue_once("scrape_missing", cooldown=timedelta(hours=1)))
+        BackgroundJob.objects.filter(pk=job.pk).update(status=BackgroundJob.DONE, finished_at=timezone.now())
+        self.assertIsNone(jobs.enqueue_once("scrape_missing", cooldown=timedelta(hours=1)))
+        self.assertIsNotNone(jobs.enqueue_once("scrape_missing"))
+
+    def test_claim_waits_for_a_live_owner(self):
+        #a job of a live process on this host keeps the lock however old its heartbeat is
+        running = self.running_job(f"{socket.gethostname()}:{os.getppid()}", timedelta(hours=2))
+        jobs.enqueue("rescrape", start=False)
+        self.assertIsNone(jobs.claim_next())
+        running.refresh_from_db()
+        self.assertEqual(running.status, BackgroundJob.RUNNING)
+
+    def test_claim_fails_job_of_dead_owner(self):
+        running = self.running_job(f"{socket.gethostname()}:{dead_pid()}")
+        pending = jobs.enqueue("rescrape", start=False)
+        claimed = jobs.claim_next()
+        running.refresh_from_db()
+        self.assertEqual(running.status, BackgroundJob.FAILED)
+        self.assertEqual((claimed.pk, claimed.status, claimed.owner), (pending.pk, BackgroundJob.RUNNING, jobs.OWNER))
+
+    def test_claim_fails_stale_job_of_other_host(self):
+        fresh = self.running_job("elsewhere:123", timedelta(minutes=5))
+        jobs.enqueue("rescrape", start=False)
+        self.assertIsNone(jobs.claim_next())
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, BackgroundJob.RUNNING)
+
+        BackgroundJob.objects.filter(pk=fresh.pk).update(heartbeat_at=timezone.now() - jobs.STALE_AFTER * 2)
+        self.assertIsNotNone(jobs.claim_next())
+        fresh.refresh_from_db()
+        self.assertEqual((fresh.status, fresh.error), (BackgroundJob.FAILED, "Job stopped reporting progress."))
+
+    def test_run_job_keeps_a_failed_status(self):
+        def handler(job, progress):
+            #another process failed the job while it ran
+            BackgroundJob.objects.filter(pk=job.pk).update(status=BackgroundJob.FAILED, error="stale")
+
+        jobs.enqueue("test", start=False)
+        job = jobs.claim_next()
+        with mock.patch.dict(jobs.JOB_HANDLERS, {"test": handler}):
+            jobs.run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (BackgroundJob.FAILED, "stale"))
+
+    def test_run_job_records_done(self):
+        jobs.enqueue("test", start=False)
+        job = jobs.claim_next()
+        with mock.patch.dict(jobs.JOB_HANDLERS, {"test": lambda job, progress: progress(1, 1)}):
+            jobs.run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress, job.total), (BackgroundJob.DONE, 1, 1))
+        self.assertIsNone(jobs._current_job)
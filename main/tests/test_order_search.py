@@ -0,0 +1,54 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from django.test import SimpleTestCase
+
+from main.arima import task_budget
+from main.backtest import build_units, run_unit
+from main.order_search import _prune, choose_orders, load_orders, search_orders
+from main.tests.test_arima import fixture_task
+
+
+class RunBudgetTests(SimpleTestCase):
+    def setUp(self):
+        self.task = fixture_task()
+        self.expired = task_budget(deadline=time.time() - 1)
+
+    def test_search_past_the_deadline_is_incomplete(self):
+        found = search_orders([self.task], budget=self.expired)
+        self.assertEqual(found[self.task["code"]]["complete"], False)
+        self.assertEqual(found[self.task["code"]]["orders"], {})
+
+    def test_incomplete_search_is_not_remembered(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "orders.json")
+        defaults = dict(self.task["orders"])
+        choose_orders([self.task], path=path, budget=self.expired)
+        self.assertEqual(self.task["orders"], defaults)
+        self.assertNotIn(self.task["code"], load_orders(path))
+
+    def test_backtest_folds_past_the_deadline_are_unscored(self):
+        units = build_units([self.task], folds=2, budget=self.expired)
+        self.assertTrue(units)
+        for unit in units:
+            self.assertTrue(np.isnan(run_unit(unit)).all())
+
+
+class PruneTests(SimpleTestCase):
+    def unit(self, p):
+        return {"code": "CSCE A101", "family": "arima", "spec": {"order": (p, 1, 0)}}
+
+    def test_non_converged_screening_fits_are_dropped(self):
+        units = [self.unit(p) for p in range(3)]
+        #the non-converged fit scores best but must neither survive nor prune the others
+        scores = [(50.0, False, False), (100.0, True, False), (105.0, True, False)]
+        self.assertEqual(_prune(units, scores, "aic"), units[1:])
+
+    def test_dominated_and_failed_candidates_are_dropped(self):
+        units = [self.unit(p) for p in range(3)]
+        self.assertEqual(_prune(units, [(1.0, True, False), (5.0, True, False), (None, False, False)], "holdout"),
+                         units[:1])
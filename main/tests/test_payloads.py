@@ -0,0 +1,57 @@
+import gzip
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from main import payloads
+from main.models import Course
+
+
+class CourseStampTests(TestCase):
+    def test_batched_writes_bump_the_stamp_once(self):
+        before = payloads.course_stamp()
+        Course.objects.bulk_create([Course(code=f"CSCE A{100 + i}", term=202501, title="T", enrolled=i)
+                                    for i in range(20)])
+        Course.data_changed()
+        self.assertEqual(payloads.course_stamp(), before + 1)
+
+    def test_deleting_the_catalog_is_one_query(self):
+        Course.objects.bulk_create([Course(code=f"CSCE A{100 + i}", term=202501, title="T", enrolled=i)
+                                    for i in range(20)])
+        with self.assertNumQueries(1):
+            Course.objects.all().delete()
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        payloads.clear()
+        Course.objects.create(code="CSCE A101", term=202501, title="Intro", enrolled=10)
+        Course.data_changed()
+        self.url = reverse("api_courses")
+
+    def test_not_modified_until_the_data_changes(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertEqual(json.loads(response.content), [{"code": "CSCE A101", "title": "Intro"}])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Course.objects.create(code="CSCE A201", term=202501, title="Programming", enrolled=20)
+        Course.data_changed()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)), 2)
+
+    def test_etag_is_specific_to_the_encoding(self):
+        identity = self.client.get(self.url)
+        gzipped = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(gzipped.content)), json.loads(identity.content))
+        self.assertNotEqual(identity["ETag"], gzipped["ETag"])
+
+        #an identity ETag doesn't validate a gzipped body, and 304s vary on the encoding too
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=identity["ETag"])
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=gzipped["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("Accept-Encoding", response["Vary"])
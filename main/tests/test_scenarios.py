@@ -0,0 +1,69 @@
+import json
+from types import SimpleNamespace
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from main.arima import fit_model, forecast_next, make_model, prepare_series
+from main.scenarios import (
+    MAX_SCENARIOS, ScenarioError, baseline_inputs, exog_columns, family_forecasts, scenario_grid, scenario_matrix,
+)
+from main.tests.test_arima import fixture_task
+
+
+class ScenarioTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        task = fixture_task()
+        series = prepare_series(task)
+        y, exog, _ = series
+        spec = task["orders"]["arimax"]
+        cls.fit = fit_model(make_model("arimax", y, exog, spec))
+        cls.course = {
+            "code": task["code"],
+            "series": series,
+            "stored": {"arimax": SimpleNamespace(params={"spec": spec, "params": cls.fit.params.tolist()})},
+            #the fixture course has two prerequisites, one exog column each
+            "columns": exog_columns(task["code"], ["SYN0 A101", "SYN0 A102"]),
+        }
+
+    def test_baseline_scenario_is_the_stored_forecast(self):
+        _, exog, _ = self.course["series"]
+        out = family_forecasts("arimax", self.course, scenario_matrix(self.course, [{}]))
+        expected = forecast_next("arimax", self.fit, 1, exog[-1].reshape(1, -1))[0]
+        self.assertAlmostEqual(out["base"], round(expected, 2), places=2)
+        self.assertEqual(out["forecasts"], [max(round(expected, 0), 0)])
+
+    def test_scenarios_match_forecasting_the_inputs(self):
+        key = self.course["columns"][0][0]
+        baseline = baseline_inputs(self.course)[key]
+        X = scenario_matrix(self.course, [{key: baseline * 0.5}, {key: baseline * 2}])
+        out = family_forecasts("arimax", self.course, X)
+        for row, forecast in zip(X, out["forecasts"]):
+            expected = forecast_next("arimax", self.fit, 1, row.reshape(1, -1))[0]
+            self.assertEqual(forecast, max(round(expected, 0), 0))
+
+    def test_bad_inputs_are_rejected(self):
+        key = self.course["columns"][0][0]
+        for scenario in ({"unknown": 1.0}, {key: float("nan")}, {key: float("inf")}):
+            with self.assertRaises(ScenarioError):
+                scenario_matrix(self.course, [scenario])
+
+    def test_grid(self):
+        self.assertEqual(scenario_grid({"a": [1, 2], "b": [3]}), [{"a": 1, "b": 3}, {"a": 2, "b": 3}])
+        self.assertEqual(scenario_grid({}), [{}])
+        with self.assertRaises(ScenarioError):
+            scenario_grid({"a": list(range(MAX_SCENARIOS)), "b": [1, 2]})
+
+
+class ScenarioViewTests(TestCase):
+    def get(self, **params):
+        return self.client.get(reverse("scenario_forecast"), {"course": "CSCE A101", **params})
+
+    def test_errors_are_bad_requests(self):
+        for params in ({"hs_graduates": "lots"}, {"hs_graduates": "7000"}):
+            response = self.get(**params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", json.loads(response.content))
@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from main.models import Course, ForecastResult
+from main.sharding import ShardError, merge_shards, shard_path, shard_stamp, shard_subjects
+
+
+class ShardSubjectsTests(SimpleTestCase):
+    def test_subjects_are_split_evenly_and_completely(self):
+        counts = {"CSCE": 40, "MATH": 30, "PHYS": 20, "CHEM": 15, "BIOL": 10, "ENGL": 5}
+        shards = [shard_subjects(i, 3, counts) for i in range(3)]
+        self.assertEqual(sorted(s for shard in shards for s in shard), sorted(counts))
+        self.assertEqual([sum(counts[s] for s in shard) for shard in shards], [40, 40, 40])
+
+    def test_index_out_of_range(self):
+        with self.assertRaises(ValueError):
+            shard_subjects(2, 2, {"CSCE": 1})
+
+
+class MergeShardsTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(FORECAST_SHARD_DIR=directory.name,
+                                     FORECAST_DATA_PATH=os.path.join(directory.name, "forecast_data.json"))
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def write_shard(self, index, count, code, stamp=None):
+        result = {"code": code, "title": code, "term": 202601, "term_name": "Spring 2026",
+                  "arima_forecast": 10.0, "arima_mae": 1.0}
+        with open(shard_path(index, count), "w") as f:
+            json.dump({"shard": index, "stamp": stamp or shard_stamp(count), "subjects": [code.split()[0]],
+                       "history": [], "results": [result]}, f)
+
+    def test_merges_shards_of_the_current_data(self):
+        self.write_shard(0, 2, "CSCE A101")
+        self.write_shard(1, 2, "MATH A200")
+        results = merge_shards(2)
+        self.assertEqual([r["code"] for r in results], ["CSCE A101", "MATH A200"])
+        run_id = ForecastResult.latest_run_id()
+        self.assertEqual(set(ForecastResult.objects.filter(run_id=run_id).values_list("course", flat=True)),
+                         {"CSCE A101", "MATH A200"})
+
+    def test_refuses_missing_and_stale_shards(self):
+        self.write_shard(0, 2, "CSCE A101")
+        with self.assertRaises(ShardError):
+            merge_shards(2)
+
+        self.write_shard(1, 2, "MATH A200")
+        #the course data changed after the shards were fitted
+        Course.data_changed()
+        with self.assertRaises(ShardError):
+            merge_shards(2)
+
+        self.write_shard(0, 2, "CSCE A101", stamp={**shard_stamp(2), "code_version": "old"})
+        self.write_shard(1, 2, "MATH A200")
+        with self.assertRaisesRegex(ShardError, r"\[0\]"):
+            merge_shards(2)
+        self.assertIsNone(ForecastResult.latest_run_id())
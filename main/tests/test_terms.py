@@ -0,0 +1,111 @@
+from datetime import date
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from main import terms
+
+
+#the term helpers terms.py replaced, kept here as the reference behaviour
+def previous_term_code(term_code):
+    year, sem = divmod(int(term_code), 100)
+    if sem == 1:
+        return (year - 1) * 100 + 3
+    elif sem == 2:
+        return year * 100 + 1
+    elif sem == 3:
+        return year * 100 + 2
+
+
+def get_previous_term(term, steps_back, upper_level=False):
+    lag_term = term
+    for _ in range(steps_back):
+        lag_term = previous_term_code(lag_term)
+        if upper_level and (lag_term % 100 == 2):
+            lag_term = previous_term_code(lag_term)
+    return lag_term
+
+
+def next_term_code(last_term, course_num, spring_count, summer_count, fall_count, yearly_course):
+    year, sem = divmod(int(last_term), 100)
+
+    if yearly_course:
+        if spring_count > 0 and summer_count == 0 and fall_count == 0:
+            return (year + 1) * 100 + 1 if sem == 1 else year * 100 + 1
+        if spring_count == 0 and summer_count > 0 and fall_count == 0:
+            return (year + 1) * 100 + 2 if sem == 2 else year * 100 + 2
+        if spring_count == 0 and summer_count == 0 and fall_count > 0:
+            return (year + 1) * 100 + 3 if sem == 3 else year * 100 + 3
+
+    if course_num > 201:
+        if sem in (1, 2):
+            return year * 100 + 3
+        return (year + 1) * 100 + 1
+    if sem == 1:
+        return year * 100 + 2
+    elif sem == 2:
+        return year * 100 + 3
+    return (year + 1) * 100 + 1
+
+
+def build_term_codes_past_years(years=5, today=None):
+    today = today or date.today()
+    sem_now = "01" if today.month <= 4 else "02" if today.month <= 8 else "03"
+    cutoff = int(f"{today.year}{sem_now}")
+    codes = []
+    for year in range(today.year - (years - 1), today.year + 1):
+        for sem in ("01", "02", "03"):
+            if int(f"{year}{sem}") <= cutoff:
+                codes.append(int(f"{year}{sem}"))
+    return codes
+
+
+ALL_TERMS = [year * 100 + sem for year in range(2010, 2030) for sem in (1, 2, 3)]
+
+
+class TermsTests(SimpleTestCase):
+    def test_lag_matches_previous_term(self):
+        for summers in (True, False):
+            for steps in range(1, 5):
+                expected = [get_previous_term(term, steps, upper_level=not summers) for term in ALL_TERMS]
+                self.assertEqual(terms.lag(ALL_TERMS, steps, summers=summers).tolist(), expected,
+                                 f"summers={summers}, steps={steps}")
+
+    def test_lag_without_summers_skips_summer(self):
+        self.assertEqual(terms.lag(202503, 1, summers=False), 202501)
+        self.assertEqual(terms.lag(202502, 1, summers=False), 202501)
+        self.assertEqual(terms.lag(202501, 1, summers=False), 202403)
+        self.assertEqual(terms.lag(202503, 3, summers=False), 202401)
+
+    def test_next_terms_matches_next_term_code(self):
+        for course_num in (101, 301):
+            expected = [next_term_code(term, course_num, 1, 1, 1, False) for term in ALL_TERMS]
+            self.assertEqual(terms.next_terms(ALL_TERMS, summers=course_num <= 201).tolist(), expected)
+
+    def test_next_terms_of_yearly_courses(self):
+        #a yearly course is offered in a single semester, the one of its last term
+        for term in ALL_TERMS:
+            counts = [int(term % 100 == sem) for sem in (1, 2, 3)]
+            for course_num in (101, 301):
+                self.assertEqual(terms.next_terms(term, summers=course_num <= 201, yearly=True),
+                                 next_term_code(term, course_num, *counts, True))
+
+    def test_next_terms_per_course(self):
+        next_ = terms.next_terms([202501, 202501, 202503], yearly=np.array([False, True, False]))
+        self.assertEqual(next_.tolist(), [202502, 202601, 202601])
+
+    def test_recent_terms_matches_past_years(self):
+        for month in range(1, 13):
+            today = date(2025, month, 15)
+            for years in (1, 5):
+                self.assertEqual(terms.recent_terms(years, today).tolist(),
+                                 build_term_codes_past_years(years, today), f"{today}, years={years}")
+
+    def test_labels(self):
+        self.assertEqual(terms.labels([202501, 202502, 202503]).tolist(),
+                         ["Spring 2025", "Summer 2025", "Fall 2025"])
+        self.assertEqual(terms.labels([180001, 202509]).tolist(), ["Spring 1800", "Unknown 2025"])
+
+    def test_is_term(self):
+        self.assertEqual(terms.is_term([202501, 202502, 202503, 202500, 202504, 202509]).tolist(),
+                         [True, True, True, False, False, False])
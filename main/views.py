@@ -1,53 +1,217 @@
 from django.shortcuts import render, redirect
-from django.http import HttpResponse
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
+from django.core.paginator import Paginator
+from django.db.models import Case, F, Max, Min, OuterRef, Q, Subquery, When
+from urllib.parse import urlencode
 import csv
 from django.utils import timezone
 from django.conf import settings
 from django.contrib import messages
 from datetime import timedelta
-from .models import Course, GraduationData
-from .csce_scraper import build_term_codes_past_years
+from .models import Course, GraduationData, ForecastResult
+from .terms import SUMMER, is_term, labels as term_labels, recent_terms
 from django.contrib.auth.hashers import check_password
 from .forms import GraduationForm
-from datetime import datetime
+from . import coverage, jobs, payloads
+from .ingest import IngestError, ingest_csv
+from .artifacts import read_artifact
+from datetime import datetime, timezone as dt_timezone
 import json
 import os
-import sys
-import subprocess
-import io
+import re
+import zlib
+import numpy as np
+
+
+# Courses per page on the data page (per_page can ask for up to MAX_DATA_PAGE_SIZE)
+DATA_PAGE_SIZE = 50
+MAX_DATA_PAGE_SIZE = 500
+# Course number after the subject and campus letter ("MATH A151" -> 151), as in arima.py
+COURSE_NUM_RE = re.compile(r'^\S+\s+[A-Za-z]*(\d+)')
+
+
+# Enrollment history rows for the chart: the same series the forecasts are fit on,
+# so upper-level courses (A211+) leave out summer terms
+def history_records(codes=None):
+    courses = Course.objects.all() if codes is None else Course.objects.filter(code__in=list(codes))
+    rows = list(courses.order_by('code', 'term').values_list('code', 'term', 'enrolled', 'title'))
+    if not rows:
+        return []
+    codes, terms, enrolled, titles = zip(*rows)
+    terms = np.array(terms, dtype=np.int64)
+    upper_level = np.array([bool(match) and int(match.group(1)) > 201
+                            for match in map(COURSE_NUM_RE.search, codes)])
+    keep = ~(upper_level & (terms % 100 == SUMMER))
+    names = term_labels(terms)
+    return [
+        {
+            "code": codes[i],
+            "term": int(terms[i]),
+            "term_name": names[i],
+            "enrolled": enrolled[i],
+            "title": titles[i],
+        }
+        for i in np.flatnonzero(keep)
+    ]
 
 
 def home(request):
-    # Build all expected terms
-    all_terms = [term for term, label in build_term_codes_past_years(years=5)]
+    # First visit on a fresh database: scrape the prerequisites and run the forecasts in the background
+    jobs.ensure_bootstrapped()
+    jobs.ensure_forecast_run()
 
-    # Look at which terms we actually have in the DB
-    existing_terms = set(Course.objects.values_list('term', flat=True))
+    # Terms of the last 5 years we have no data for, from the cached coverage index;
+    # they are scraped in the background so the page never waits on the schedule API
+    missing_terms = coverage.missing_terms()
+    if missing_terms:
+        if jobs.enqueue_once("scrape_missing", reason=f"missing terms: {missing_terms}",
+                             cooldown=jobs.SCRAPE_MISSING_COOLDOWN):
+            print(f"Queued scrape of missing terms: {missing_terms}")
 
-    # Identify missing terms by TERM CODE only
-    missing_terms = [t for t in all_terms if t not in existing_terms]
+    return home_page(request)
 
-    if missing_terms:
-        print(f"Scraping missing terms: {missing_terms}")
-        Course.save_courses(subj="CSCE")
-    else:
-        print("No missing terms. All caught up.")
 
-    courses = Course.objects.values_list('code', flat=True).distinct().order_by('code')
+# Versions of the cached payloads, computed once per request since both the
+# conditional GET check and the view need them
+def request_memo(request, key, compute):
+    memo = request.__dict__.setdefault('_payload_versions', {})
+    if key not in memo:
+        memo[key] = compute()
+    return memo[key]
+
+
+def home_version(request):
+    return request_memo(request, 'home', lambda: (ForecastResult.latest_run_id(), payloads.course_stamp()))
 
-    forecast_path = os.path.join("main", "forecast_data.json")
-    if os.path.exists(forecast_path):
-        with open(forecast_path, "r") as f:
-            course_data = json.dumps(json.load(f))
-    else:
-        course_data = "[]"
+
+def home_etag(request):
+    # The page embeds a CSRF token, so the ETag also covers the visitor's CSRF cookie
+    return payloads.etag_for(request, (home_version(request), request.META.get('CSRF_COOKIE')))
+
+
+@cache_control(no_cache=True)
+@vary_on_headers('Accept-Encoding')
+@condition(etag_func=home_etag)
+def home_page(request):
+    # Only the course list; the chart fetches the selected course from the API
+    courses = Course.objects.values_list('code', flat=True).distinct().order_by('code')
 
     return render(request, 'home.html', {
         'courses': courses,
-        'course_data': course_data
     })
 
 
+# Forecast record fields the chart reads, as ForecastResult.course_records returns them
+FORECAST_FIELDS = (
+    ["code", "title", "term", "term_name", "enrolled", "yearly_course", "best_accuracy", "best_model",
+     "best_model_source", "fallback"]
+    + [f"{model}_{field}" for model in ForecastResult.MODELS + ForecastResult.BASELINES
+       for field in ("forecast", "mae", "val_terms", "val_preds")]
+)
+# (artifact version, {code: forecast record}) of the last artifact read
+_artifact_forecasts = (None, {})
+
+
+# Forecast records of the artifact on disk (forecast_data.json), for databases with no
+# saved run yet, in the shape ForecastResult.course_records returns. The file is parsed
+# again only when it changes.
+def artifact_forecasts(codes=None):
+    global _artifact_forecasts
+    try:
+        stat = os.stat(settings.FORECAST_DATA_PATH)
+        version = (stat.st_mtime_ns, stat.st_size)
+        if _artifact_forecasts[0] != version:
+            _, records = read_artifact(settings.FORECAST_DATA_PATH)
+            by_code = {}
+            for record in records:
+                if record.get("enrolled") is None and record.get("term") is not None:
+                    # older artifacts wrote the target term as a float
+                    by_code[record["code"]] = {field: record.get(field) for field in FORECAST_FIELDS}
+                    by_code[record["code"]]["term"] = int(record["term"])
+            _artifact_forecasts = (version, by_code)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring unreadable forecast artifact: {e}")
+        return []
+    by_code = _artifact_forecasts[1]
+    wanted = sorted(by_code) if codes is None else [code for code in codes if code in by_code]
+    return [dict(by_code[code]) for code in wanted]
+
+
+# (history rows, forecast records) of the given courses (all by default), as the home
+# chart reads them. Before the first run is saved the forecasts come from the artifact
+# on disk.
+def course_records(run_id, codes=None):
+    forecasts = ForecastResult.course_records(run_id, codes) if run_id else artifact_forecasts(codes)
+    history = history_records(codes)
+
+    # Courses the forecasts don't cover yet (new data, or no run so far) get the fast
+    # baseline forecasts right away; so do artifact records written without baselines
+    covered = {record['code']: record for record in forecasts}
+    need_baselines = [record for record in history
+                      if record['code'] not in covered
+                      or covered[record['code']].get('seasonal_naive_forecast') is None]
+    if need_baselines:
+        import pandas as pd
+        from .baselines import baseline_forecasts, merge_baselines
+        titles = {record['code']: record['title'] for record in need_baselines}
+        for code, record in baseline_forecasts(pd.DataFrame(need_baselines)).items():
+            if code in covered:
+                merge_baselines(covered[code], {code: record})
+            else:
+                forecasts.append({**record, "title": titles[code], "enrolled": None})
+
+    return history, forecasts
+
+
+# One course for the API: its history as parallel arrays and its forecast record without
+# the fields the history already carries.
+def compact_course(code, history, forecasts):
+    forecast = forecasts[0] if forecasts else None
+    return {
+        "code": code,
+        "title": history[0]["title"] if history else (forecast or {}).get("title"),
+        "history": {
+            "terms": [row["term"] for row in history],
+            "term_names": [row["term_name"] for row in history],
+            "enrolled": [row["enrolled"] for row in history],
+        },
+        "forecast": {
+            key: value for key, value in forecast.items() if key not in ("code", "title", "enrolled")
+        } if forecast else None,
+    }
+
+
+# Every course's code and title.
+@cache_control(no_cache=True)
+@vary_on_headers('Accept-Encoding')
+@condition(etag_func=lambda request: payloads.etag_for(request, home_version(request)))
+def api_courses(request):
+    def build():
+        rows = sorted_courses('code')
+        return json.dumps([{"code": row['code'], "title": row['course_title']} for row in rows],
+                          separators=(",", ":"))
+    return payloads.payload_response(request, payloads.get_payload('api_courses', home_version(request), build))
+
+
+# One course's enrollment history and latest forecasts (see compact_course).
+@cache_control(no_cache=True)
+@vary_on_headers('Accept-Encoding')
+@condition(etag_func=lambda request, code: payloads.etag_for(request, (home_version(request), code)))
+def api_course_forecast(request, code):
+    if not Course.objects.filter(code=code).exists():
+        return JsonResponse({"error": f"Unknown course {code}."}, status=404)
+    run_id = home_version(request)[0]
+
+    def build():
+        history, forecasts = course_records(run_id, [code])
+        return json.dumps(compact_course(code, history, forecasts), separators=(",", ":"))
+    payload = payloads.get_payload(f"api_course:{code}", home_version(request), build)
+    return payloads.payload_response(request, payload)
+
+
 def rescrape_data(request):
     if request.method == 'POST':
 
@@ -62,18 +226,13 @@ def rescrape_data(request):
             # Redirect back to data page (where the form is)
             return redirect('data')
 
-        # Password correct → continue normally
-        Course.objects.all().delete()
-
-        all_terms = [term for term, label in build_term_codes_past_years(years=5)]
-        Course.save_courses(subj="CSCE")
-
-        script_path = os.path.join(settings.BASE_DIR, "main", "arima.py")
-        subprocess.run([sys.executable, script_path], check=True)
+        # Password correct → delete + rescrape in the background, forecasts follow
+        all_terms = recent_terms(years=5)
+        jobs.enqueue("rescrape", reason="rescrape requested")
 
         messages.success(
             request,
-            f"All courses removed and rescraped for terms: {', '.join(all_terms)}"
+            f"Rescraping all courses for terms: {', '.join(map(str, all_terms))}. Forecasts will update when it finishes."
         )
 
     return redirect('home')
@@ -107,9 +266,8 @@ def graduate_data(request):
                     defaults={'graduates': graduates}
                 )
 
-                # run ARIMA after change
-                script_path = os.path.join(settings.BASE_DIR, "main", "arima.py")
-                subprocess.run([sys.executable, script_path], check=True)
+                # recompute forecasts after change
+                jobs.enqueue("forecast", reason=f"graduates updated for {year}")
 
                 return redirect('graduates')
 
@@ -126,14 +284,8 @@ def graduate_data(request):
 
 
 # ==============================
-# CSV Helpers + Upload
+# CSV Upload
 # ==============================
-def sanitize_csv_value(value):
-    if value and value[0] in ('=', '+', '-', '@'):
-        value = "'" + value
-    return value.strip()
-
-
 def data(request):
     message = None
     error = None
@@ -151,111 +303,282 @@ def data(request):
                 error = "Error: File is not CSV type."
 
             else:
+                # streamed in chunks, each validated and upserted in one transaction
                 try:
-                    data_set = csv_file.read().decode('UTF-8')
-                    io_string = io.StringIO(data_set)
-                    reader = csv.DictReader(io_string)
-
-                    if not reader.fieldnames or len(reader.fieldnames) < 3:
-                        error = "CSV must have at least Code, Title, and one Term column."
+                    result = ingest_csv(csv_file)
+                except IngestError as e:
+                    result = e.result
+                    error = str(e)
+                    if result.changed:
+                        error += f" Rows saved before the error: {result.summary()}."
+
+                if result.changed:
+                    jobs.enqueue("forecast", reason=f"CSV upload changed {len(result.changed_courses)} courses")
+                if not error:
+                    message = f"CSV uploaded successfully. {result.summary()}."
+                    if result.changed:
+                        message += " Forecasts are being recomputed in the background."
 
-                    else:
-                        term_columns = reader.fieldnames[2:]
-                        updated_count = 0
-                        skipped_count = 0
+    all_terms = sorted(Course.objects.values_list('term', flat=True).distinct(), reverse=True)
 
-                        for row in reader:
-                            code = sanitize_csv_value(row.get('Code', ''))
-                            title = sanitize_csv_value(row.get('Title', ''))
+    # Sort key: code, title or a term (that term's enrollment); a leading "-" sorts descending
+    sort = request.GET.get('sort', 'code')
+    if sort.lstrip('-') not in ['code', 'title'] + [str(term) for term in all_terms]:
+        sort = 'code'
+    try:
+        per_page = min(max(int(request.GET.get('per_page', DATA_PAGE_SIZE)), 1), MAX_DATA_PAGE_SIZE)
+    except ValueError:
+        per_page = DATA_PAGE_SIZE
+
+    page = Paginator(sorted_courses(sort), per_page).get_page(request.GET.get('page'))
+    titles = {row['code']: row['course_title'] for row in page}
+    enrolled = course_pivot(list(titles), all_terms)
+    courses_dict = {
+        code: {'title': title, 'enrolled_list': enrolled[code]} for code, title in titles.items()
+    }
+
+    # Header links: clicking a column sorts by it, clicking it again reverses the order
+    def sort_url(key):
+        return "?" + urlencode({'sort': f"-{key}" if sort == key else key, 'per_page': per_page})
+
+    columns = [
+        {'label': label, 'url': sort_url(key),
+         'arrow': "▲" if sort == key else ("▼" if sort == f"-{key}" else "")}
+        for key, label in [('code', 'Code'), ('title', 'Title')] + [(str(term), term) for term in all_terms]
+    ]
+
+    def page_url(number):
+        return "?" + urlencode({'sort': sort, 'per_page': per_page, 'page': number})
 
-                            if not code or not title:
-                                skipped_count += 1
-                                continue
+    return render(request, 'data.html', {
+        'courses_dict': courses_dict,
+        'all_terms': all_terms,
+        'columns': columns,
+        'page': page,
+        'previous_url': page_url(page.previous_page_number()) if page.has_previous() else None,
+        'next_url': page_url(page.next_page_number()) if page.has_next() else None,
+        'message': message,
+        'error': error
+    })
 
-                            for term in term_columns:
-                                enrolled = row.get(term, '').strip()
 
-                                if enrolled in ('', '-'):
-                                    continue
+# One row per course (code, course_title) in data-page order, as a single aggregate
+# query. sort is "code", "title" or a term code (by that term's enrollment), with a
+# leading "-" for descending; ties go by code. A course whose rows disagree on the title
+# gets its first-saved row's, as in the export.
+def sorted_courses(sort):
+    key = sort.lstrip('-')
+    first_title = Course.objects.filter(code=OuterRef('code')).order_by('pk').values('title')[:1]
+    #every row of a course gets the same first title; Min() only keeps the query grouped by code
+    courses = Course.objects.values('code').annotate(course_title=Min(Subquery(first_title)))
+    if key == 'code':
+        order = F('code')
+    elif key == 'title':
+        order = F('course_title')
+    else:
+        courses = courses.annotate(term_enrolled=Max(Case(When(term=int(key), then='enrolled'))))
+        order = F('term_enrolled')
+    order = order.desc(nulls_last=True) if sort.startswith('-') else order.asc(nulls_last=True)
+    return courses.order_by(order, 'code')
+
+
+# {code: [enrollment in each of terms, '-' where missing]} for the given courses from
+# one query. Where a course has two rows for a term, the first one saved wins.
+def course_pivot(codes, terms):
+    cells = {}
+    rows = Course.objects.filter(code__in=codes).order_by('pk').values_list('code', 'term', 'enrolled')
+    for code, term, enrolled in rows:
+        cells.setdefault((code, term), enrolled)
+    return {code: [cells.get((code, term), '-') for term in terms] for code in codes}
+
+
+class Echo:
+    # File-like object for csv.writer that hands each formatted row straight back
+    def write(self, value):
+        return value
+
+
+# Pivot (code, title, term, enrolled) rows ordered by code into CSV rows (header first),
+# yielding each course as soon as its last row is read. The rows of a course come in
+# save order and its first row gives the title, as on the data page. Rows of terms
+# missing from the header (saved after the header was read, while the export streams)
+# are left out rather than ending the file early.
+def export_rows(terms, rows):
+    yield ['Code', 'Title'] + terms
+    column = {term: i for i, term in enumerate(terms)}
+    code = title = cells = None
+    for row_code, row_title, term, enrolled in rows:
+        if row_code != code:
+            if cells is not None:
+                yield [code, title] + cells
+            code, title, cells = row_code, row_title, None
+        if term not in column:
+            continue
+        if cells is None:
+            cells = ['-'] * len(terms)
+        # the first row saved for a term wins, as on the data page
+        if cells[column[term]] == '-':
+            cells[column[term]] = enrolled
+    if cells is not None:
+        yield [code, title] + cells
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# Stream the course x term table as CSV. Optional filters: subject (repeatable),
+# term_from and term_to (term codes, inclusive); gzip=1 sends course_data.csv.gz.
+def download_data(request):
+    courses = Course.objects.all()
+    subjects = [s.strip().upper() for s in request.GET.getlist('subject') if s.strip()]
+    if subjects:
+        in_subjects = Q(pk__in=[])
+        for subject in subjects:
+            in_subjects |= Q(code__startswith=f"{subject} ")
+        courses = courses.filter(in_subjects)
+    for param, lookup in (('term_from', 'term__gte'), ('term_to', 'term__lte')):
+        value = request.GET.get(param, '').strip()
+        if value:
+            if not re.fullmatch(r'\d{6}', value) or not is_term(int(value)):
+                return HttpResponseBadRequest(f"{param} must be a term code like 202503.")
+            courses = courses.filter(**{lookup: int(value)})
+
+    all_terms = sorted(courses.values_list('term', flat=True).distinct(), reverse=True)
+    rows = courses.order_by('code', 'pk').values_list('code', 'title', 'term', 'enrolled').iterator(chunk_size=2000)
+    writer = csv.writer(Echo())
+    lines = (writer.writerow(row) for row in export_rows(all_terms, rows))
+
+    if request.GET.get('gzip'):
+        response = StreamingHttpResponse(gzip_stream(lines), content_type='application/gzip')
+        response['Content-Disposition'] = 'attachment; filename="course_data.csv.gz"'
+    else:
+        response = StreamingHttpResponse(lines, content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="course_data.csv"'
+    return response
 
-                                try:
-                                    enrolled = int(enrolled)
-                                except ValueError:
-                                    skipped_count += 1
-                                    continue
 
-                                Course.objects.update_or_create(
-                                    code=code,
-                                    term=term,
-                                    defaults={'title': title, 'enrolled': enrolled}
-                                )
-                                updated_count += 1
+def model_info_version(request):
+    def compute():
+        profile_mtime = None
+        if settings.SHOW_RUN_PROFILE and os.path.exists(settings.FORECAST_PROFILE_PATH):
+            profile_mtime = os.path.getmtime(settings.FORECAST_PROFILE_PATH)
+        return (ForecastResult.latest_run_id(), profile_mtime)
+    return request_memo(request, 'model_info', compute)
 
-                        script_path = os.path.join(settings.BASE_DIR, "main", "arima.py")
-                        subprocess.run([sys.executable, script_path], check=True)
 
-                        message = f"CSV uploaded successfully. {updated_count} updated, {skipped_count} skipped."
+def model_info_last_modified(request):
+    # Run ids are UTC timestamps, so the page changed when the last run (or profile) was written
+    run_id, profile_mtime = model_info_version(request)
+    times = []
+    if run_id:
+        times.append(datetime.strptime(run_id, "%Y%m%d%H%M%S%f").replace(tzinfo=dt_timezone.utc))
+    if profile_mtime:
+        times.append(datetime.fromtimestamp(profile_mtime, tz=dt_timezone.utc))
+    return max(times) if times else None
 
-                except Exception as e:
-                    error = f"Error processing CSV: {str(e)}"
 
-    all_terms = sorted(Course.objects.values_list('term', flat=True).distinct(), reverse=True)
-    courses_dict = {}
+@cache_control(no_cache=True)
+@vary_on_headers('Accept-Encoding')
+@condition(etag_func=lambda request: payloads.etag_for(request, model_info_version(request)),
+           last_modified_func=model_info_last_modified)
+def model_info(request):
+    run_id = model_info_version(request)[0]
+
+    # Only the per-course accuracy is needed for the overall accuracy figure
+    def build():
+        accuracies = (ForecastResult.objects
+                      .filter(run_id=run_id)
+                      .values('course', 'best_accuracy')
+                      .distinct()
+                      .order_by('course'))
+        return json.dumps([
+            {"code": row['course'], "best_accuracy": row['best_accuracy']} for row in accuracies
+        ])
+    results_json = payloads.get_payload('model_info', model_info_version(request), build).text
+
+    # Stage timings and slowest fits of the last run, when enabled in settings
+    profile = None
+    if settings.SHOW_RUN_PROFILE:
+        from .profiling import load_profile
+        profile = load_profile()
 
-    for c in Course.objects.all().order_by('code'):
-        if c.code not in courses_dict:
-            courses_dict[c.code] = {'title': c.title, 'enrolled_list': []}
+    return render(request, 'model_info.html', {
+        "results_json": results_json,
+        "profile": profile,
+    })
 
-    for code, info in courses_dict.items():
-        enrolled_list = []
-        for term in all_terms:
-            course = Course.objects.filter(code=code, term=term).first()
-            enrolled_list.append(course.enrolled if course else '-')
-        info['enrolled_list'] = enrolled_list
 
-    return render(request, 'data.html', {
-        'courses_dict': courses_dict,
-        'all_terms': all_terms,
-        'message': message,
-        'error': error
-    })
+def artifact_version(request):
+    def compute():
+        try:
+            stat = os.stat(settings.FORECAST_DATA_PATH)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    return request_memo(request, 'artifact', compute)
 
 
-def download_data(request):
-    all_terms = sorted(Course.objects.values_list('term', flat=True).distinct(), reverse=True)
-    courses_dict = {}
+def forecast_data_etag(request):
+    version = artifact_version(request)
+    return payloads.etag_for(request, version) if version else None
 
-    for c in Course.objects.all().order_by('code'):
-        if c.code not in courses_dict:
-            courses_dict[c.code] = {'title': c.title, 'enrolled_list': []}
 
-    for code, info in courses_dict.items():
-        enrolled_list = []
-        for term in all_terms:
-            course = Course.objects.filter(code=code, term=term).first()
-            enrolled_list.append(course.enrolled if course else '-')
-        info['enrolled_list'] = enrolled_list
+def forecast_data_last_modified(request):
+    version = artifact_version(request)
+    return datetime.fromtimestamp(version[0] / 1e9, tz=dt_timezone.utc) if version else None
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="course_data.csv"'
-    writer = csv.writer(response)
 
-    writer.writerow(['Code', 'Title'] + all_terms)
+# The raw forecast artifact (see main/artifacts.py), served from memory and gzipped when
+# the client accepts it.
+@cache_control(no_cache=True)
+@vary_on_headers('Accept-Encoding')
+@condition(etag_func=forecast_data_etag, last_modified_func=forecast_data_last_modified)
+def forecast_data(request):
+    version = artifact_version(request)
+    if version is None:
+        raise Http404("No forecast run has written the artifact yet.")
 
-    for code, course in courses_dict.items():
-        writer.writerow([code, course['title']] + course['enrolled_list'])
+    def build():
+        with open(settings.FORECAST_DATA_PATH, "r") as f:
+            return f.read()
+    return payloads.payload_response(request, payloads.get_payload('artifact', version, build))
 
-    return response
 
+def job_status(request):
+    return JsonResponse({
+        "forecast": jobs.latest_status("forecast"),
+        "rescrape": jobs.latest_status("rescrape"),
+        "bootstrap": jobs.latest_status("bootstrap"),
+        "scrape_missing": jobs.latest_status("scrape_missing"),
+    })
 
-def model_info(request):
-    forecast_path = os.path.join("main", "forecast_data.json")
-    if os.path.exists(forecast_path):
-        with open(forecast_path, "r") as f:
-            results_json = json.dumps(json.load(f))
-    else:
-        results_json = "[]"
 
-    return render(request, 'model_info.html', {
-        "results_json": results_json
+def scenarios(request):
+    # Courses whose ARIMAX/SARIMAX fits can be reused for what-if forecasts
+    from .scenarios import scenario_courses
+    return render(request, 'scenarios.html', {
+        "courses": scenario_courses(),
     })
+
+
+def scenario_forecast(request):
+    # ?course=CSCE A101&hs_graduates=7000,7500,8000 forecasts every combination of the listed inputs
+    from .scenarios import scenario_forecasts, scenario_grid
+
+    code = request.GET.get("course", "")
+    try:
+        values = {
+            key: [float(v) for v in raw.split(",") if v.strip()]
+            for key, raw in request.GET.items() if key != "course"
+        }
+        values = {key: vals for key, vals in values.items() if vals}
+        return JsonResponse(scenario_forecasts(code, scenario_grid(values) or [{}]))
+    except ValueError as e:
+        # ScenarioError is a ValueError, as are unparseable numbers
+        return JsonResponse({"error": str(e)}, status=400)